@@ -0,0 +1,544 @@
+"""Streaming builder for the account data export archive.
+
+The archive is produced as a sequence of byte chunks: fill-ups are read with
+a server-side cursor in batches of ``FILLUP_CHUNK_SIZE`` and each batch is
+rendered to CSV and deflated before the next is fetched, so memory stays flat
+whatever the size of the account.
+
+Passing ``since`` makes a delta export: only vehicles whose ``updated_at``
+and fill-ups whose ``changed_at`` is later are written, and ``manifest.json``
+lists the ids deleted after ``since`` (recorded as ``DeletedRecord`` rows).
+Consecutive deltas overlap slightly (see :func:`delta_cutoff`), so a row can
+appear in two of them.
+
+On PostgreSQL with psycopg 3, ``fillups.csv`` is instead rendered by the
+database with ``COPY ... TO STDOUT WITH (FORMAT csv)`` (see
+:func:`fillup_copy_chunks`); the rows parse identically, only the line
+endings differ (LF instead of CRLF).
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+import zipfile
+from datetime import datetime, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Callable, Iterable, Iterator
+
+from django.conf import settings
+from django.db import connection
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from fillups.loaders import EXPORT_FIELDS
+from fillups.models import FillUp
+
+from .models import DeletedRecord
+
+FILLUP_CHUNK_SIZE = 2000
+
+# Fill-ups per COPY statement; the connection is free for other queries
+# (such as job progress updates) between segments.
+FILLUP_COPY_SEGMENT = 20000
+
+# COPY output is handed to the archive in blocks of about this many bytes.
+COPY_BLOCK_SIZE = 64 * 1024
+
+VEHICLE_HEADER = [
+    "id",
+    "name",
+    "make",
+    "model",
+    "year",
+    "fuel_type",
+    "created_at",
+    "updated_at",
+]
+
+FILLUP_HEADER = [
+    "id",
+    "vehicle_id",
+    "date",
+    "odometer_km",
+    "station",
+    "fuel_brand",
+    "fuel_grade",
+    "liters",
+    "total_currency_amount",
+    "currency",
+    "notes",
+    "created_at",
+    "updated_at",
+    "unit_price_per_liter",
+    "distance_since_last_km",
+    "consumption_l_per_100km",
+    "cost_per_km",
+]
+
+
+def export_filename(user, export_format: str = "csv") -> str:
+    today = timezone.now().date().strftime("%Y%m%d")
+    suffix = "" if export_format == "csv" else f"_{export_format}"
+    return f"fuel_tracker_export_{user.id}_{today}{suffix}.zip"
+
+
+def _format_decimal(value: Decimal | None, fmt: str) -> str:
+    if value is None:
+        return ""
+    return format(value, fmt)
+
+
+def parse_since(value: str) -> datetime:
+    """Parse the ``since`` of a delta export: an ISO 8601 timestamp or date.
+
+    Naive values are read in the current time zone. Raises ``ValueError``.
+    """
+
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"Invalid timestamp: {value!r}")
+        parsed = datetime(day.year, day.month, day.day)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def delta_horizon() -> datetime:
+    """Return the earliest ``since`` whose deletions are all still recorded."""
+
+    return timezone.now() - timedelta(days=settings.ACCOUNT_EXPORT_TOMBSTONE_DAYS)
+
+
+_OLDEST_OPEN_WRITE_SQL = """
+SELECT MIN(xact_start)
+FROM pg_stat_activity
+WHERE datname = current_database()
+    AND pid <> pg_backend_pid()
+    AND backend_xid IS NOT NULL
+"""
+
+
+def delta_cutoff() -> datetime:
+    """Return the ``exported_at`` of a delta export that starts reading now.
+
+    Rows are stamped before their transaction commits, so a write stamped
+    just before the export but committed after it is neither read by the
+    export nor later than ``timezone.now()``. The cutoff is therefore the
+    start of the oldest transaction still writing, if earlier, less
+    ``ACCOUNT_EXPORT_DELTA_MARGIN_SECONDS``. Rows changed in that overlap are
+    written again by the next delta, so consumers upsert them by id.
+    """
+
+    cutoff = timezone.now()
+    with connection.cursor() as cursor:
+        # Activity is snapshotted once per transaction; read it afresh.
+        cursor.execute("SELECT pg_stat_clear_snapshot()")
+        cursor.execute(_OLDEST_OPEN_WRITE_SQL)
+        (oldest,) = cursor.fetchone()
+    if oldest is not None:
+        cutoff = min(cutoff, oldest)
+    return cutoff - timedelta(seconds=settings.ACCOUNT_EXPORT_DELTA_MARGIN_SECONDS)
+
+
+def _changed_since(queryset, since: datetime | None, field: str = "updated_at"):
+    return queryset if since is None else queryset.filter(**{f"{field}__gt": since})
+
+
+def vehicle_rows(user, since: datetime | None = None) -> Iterator[list]:
+    for vehicle in _changed_since(user.vehicles.order_by("id"), since):
+        yield [
+            vehicle.id,
+            vehicle.name,
+            vehicle.make,
+            vehicle.model,
+            vehicle.year or "",
+            vehicle.fuel_type,
+            vehicle.created_at.isoformat(),
+            vehicle.updated_at.isoformat(),
+        ]
+
+
+def fillup_records(user, since: datetime | None = None) -> Iterator[tuple]:
+    """Yield typed export values of the fill-ups of ``user``, one tuple per fill.
+
+    Values follow ``FILLUP_HEADER``; the derived columns are rounded the way
+    they are shown (unit price and cost to cents, consumption to 0.1) and are
+    ``None`` when they cannot be computed. Rows are read through a
+    server-side cursor.
+    """
+
+    currency_code = getattr(getattr(user, "profile", None), "currency", "USD")
+    fillups = (
+        _changed_since(FillUp.objects.filter(user=user), since, "changed_at")
+        .order_by("vehicle_id", "date", "id")
+        .values_list(*EXPORT_FIELDS, named=True)
+        .iterator(chunk_size=FILLUP_CHUNK_SIZE)
+    )
+
+    for fillup in fillups:
+        distance_since_last: int | None = None
+        consumption: Decimal | None = None
+        cost_per_km: Decimal | None = None
+
+        liters = fillup.liters
+        total_amount = fillup.total_amount
+
+        unit_price: Decimal | None = None
+        if liters > 0:
+            unit_price = (total_amount / liters).quantize(
+                Decimal("0.01"), rounding=ROUND_HALF_UP
+            )
+
+        # Distance to the previous fill of the vehicle is stored on the row.
+        if fillup.distance_since_last_km is not None:
+            distance_since_last = fillup.distance_since_last_km
+            distance_decimal = Decimal(distance_since_last)
+
+            if liters > 0:
+                consumption = (
+                    (liters * Decimal("100")) / distance_decimal
+                ).quantize(Decimal("0.1"), rounding=ROUND_HALF_UP)
+
+            if total_amount > 0:
+                cost_per_km = (total_amount / distance_decimal).quantize(
+                    Decimal("0.01"), rounding=ROUND_HALF_UP
+                )
+
+        yield (
+            fillup.id,
+            fillup.vehicle_id,
+            fillup.date,
+            fillup.odometer_km,
+            fillup.station_name,
+            fillup.fuel_brand,
+            fillup.fuel_grade,
+            liters,
+            total_amount,
+            currency_code,
+            fillup.notes,
+            fillup.created_at,
+            fillup.updated_at,
+            unit_price,
+            distance_since_last,
+            consumption,
+            cost_per_km,
+        )
+
+
+def fillup_rows(user, since: datetime | None = None) -> Iterator[list]:
+    """Yield the ``fillups.csv`` rows of ``user``."""
+
+    for (
+        fillup_id,
+        vehicle_id,
+        fill_date,
+        odometer_km,
+        station_name,
+        fuel_brand,
+        fuel_grade,
+        liters,
+        total_amount,
+        currency_code,
+        notes,
+        created_at,
+        updated_at,
+        unit_price,
+        distance_since_last,
+        consumption,
+        cost_per_km,
+    ) in fillup_records(user, since):
+        yield [
+            fillup_id,
+            vehicle_id,
+            fill_date.isoformat(),
+            odometer_km,
+            station_name,
+            fuel_brand,
+            fuel_grade,
+            format(liters, ".2f"),
+            format(total_amount, ".2f"),
+            currency_code,
+            notes,
+            created_at.isoformat(),
+            updated_at.isoformat(),
+            _format_decimal(unit_price, ".2f"),
+            distance_since_last or "",
+            _format_decimal(consumption, ".1f"),
+            _format_decimal(cost_per_km, ".2f"),
+        ]
+
+
+def csv_chunks(
+    header: list[str], rows: Iterable[list], batch_size: int = FILLUP_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Render ``header`` and ``rows`` as UTF-8 CSV, ``batch_size`` rows per chunk."""
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= batch_size:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue().encode("utf-8")
+
+
+def copy_supported() -> bool:
+    """Return whether the fill-up CSV can be produced with ``COPY`` on this connection."""
+
+    return connection.vendor == "postgresql" and is_psycopg3
+
+
+# ``datetime.isoformat()``-compatible UTC timestamps: microseconds only when set.
+_ISO_TIMESTAMP = """
+CASE WHEN date_trunc('second', {column}) = {column}
+    THEN to_char({column} AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS')
+    ELSE to_char({column} AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS.US')
+END || '+00:00'
+"""
+
+# Mirrors ``fillup_rows``: empty strings become NULL so they are written
+# unquoted, and the derived values are rounded half-up like the quantize()
+# calls there. Distances come from the stored ``distance_since_last_km``.
+_COPY_FILLUPS_SQL = """
+COPY (
+    SELECT
+        id,
+        vehicle_id,
+        to_char(date, 'YYYY-MM-DD'),
+        odometer_km,
+        NULLIF(station_name, ''),
+        NULLIF(fuel_brand, ''),
+        NULLIF(fuel_grade, ''),
+        liters,
+        total_amount,
+        NULLIF(%(currency)s, ''),
+        NULLIF(notes, ''),
+        {created_at},
+        {updated_at},
+        CASE WHEN liters > 0 THEN ROUND(total_amount / liters, 2) END,
+        distance_since_last_km,
+        CASE WHEN liters > 0 THEN ROUND(liters * 100 / distance_since_last_km, 1) END,
+        CASE WHEN total_amount > 0 THEN ROUND(total_amount / distance_since_last_km, 2) END
+    FROM {table}
+    WHERE user_id = %(user)s{since}{segment}
+    ORDER BY vehicle_id, date, id
+) TO STDOUT WITH (FORMAT csv)
+"""
+
+_SEGMENT_BOUNDARIES_SQL = """
+SELECT vehicle_id, date, id
+FROM (
+    SELECT vehicle_id, date, id, ROW_NUMBER() OVER (ORDER BY vehicle_id, date, id) AS position
+    FROM {table}
+    WHERE user_id = %(user)s{since}
+) AS ordered
+WHERE position %% %(segment)s = 0
+ORDER BY position
+"""
+
+
+def _since_condition(since: datetime | None) -> str:
+    if since is None:
+        return ""
+    return " AND " + connection.ops.compose_sql("changed_at > %s", [since])
+
+
+def _copy_segments(user, segment_size: int, since: datetime | None = None) -> list[str]:
+    """Return ``WHERE`` fragments splitting the user's fill-ups into COPY segments."""
+
+    table = connection.ops.quote_name(FillUp._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            _SEGMENT_BOUNDARIES_SQL.format(table=table, since=_since_condition(since)),
+            {"user": user.pk, "segment": segment_size},
+        )
+        boundaries = cursor.fetchall()
+
+    segments = []
+    previous = None
+    for boundary in [*boundaries, None]:
+        conditions = []
+        if previous is not None:
+            conditions.append(
+                connection.ops.compose_sql("(vehicle_id, date, id) > (%s, %s, %s)", previous)
+            )
+        if boundary is not None:
+            conditions.append(
+                connection.ops.compose_sql("(vehicle_id, date, id) <= (%s, %s, %s)", boundary)
+            )
+        segments.append("".join(f" AND {condition}" for condition in conditions))
+        previous = boundary
+    return segments
+
+
+def fillup_copy_chunks(
+    user,
+    progress: Callable[[int], None] | None = None,
+    segment_size: int = FILLUP_COPY_SEGMENT,
+    since: datetime | None = None,
+) -> Iterator[bytes]:
+    """Yield ``fillups.csv`` of ``user`` as rendered by PostgreSQL ``COPY``.
+
+    ``progress`` is called with the number of fill-ups written after each
+    segment (PostgreSQL sends one COPY message per row).
+    """
+
+    header = io.StringIO()
+    csv.writer(header, lineterminator="\n").writerow(FILLUP_HEADER)
+    yield header.getvalue().encode("utf-8")
+
+    currency_code = getattr(getattr(user, "profile", None), "currency", "USD")
+    table = connection.ops.quote_name(FillUp._meta.db_table)
+    rows = 0
+    for segment in _copy_segments(user, segment_size, since):
+        statement = connection.ops.compose_sql(
+            _COPY_FILLUPS_SQL.format(
+                table=table,
+                since=_since_condition(since),
+                created_at=_ISO_TIMESTAMP.format(column="created_at"),
+                updated_at=_ISO_TIMESTAMP.format(column="updated_at"),
+                segment=segment,
+            ),
+            {"user": user.pk, "currency": currency_code},
+        )
+        block = bytearray()
+        with connection.cursor() as cursor:
+            with cursor.copy(statement) as copy:
+                for data in copy:
+                    block += data
+                    rows += 1
+                    if len(block) >= COPY_BLOCK_SIZE:
+                        yield bytes(block)
+                        block.clear()
+        if block:
+            yield bytes(block)
+        if progress is not None:
+            progress(rows)
+
+
+class _ChunkWriter:
+    """Write-only, unseekable sink that ``zipfile`` streams into; drained per chunk."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def zip_stream(
+    members: Iterable[tuple[str | zipfile.ZipInfo, Iterable[bytes]]]
+) -> Iterator[bytes]:
+    """Write each ``(name, chunks)`` member into a ZIP archive yielded piece by piece.
+
+    Members named by a string are deflated; pass a ``ZipInfo`` to choose the
+    compression of a member (e.g. to store data that is already compressed).
+    """
+
+    sink = _ChunkWriter()
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, chunks in members:
+            # The size is unknown up front; zip64 headers allow any length.
+            with archive.open(name, "w", force_zip64=True) as member:
+                for chunk in chunks:
+                    member.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+    data = sink.drain()
+    if data:
+        yield data
+
+
+def _counted(rows: Iterable[list], progress: Callable[[int], None]) -> Iterator[list]:
+    """Pass ``rows`` through, reporting the running count every batch and at the end."""
+
+    count = 0
+    for row in rows:
+        yield row
+        count += 1
+        if count % FILLUP_CHUNK_SIZE == 0:
+            progress(count)
+    progress(count)
+
+
+def delta_manifest(user, since: datetime, exported_at: datetime) -> bytes:
+    """Return ``manifest.json`` of a delta export: the ids deleted after ``since``.
+
+    ``exported_at`` comes from :func:`delta_cutoff`; pass it as the next ``since``.
+    """
+
+    deleted: dict[str, list[int]] = {kind: [] for kind in DeletedRecord.Kind.values}
+    records = (
+        DeletedRecord.objects.filter(user=user, deleted_at__gt=since)
+        .order_by("object_id")
+        .values_list("kind", "object_id")
+    )
+    for kind, object_id in records.iterator():
+        deleted[kind].append(object_id)
+    manifest = {
+        "since": since.isoformat(),
+        "exported_at": exported_at.isoformat(),
+        "deleted": {
+            "vehicles": deleted[DeletedRecord.Kind.VEHICLE],
+            "fillups": deleted[DeletedRecord.Kind.FILLUP],
+        },
+    }
+    return json.dumps(manifest, indent=2).encode("utf-8")
+
+
+def export_members(
+    user,
+    progress: Callable[[int], None] | None = None,
+    use_copy: bool | None = None,
+    since: datetime | None = None,
+) -> Iterator[tuple[str, Iterable[bytes]]]:
+    if use_copy is None:
+        use_copy = copy_supported()
+    exported_at = delta_cutoff() if since is not None else None
+    yield "vehicles.csv", csv_chunks(VEHICLE_HEADER, vehicle_rows(user, since))
+    if use_copy:
+        yield "fillups.csv", fillup_copy_chunks(user, progress, since=since)
+    else:
+        fillups = fillup_rows(user, since)
+        if progress is not None:
+            fillups = _counted(fillups, progress)
+        yield "fillups.csv", csv_chunks(FILLUP_HEADER, fillups)
+    if since is not None:
+        yield "manifest.json", [delta_manifest(user, since, exported_at)]
+
+
+def iter_export_archive(
+    user,
+    progress: Callable[[int], None] | None = None,
+    use_copy: bool | None = None,
+    since: datetime | None = None,
+) -> Iterator[bytes]:
+    """Yield the export ZIP of ``user`` in chunks.
+
+    ``progress`` is called with the number of fill-ups written so far.
+    ``use_copy`` forces the ``COPY`` fast path on or off; by default it is
+    used whenever the connection supports it. ``since`` makes it a delta
+    export.
+    """
+
+    return zip_stream(export_members(user, progress, use_copy, since))
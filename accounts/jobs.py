@@ -0,0 +1,175 @@
+"""Database-backed queue for background account exports."""
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from fillups.counters import fillup_count
+
+from .export import delta_horizon, export_filename, iter_export_archive
+from .models import DeletedRecord, ExportJob
+
+logger = logging.getLogger(__name__)
+
+# A running job that has not reported progress for this long lost its worker.
+STALE_AFTER = timedelta(minutes=10)
+
+
+class JobSuperseded(Exception):
+    """The job was reclaimed by another worker while this one was building it."""
+
+
+def export_dir() -> Path:
+    return Path(settings.ACCOUNT_EXPORT_DIR)
+
+
+def artifact_path(job: ExportJob) -> Path:
+    return export_dir() / f"export-{job.pk}.zip"
+
+
+def partial_path(job: ExportJob) -> Path:
+    """Per-attempt temporary file, so a reclaimed job's old worker writes elsewhere."""
+
+    return export_dir() / f"export-{job.pk}.{job.attempt}.part"
+
+
+def enqueue_export(user) -> ExportJob:
+    """Return the user's pending or running export, queueing a new one if there is none."""
+
+    with transaction.atomic():
+        active = (
+            ExportJob.objects.select_for_update()
+            .filter(
+                user=user,
+                status__in=[ExportJob.Status.PENDING, ExportJob.Status.RUNNING],
+            )
+            .first()
+        )
+        if active is not None:
+            return active
+        return ExportJob.objects.create(user=user)
+
+
+def claim_next_job() -> ExportJob | None:
+    """Mark the oldest pending (or abandoned running) job as running and return it.
+
+    Each claim starts a new ``attempt``; only the worker holding the current
+    attempt may report progress or finish the job.
+    """
+
+    stale_before = timezone.now() - STALE_AFTER
+    with transaction.atomic():
+        job = (
+            ExportJob.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=ExportJob.Status.PENDING)
+                | Q(status=ExportJob.Status.RUNNING, updated_at__lt=stale_before)
+            )
+            .order_by("created_at", "id")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = ExportJob.Status.RUNNING
+        job.started_at = timezone.now()
+        job.rows_written = 0
+        job.attempt += 1
+        job.save(
+            update_fields=["status", "started_at", "rows_written", "attempt", "updated_at"]
+        )
+    return job
+
+
+def run_job(job: ExportJob) -> None:
+    """Build the archive of ``job`` on disk, recording progress and the outcome."""
+
+    user = job.user
+    current = ExportJob.objects.filter(
+        pk=job.pk, attempt=job.attempt, status=ExportJob.Status.RUNNING
+    )
+
+    def report(rows_written: int) -> None:
+        if not current.update(rows_written=rows_written, updated_at=timezone.now()):
+            raise JobSuperseded
+
+    target = artifact_path(job)
+    partial = partial_path(job)
+    try:
+        if not current.update(rows_total=fillup_count(user), updated_at=timezone.now()):
+            raise JobSuperseded
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with partial.open("wb") as handle:
+            for chunk in iter_export_archive(user, progress=report):
+                handle.write(chunk)
+        with transaction.atomic():
+            # The row lock keeps a reclaim from slipping in before the rename.
+            if not current.select_for_update().exists():
+                raise JobSuperseded
+            partial.replace(target)
+            current.update(
+                status=ExportJob.Status.DONE,
+                file_name=export_filename(user),
+                finished_at=timezone.now(),
+                updated_at=timezone.now(),
+            )
+    except JobSuperseded:
+        logger.warning("Export job %s attempt %s was reclaimed", job.pk, job.attempt)
+        partial.unlink(missing_ok=True)
+    except Exception as exc:
+        logger.exception("Export job %s failed", job.pk)
+        partial.unlink(missing_ok=True)
+        current.update(
+            status=ExportJob.Status.FAILED,
+            error=str(exc)[:1000],
+            finished_at=timezone.now(),
+            updated_at=timezone.now(),
+        )
+
+
+def run_pending_jobs(limit: int | None = None) -> int:
+    """Run queued jobs until the queue is empty (or ``limit`` ran); return how many ran."""
+
+    ran = 0
+    while limit is None or ran < limit:
+        job = claim_next_job()
+        if job is None:
+            break
+        run_job(job)
+        ran += 1
+    return ran
+
+
+def prune_exports(max_age: timedelta | None = None) -> int:
+    """Delete jobs and artifacts older than ``max_age``; return the number of jobs removed.
+
+    Files without a job row (left by deleted accounts) are removed by age too,
+    as are deleted-id records past ``ACCOUNT_EXPORT_TOMBSTONE_DAYS``.
+    """
+
+    if max_age is None:
+        max_age = timedelta(hours=settings.ACCOUNT_EXPORT_MAX_AGE_HOURS)
+    cutoff = timezone.now() - max_age
+
+    expired = ExportJob.objects.filter(created_at__lt=cutoff).exclude(
+        status=ExportJob.Status.RUNNING
+    )
+    removed = 0
+    for job in expired:
+        artifact_path(job).unlink(missing_ok=True)
+        job.delete()
+        removed += 1
+
+    DeletedRecord.objects.filter(deleted_at__lt=delta_horizon()).delete()
+
+    directory = export_dir()
+    if directory.is_dir():
+        for path in directory.glob("export-*"):
+            if path.stat().st_mtime < cutoff.timestamp():
+                path.unlink(missing_ok=True)
+    return removed
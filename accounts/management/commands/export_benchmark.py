@@ -0,0 +1,56 @@
+"""Management command comparing the Python and COPY paths of the account export."""
+from __future__ import annotations
+
+import csv
+import io
+import time
+import zipfile
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.export import copy_supported, iter_export_archive
+
+
+class Command(BaseCommand):
+    help = "Time the account export archive built in Python and with PostgreSQL COPY."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--email", required=True, help="Email of the user to export")
+        parser.add_argument(
+            "--repeat", type=int, default=1, help="Runs per path; the fastest is reported"
+        )
+
+    def handle(self, *args, **options):
+        email: str = options["email"].strip().lower()
+        User = get_user_model()
+        try:
+            user = User.objects.get(email=email)
+        except User.DoesNotExist as exc:
+            raise CommandError(f"No user found for email {email!r}") from exc
+        if not copy_supported():
+            raise CommandError("The COPY path needs PostgreSQL with psycopg 3")
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Export benchmark"))
+        self.stdout.write(f"User: {email}")
+        archives = {}
+        for label, use_copy in (("python", False), ("copy", True)):
+            best = None
+            for _ in range(max(options["repeat"], 1)):
+                start = time.monotonic()
+                archive = b"".join(iter_export_archive(user, use_copy=use_copy))
+                elapsed = time.monotonic() - start
+                best = elapsed if best is None else min(best, elapsed)
+            archives[label] = archive
+            self.stdout.write(f"{label:>6}: {best * 1000:.0f} ms, {len(archive)} bytes")
+
+        rows = {label: _fillup_rows(archive) for label, archive in archives.items()}
+        if rows["python"] != rows["copy"]:
+            raise CommandError("fillups.csv differs between the two paths")
+        self.stdout.write(f"fillups.csv rows match ({len(rows['copy']) - 1} fill-ups)")
+
+
+def _fillup_rows(archive: bytes) -> list[list[str]]:
+    with zipfile.ZipFile(io.BytesIO(archive)) as bundle:
+        text = bundle.read("fillups.csv").decode("utf-8")
+    return list(csv.reader(io.StringIO(text, newline="")))
@@ -0,0 +1,45 @@
+"""Worker that builds queued account exports."""
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.jobs import prune_exports, run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = "Build queued account exports and prune expired ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Run the jobs queued now, prune, and exit instead of polling",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=2.0,
+            help="Seconds to wait between polls of an empty queue (default 2)",
+        )
+        parser.add_argument(
+            "--prune-interval",
+            type=float,
+            default=300.0,
+            help="Seconds between prunes of expired exports (default 300)",
+        )
+
+    def handle(self, *args, **options):
+        next_prune = 0.0
+        while True:
+            ran = run_pending_jobs()
+            pruned = 0
+            if options["once"] or time.monotonic() >= next_prune:
+                pruned = prune_exports()
+                next_prune = time.monotonic() + options["prune_interval"]
+            if ran or pruned:
+                self.stdout.write(f"Exports built: {ran}, pruned: {pruned}")
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
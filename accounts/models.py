@@ -17,3 +17,85 @@ class User(AbstractUser):
 
     def __str__(self) -> str:  # pragma: no cover - simple convenience method
         return self.email
+
+
+class ExportJob(models.Model):
+    """A queued account export, built by ``manage.py run_export_jobs``.
+
+    The database row is the queue entry: workers claim pending jobs with
+    ``SELECT ... FOR UPDATE SKIP LOCKED``, so no broker is needed. The
+    finished archive is written under ``ACCOUNT_EXPORT_DIR``.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RUNNING = "running", "Running"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    user = models.ForeignKey(
+        "accounts.User",
+        on_delete=models.CASCADE,
+        related_name="export_jobs",
+    )
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.PENDING)
+    rows_total = models.PositiveIntegerField(default=0)
+    rows_written = models.PositiveIntegerField(default=0)
+    file_name = models.CharField(max_length=255, blank=True)
+    error = models.TextField(blank=True)
+    # Bumped on every claim, so a worker whose job was reclaimed stops writing.
+    attempt = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            models.Index(fields=["status", "created_at"], name="ix_exportjob_status_created"),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover - representation helper
+        return f"ExportJob({self.pk}, {self.status})"
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in (self.Status.PENDING, self.Status.RUNNING)
+
+    @property
+    def percent_complete(self) -> int:
+        if self.status == self.Status.DONE:
+            return 100
+        if not self.rows_total:
+            return 0
+        return min(99, self.rows_written * 100 // self.rows_total)
+
+
+class DeletedRecord(models.Model):
+    """Id of a deleted vehicle or fill-up, listed in the manifest of delta exports.
+
+    Rows are written by the delete receivers in ``accounts.signals`` and pruned
+    with old export jobs after ``ACCOUNT_EXPORT_TOMBSTONE_DAYS``.
+    """
+
+    class Kind(models.TextChoices):
+        VEHICLE = "vehicle", "Vehicle"
+        FILLUP = "fillup", "Fill-up"
+
+    user = models.ForeignKey(
+        "accounts.User",
+        on_delete=models.CASCADE,
+        related_name="deleted_records",
+    )
+    kind = models.CharField(max_length=16, choices=Kind.choices)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "deleted_at"], name="ix_deleted_user_deleted_at"),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover - representation helper
+        return f"DeletedRecord({self.kind}, {self.object_id})"
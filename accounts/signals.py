@@ -0,0 +1,48 @@
+"""Delete receivers that record removed ids for delta exports."""
+from __future__ import annotations
+
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, pre_delete
+from django.dispatch import receiver
+
+from fillups.models import FillUp
+from vehicles.models import Vehicle
+
+from .models import DeletedRecord
+
+BATCH_SIZE = 2000
+
+
+def _deleted_directly(origin, model) -> bool:
+    """Return whether a delete started from ``model`` rather than a parent cascade."""
+
+    if isinstance(origin, QuerySet):
+        return origin.model is model
+    return isinstance(origin, model)
+
+
+@receiver(post_delete, sender=FillUp)
+def record_fillup_delete(sender, instance: FillUp, origin=None, **kwargs) -> None:
+    # Fill-ups removed with their vehicle are recorded by the vehicle receiver.
+    if not _deleted_directly(origin, FillUp):
+        return
+    DeletedRecord.objects.create(
+        user_id=instance.user_id, kind=DeletedRecord.Kind.FILLUP, object_id=instance.pk
+    )
+
+
+@receiver(pre_delete, sender=Vehicle)
+def record_vehicle_delete(sender, instance: Vehicle, origin=None, **kwargs) -> None:
+    # An account delete drops its records with the user row.
+    if not _deleted_directly(origin, Vehicle):
+        return
+    records = [
+        DeletedRecord(user_id=instance.user_id, kind=DeletedRecord.Kind.FILLUP, object_id=fill_id)
+        for fill_id in instance.fillups.values_list("id", flat=True).iterator()
+    ]
+    records.append(
+        DeletedRecord(
+            user_id=instance.user_id, kind=DeletedRecord.Kind.VEHICLE, object_id=instance.pk
+        )
+    )
+    DeletedRecord.objects.bulk_create(records, batch_size=BATCH_SIZE)
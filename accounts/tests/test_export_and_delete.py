@@ -62,7 +62,7 @@ class AccountExportAndDeleteTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response["Content-Type"], "application/zip")
 
-        archive = zipfile.ZipFile(io.BytesIO(response.content))
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
         names = set(archive.namelist())
         self.assertIn("vehicles.csv", names)
         self.assertIn("fillups.csv", names)
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import io
+import zipfile
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from accounts.columnar import HAS_PYARROW, fillup_schema, parquet_chunks
+from accounts.export import fillup_records
+from fillups.models import FillUp
+from vehicles.models import Vehicle
+
+if HAS_PYARROW:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+
+@skipUnless(HAS_PYARROW, "pyarrow is not installed")
+class ParquetExportTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            email="parquet@example.com", password="password123"
+        )
+        start = date.today() - timedelta(days=90)
+        for name in ("Car", "Van"):
+            vehicle = Vehicle.objects.create(user=self.user, name=name, year=2019)
+            for step in range(5):
+                FillUp.objects.create(
+                    vehicle=vehicle,
+                    date=start + timedelta(days=step * 9),
+                    odometer_km=120_000 + step * 350,
+                    station_name="Main, Street",
+                    fuel_brand=["Shell", ""][step % 2],
+                    liters=Decimal("30.00"),
+                    total_amount=Decimal("51.05"),
+                )
+        self.client.force_login(self.user)
+
+    def test_view_returns_typed_parquet_members(self) -> None:
+        response = self.client.get(reverse("accounts:export"), {"format": "parquet"})
+
+        self.assertIn("_parquet.zip", response["Content-Disposition"])
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+        self.assertEqual(archive.namelist(), ["vehicles.parquet", "fillups.parquet"])
+        self.assertEqual(archive.getinfo("fillups.parquet").compress_type, zipfile.ZIP_STORED)
+
+        vehicles = pq.read_table(io.BytesIO(archive.read("vehicles.parquet")))
+        self.assertEqual(vehicles.column("year").to_pylist(), [2019, 2019])
+        fillups = pq.read_table(io.BytesIO(archive.read("fillups.parquet")))
+        self.assertEqual(fillups.schema, fillup_schema())
+        self.assertEqual(fillups.num_rows, 10)
+        second = fillups.slice(1, 1).to_pylist()[0]
+        self.assertEqual(second["odometer_km"], 120_350)
+        self.assertEqual(second["date"], date.today() - timedelta(days=81))
+        self.assertEqual(second["fuel_brand"], "")
+        self.assertEqual(
+            (
+                second["unit_price_per_liter"],
+                second["distance_since_last_km"],
+                second["consumption_l_per_100km"],
+                second["cost_per_km"],
+            ),
+            (Decimal("1.70"), 350, Decimal("8.6"), Decimal("0.15")),
+        )
+        self.assertIsNone(fillups.slice(0, 1).to_pylist()[0]["distance_since_last_km"])
+
+    def test_row_groups_follow_chunk_size(self) -> None:
+        records = fillup_records(self.user)
+        data = b"".join(parquet_chunks(fillup_schema(), records, row_group_size=4))
+
+        parquet = pq.ParquetFile(io.BytesIO(data))
+        self.assertEqual(parquet.metadata.num_row_groups, 3)
+        self.assertEqual(parquet.read().column("id").type, pa.int64())
+
+    def test_empty_account_and_unknown_format(self) -> None:
+        data = b"".join(parquet_chunks(fillup_schema(), []))
+        self.assertEqual(pq.read_table(io.BytesIO(data)).num_rows, 0)
+
+        response = self.client.get(reverse("accounts:export"), {"format": "xlsx"})
+        self.assertEqual(response.status_code, 404)
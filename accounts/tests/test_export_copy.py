@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import csv
+import io
+import zipfile
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from accounts.export import (
+    FILLUP_HEADER,
+    csv_chunks,
+    fillup_copy_chunks,
+    fillup_rows,
+    iter_export_archive,
+)
+from fillups.models import FillUp
+from vehicles.models import Vehicle
+
+
+def parse(data: bytes) -> list[list[str]]:
+    return list(csv.reader(io.StringIO(data.decode("utf-8"), newline="")))
+
+
+class CopyExportTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            email="copy@example.com", password="password123"
+        )
+        start = date.today() - timedelta(days=120)
+        notes = ["", "Line one\nline two", 'Said "hi", twice', "  padded  "]
+        for vehicle_index, name in enumerate(["Van", "Car"]):
+            vehicle = Vehicle.objects.create(user=self.user, name=name)
+            odometer = 5000 * (vehicle_index + 1)
+            for step in range(7):
+                odometer += 100 + 37 * step
+                FillUp.objects.create(
+                    vehicle=vehicle,
+                    date=start + timedelta(days=step * 11 + vehicle_index),
+                    odometer_km=odometer,
+                    station_name=["Main, Street", "Corner"][step % 2],
+                    fuel_brand=["Shell", "", "Élan"][step % 3],
+                    fuel_grade=["95", ""][step % 2],
+                    notes=notes[step % len(notes)],
+                    liters=Decimal(f"{10 + step}.25"),
+                    total_amount=Decimal(f"{20 + step * 3}.05"),
+                )
+        whole_second = datetime(2024, 5, 1, 8, 30, tzinfo=timezone.utc)
+        FillUp.objects.filter(pk=FillUp.objects.filter(user=self.user).first().pk).update(
+            created_at=whole_second
+        )
+
+    def test_copy_rows_match_python_rows(self) -> None:
+        expected = parse(b"".join(csv_chunks(FILLUP_HEADER, fillup_rows(self.user))))
+
+        rows = parse(b"".join(fillup_copy_chunks(self.user)))
+
+        self.assertEqual(len(rows), 15)
+        self.assertEqual(rows, expected)
+        self.assertIn("2024-05-01T08:30:00+00:00", [row[11] for row in rows])
+
+    def test_segments_cover_every_row_and_report_progress(self) -> None:
+        reported: list[int] = []
+
+        rows = parse(b"".join(fillup_copy_chunks(self.user, reported.append, segment_size=4)))
+
+        self.assertEqual(rows, parse(b"".join(fillup_copy_chunks(self.user))))
+        self.assertEqual(reported, [4, 8, 12, 14])
+
+    def test_archive_paths_agree(self) -> None:
+        archives = [
+            zipfile.ZipFile(io.BytesIO(b"".join(iter_export_archive(self.user, use_copy=use_copy))))
+            for use_copy in (False, True)
+        ]
+
+        python_rows, copy_rows = (parse(archive.read("fillups.csv")) for archive in archives)
+        self.assertEqual(copy_rows, python_rows)
+
+    def test_user_without_fillups(self) -> None:
+        other = get_user_model().objects.create_user(
+            email="empty@example.com", password="password123"
+        )
+
+        self.assertEqual(parse(b"".join(fillup_copy_chunks(other))), [FILLUP_HEADER])
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+import zipfile
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.export import iter_export_archive
+from accounts.jobs import prune_exports
+from accounts.models import DeletedRecord
+from fillups.models import FillUp
+from vehicles.models import Vehicle
+
+
+def read_archive(chunks) -> zipfile.ZipFile:
+    return zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+
+
+def fillup_ids(archive: zipfile.ZipFile) -> list[int]:
+    rows = list(csv.reader(io.StringIO(archive.read("fillups.csv").decode("utf-8"))))
+    return [int(row[0]) for row in rows[1:]]
+
+
+class DeltaExportTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            email="delta@example.com", password="password123"
+        )
+        self.car = Vehicle.objects.create(user=self.user, name="Car")
+        self.van = Vehicle.objects.create(user=self.user, name="Van")
+        start = date.today() - timedelta(days=60)
+        self.fills = {}
+        for vehicle in (self.car, self.van):
+            self.fills[vehicle.name] = [
+                FillUp.objects.create(
+                    vehicle=vehicle,
+                    date=start + timedelta(days=step * 10),
+                    odometer_km=1000 + step * 400,
+                    station_name="Main Street",
+                    liters=Decimal("30.00"),
+                    total_amount=Decimal("50.00"),
+                )
+                for step in range(4)
+            ]
+        self.since = timezone.now()
+        self.client.force_login(self.user)
+
+    def test_only_changes_and_deletions_after_since(self) -> None:
+        car_fills = self.fills["Car"]
+        car_fills[3].notes = "Edited"
+        car_fills[3].save()
+        added = FillUp.objects.create(
+            vehicle=self.car,
+            date=date.today(),
+            odometer_km=9000,
+            station_name="Main Street",
+            liters=Decimal("20.00"),
+            total_amount=Decimal("35.00"),
+        )
+        deleted_fill_id = car_fills[1].pk
+        car_fills[1].delete()
+        van_id = self.van.pk
+        van_fill_ids = [fill.pk for fill in self.fills["Van"]]
+        self.van.delete()
+
+        for use_copy in (False, True):
+            with self.subTest(use_copy=use_copy):
+                archive = read_archive(
+                    iter_export_archive(self.user, use_copy=use_copy, since=self.since)
+                )
+                # The fill after the deleted one measures from a new odometer.
+                self.assertEqual(
+                    fillup_ids(archive), [car_fills[2].pk, car_fills[3].pk, added.pk]
+                )
+                vehicles = archive.read("vehicles.csv").decode("utf-8").splitlines()
+                self.assertEqual(len(vehicles), 1)
+                manifest = json.loads(archive.read("manifest.json"))
+                self.assertEqual(manifest["deleted"]["vehicles"], [van_id])
+                self.assertEqual(
+                    manifest["deleted"]["fillups"], sorted([deleted_fill_id, *van_fill_ids])
+                )
+                self.assertEqual(manifest["since"], self.since.isoformat())
+
+    def test_derived_refresh_moves_changed_at_only(self) -> None:
+        successor = self.fills["Car"][2]
+
+        self.fills["Car"][1].delete()
+
+        refreshed = FillUp.objects.get(pk=successor.pk)
+        self.assertEqual(refreshed.updated_at, successor.updated_at)
+        self.assertGreater(refreshed.changed_at, self.since)
+        archive = read_archive(iter_export_archive(self.user, since=self.since))
+        self.assertEqual(fillup_ids(archive), [successor.pk])
+
+    @override_settings(ACCOUNT_EXPORT_DELTA_MARGIN_SECONDS=5)
+    def test_exported_at_precedes_open_writes(self) -> None:
+        writer = connections.create_connection("default")
+        self.addCleanup(writer.close)
+        writer.set_autocommit(False)
+        with writer.cursor() as cursor:
+            # Assigning a transaction id is enough to count as an open write.
+            cursor.execute("SELECT txid_current(), now()")
+            started = cursor.fetchone()[1]
+
+        archive = read_archive(iter_export_archive(self.user, since=self.since))
+
+        manifest = json.loads(archive.read("manifest.json"))
+        exported_at = datetime.fromisoformat(manifest["exported_at"])
+        self.assertLessEqual(exported_at, started - timedelta(seconds=5))
+        writer.rollback()
+
+    def test_full_export_has_no_manifest(self) -> None:
+        archive = read_archive(iter_export_archive(self.user))
+
+        self.assertNotIn("manifest.json", archive.namelist())
+        self.assertEqual(len(fillup_ids(archive)), 8)
+
+    def test_view_parses_and_bounds_since(self) -> None:
+        deleted_fill_id = self.fills["Van"][0].pk
+        self.fills["Van"][0].delete()
+
+        response = self.client.get(
+            reverse("accounts:export"), {"since": self.since.isoformat()}
+        )
+        archive = read_archive(response.streaming_content)
+        manifest = json.loads(archive.read("manifest.json"))
+        self.assertEqual(manifest["deleted"]["fillups"], [deleted_fill_id])
+
+        response = self.client.get(reverse("accounts:export"), {"since": "yesterday"})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse("accounts:export"), {"since": "2000-01-01"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_old_deletion_records_are_pruned(self) -> None:
+        self.fills["Car"][0].delete()
+        DeletedRecord.objects.update(deleted_at=timezone.now() - timedelta(days=365))
+        kept_id = self.fills["Car"][1].pk
+        self.fills["Car"][1].delete()
+
+        prune_exports()
+
+        self.assertEqual(
+            list(DeletedRecord.objects.values_list("object_id", flat=True)), [kept_id]
+        )
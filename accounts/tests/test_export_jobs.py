@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import io
+import os
+import tempfile
+import zipfile
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.jobs import (
+    artifact_path,
+    claim_next_job,
+    partial_path,
+    prune_exports,
+    run_job,
+    run_pending_jobs,
+)
+from accounts.models import ExportJob
+from fillups.models import FillUp
+from vehicles.models import Vehicle
+
+
+class ExportJobTests(TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+        settings_override = override_settings(ACCOUNT_EXPORT_DIR=self.tempdir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = get_user_model().objects.create_user(
+            email="jobs@example.com", password="password123"
+        )
+        vehicle = Vehicle.objects.create(user=self.user, name="Car")
+        for step in range(3):
+            FillUp.objects.create(
+                vehicle=vehicle,
+                date=date.today() - timedelta(days=20 - step * 5),
+                odometer_km=2000 + step * 300,
+                station_name="Main Street",
+                liters=Decimal("35.00"),
+                total_amount=Decimal("59.50"),
+            )
+        self.client.force_login(self.user)
+
+    def test_queued_export_is_built_and_downloaded(self) -> None:
+        response = self.client.post(reverse("accounts:export-jobs"))
+        job = ExportJob.objects.get(user=self.user)
+        self.assertRedirects(response, reverse("accounts:export-job", args=[job.pk]))
+        # Asking again while it is queued returns the same job.
+        self.client.post(reverse("accounts:export-jobs"))
+        self.assertEqual(ExportJob.objects.filter(user=self.user).count(), 1)
+
+        pending = self.client.get(reverse("accounts:export-job", args=[job.pk]))
+        self.assertContains(pending, 'http-equiv="refresh"')
+
+        self.assertEqual(run_pending_jobs(), 1)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ExportJob.Status.DONE)
+        self.assertEqual((job.rows_written, job.rows_total, job.percent_complete), (3, 3, 100))
+        done = self.client.get(reverse("accounts:export-job", args=[job.pk]))
+        self.assertContains(done, reverse("accounts:export-job-download", args=[job.pk]))
+
+        download = self.client.get(reverse("accounts:export-job-download", args=[job.pk]))
+        self.assertEqual(download["Content-Type"], "application/zip")
+        self.assertIn(job.file_name, download["Content-Disposition"])
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(download.streaming_content)))
+        self.assertEqual(len(archive.read("fillups.csv").decode("utf-8").splitlines()), 4)
+
+    def test_jobs_are_private(self) -> None:
+        job = ExportJob.objects.create(user=self.user)
+        run_pending_jobs()
+        other = get_user_model().objects.create_user(
+            email="jobs-other@example.com", password="password123"
+        )
+        self.client.force_login(other)
+
+        self.assertEqual(self.client.get(reverse("accounts:export-job", args=[job.pk])).status_code, 404)
+        self.assertEqual(
+            self.client.get(reverse("accounts:export-job-download", args=[job.pk])).status_code, 404
+        )
+
+    def test_abandoned_running_jobs_are_reclaimed(self) -> None:
+        job = ExportJob.objects.create(user=self.user)
+        self.assertEqual(claim_next_job().pk, job.pk)
+        self.assertIsNone(claim_next_job())
+
+        ExportJob.objects.filter(pk=job.pk).update(
+            updated_at=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(claim_next_job().pk, job.pk)
+
+    def test_reclaimed_job_ignores_its_previous_worker(self) -> None:
+        ExportJob.objects.create(user=self.user)
+        first = claim_next_job()
+        ExportJob.objects.filter(pk=first.pk).update(
+            updated_at=timezone.now() - timedelta(hours=1)
+        )
+        second = claim_next_job()
+        self.assertEqual((first.attempt, second.attempt), (1, 2))
+        self.assertNotEqual(partial_path(first), partial_path(second))
+
+        # The old worker wakes up: it neither finishes the job nor leaves files.
+        run_job(first)
+        second.refresh_from_db()
+        self.assertEqual(second.status, ExportJob.Status.RUNNING)
+        self.assertFalse(artifact_path(second).exists())
+        self.assertEqual(os.listdir(self.tempdir.name), [])
+
+        run_job(second)
+        second.refresh_from_db()
+        self.assertEqual(second.status, ExportJob.Status.DONE)
+        self.assertTrue(artifact_path(second).exists())
+        self.assertFalse(partial_path(second).exists())
+
+    def test_prune_removes_old_jobs_and_files(self) -> None:
+        old = ExportJob.objects.create(user=self.user)
+        fresh = ExportJob.objects.create(user=self.user)
+        run_pending_jobs()
+        ExportJob.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=2))
+        orphan = artifact_path(fresh).with_name("export-999999.zip")
+        orphan.write_bytes(b"stale")
+        stale = (timezone.now() - timedelta(days=2)).timestamp()
+        os.utime(orphan, (stale, stale))
+
+        self.assertEqual(prune_exports(timedelta(hours=24)), 1)
+
+        self.assertFalse(ExportJob.objects.filter(pk=old.pk).exists())
+        self.assertFalse(artifact_path(old).exists())
+        self.assertTrue(artifact_path(fresh).exists())
+        self.assertFalse(orphan.exists())
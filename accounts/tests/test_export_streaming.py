@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import csv
+import io
+import zipfile
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from accounts.export import csv_chunks, zip_stream
+from fillups.models import FillUp
+from vehicles.models import Vehicle
+
+
+class ZipStreamTests(SimpleTestCase):
+    def test_members_are_deflated_incrementally(self) -> None:
+        rows = ([index, f"row {index}" * 20] for index in range(3000))
+
+        pieces = list(
+            zip_stream(
+                [
+                    ("small.csv", csv_chunks(["id", "text"], [[1, "one"]])),
+                    ("large.csv", csv_chunks(["id", "text"], rows, batch_size=500)),
+                ]
+            )
+        )
+
+        self.assertGreater(len(pieces), 2)
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(pieces)))
+        self.assertIsNone(archive.testzip())
+        large = list(csv.reader(io.StringIO(archive.read("large.csv").decode("utf-8"))))
+        self.assertEqual(len(large), 3001)
+        self.assertEqual(large[-1], ["2999", "row 2999" * 20])
+        self.assertEqual(archive.read("small.csv").decode("utf-8"), "id,text\r\n1,one\r\n")
+
+
+class StreamingExportViewTests(TestCase):
+    def test_export_streams_every_fillup_in_order(self) -> None:
+        user = get_user_model().objects.create_user(
+            email="stream@example.com", password="password123"
+        )
+        start = date.today() - timedelta(days=100)
+        expected = []
+        for name in ("Car", "Van"):
+            vehicle = Vehicle.objects.create(user=user, name=name)
+            for step in range(5):
+                fill = FillUp.objects.create(
+                    vehicle=vehicle,
+                    date=start + timedelta(days=step * 9),
+                    odometer_km=1000 + step * 350,
+                    station_name="Main, Street",
+                    notes='Said "hello"',
+                    liters=Decimal("30.00"),
+                    total_amount=Decimal("51.00"),
+                )
+                expected.append(str(fill.pk))
+        self.client.force_login(user)
+
+        response = self.client.get(reverse("accounts:export"))
+
+        self.assertTrue(response.streaming)
+        self.assertIn("attachment;", response["Content-Disposition"])
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+        rows = list(csv.reader(io.StringIO(archive.read("fillups.csv").decode("utf-8"))))
+        self.assertEqual([row[0] for row in rows[1:]], expected)
+        self.assertEqual((rows[1][4], rows[1][10]), ("Main, Street", 'Said "hello"'))
+        self.assertEqual(rows[2][14:], ["350", "8.6", "0.15"])
@@ -5,6 +5,9 @@ from .views import (
     SignoutView,
     SignupView,
     account_delete_view,
+    account_export_job_download_view,
+    account_export_job_view,
+    account_export_jobs_view,
     account_export_view,
 )
 
@@ -15,5 +18,12 @@ urlpatterns = [
     path("auth/signin", SigninView.as_view(), name="signin"),
     path("auth/signout", SignoutView.as_view(), name="signout"),
     path("account/export", account_export_view, name="export"),
+    path("account/export/jobs", account_export_jobs_view, name="export-jobs"),
+    path("account/export/jobs/<int:pk>", account_export_job_view, name="export-job"),
+    path(
+        "account/export/jobs/<int:pk>/download",
+        account_export_job_download_view,
+        name="export-job-download",
+    ),
     path("account/delete", account_delete_view, name="delete"),
 ]
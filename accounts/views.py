@@ -1,24 +1,28 @@
 from __future__ import annotations
 
-import csv
-import io
-import zipfile
-from decimal import Decimal, ROUND_HALF_UP
-
 from django.contrib import messages
 from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.views import LoginView, LogoutView
-from django.http import HttpRequest, HttpResponse
-from django.shortcuts import redirect, render
-from django.utils import timezone
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpRequest,
+    HttpResponse,
+    HttpResponseBadRequest,
+    StreamingHttpResponse,
+)
+from django.shortcuts import get_object_or_404, redirect, render
 from django.views import View
 from django.views.decorators.http import require_http_methods
 
 from audit.models import AuthEvent
 from core.logging import cv_correlation_id
+from .columnar import HAS_PYARROW, iter_parquet_archive
+from .export import delta_horizon, export_filename, iter_export_archive, parse_since
 from .forms import EmailAuthenticationForm, SignupForm
-from fillups.models import FillUp
+from .jobs import artifact_path, enqueue_export
+from .models import ExportJob
 
 
 class SignupView(View):
@@ -90,146 +94,58 @@ def _get_correlation_id(request: HttpRequest) -> str:
     return ""
 
 
-def _format_decimal(value: Decimal | None, fmt: str) -> str:
-    if value is None:
-        return ""
-    return format(value, fmt)
-
-
 @login_required
-def account_export_view(request: HttpRequest) -> HttpResponse:
+def account_export_view(request: HttpRequest) -> HttpResponse | StreamingHttpResponse:
     user = request.user
+    export_format = request.GET.get("format", "csv")
+    since = None
+    if request.GET.get("since"):
+        try:
+            since = parse_since(request.GET["since"])
+        except ValueError:
+            return HttpResponseBadRequest("since must be an ISO 8601 date or timestamp")
+        if since < delta_horizon():
+            return HttpResponseBadRequest(
+                "since is older than the deletion history kept; run a full export"
+            )
+    if export_format == "csv":
+        chunks = iter_export_archive(user, since=since)
+    elif export_format == "parquet" and HAS_PYARROW:
+        chunks = iter_parquet_archive(user, since=since)
+    else:
+        raise Http404("Unsupported export format")
+    response = StreamingHttpResponse(chunks, content_type="application/zip")
+    filename = export_filename(user, export_format)
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
 
-    vehicles = user.vehicles.order_by("id")
-    fillups = (
-        FillUp.objects.filter(user=user)
-        .select_related("vehicle")
-        .order_by("vehicle_id", "date", "id")
-    )
-
-    vehicle_buffer = io.StringIO()
-    vehicle_writer = csv.writer(vehicle_buffer)
-    vehicle_writer.writerow(
-        [
-            "id",
-            "name",
-            "make",
-            "model",
-            "year",
-            "fuel_type",
-            "created_at",
-            "updated_at",
-        ]
-    )
-
-    for vehicle in vehicles:
-        vehicle_writer.writerow(
-            [
-                vehicle.id,
-                vehicle.name,
-                vehicle.make,
-                vehicle.model,
-                vehicle.year or "",
-                vehicle.fuel_type,
-                vehicle.created_at.isoformat(),
-                vehicle.updated_at.isoformat(),
-            ]
-        )
-
-    fillup_buffer = io.StringIO()
-    fillup_writer = csv.writer(fillup_buffer)
-    fillup_writer.writerow(
-        [
-            "id",
-            "vehicle_id",
-            "date",
-            "odometer_km",
-            "station",
-            "fuel_brand",
-            "fuel_grade",
-            "liters",
-            "total_currency_amount",
-            "currency",
-            "notes",
-            "created_at",
-            "updated_at",
-            "unit_price_per_liter",
-            "distance_since_last_km",
-            "consumption_l_per_100km",
-            "cost_per_km",
-        ]
-    )
-
-    currency_code = getattr(getattr(user, "profile", None), "currency", "USD")
-    prev_fillup_by_vehicle: dict[int, FillUp] = {}
-
-    for fillup in fillups:
-        previous = prev_fillup_by_vehicle.get(fillup.vehicle_id)
-        distance_since_last: int | None = None
-        consumption: Decimal | None = None
-        cost_per_km: Decimal | None = None
-
-        liters = fillup.liters
-        total_amount = fillup.total_amount
 
-        unit_price: Decimal | None = None
-        if liters > 0:
-            unit_price = (total_amount / liters).quantize(
-                Decimal("0.01"), rounding=ROUND_HALF_UP
-            )
+@login_required
+@require_http_methods(["GET", "POST"])
+def account_export_jobs_view(request: HttpRequest) -> HttpResponse:
+    if request.method == "POST":
+        job = enqueue_export(request.user)
+        return redirect("accounts:export-job", pk=job.pk)
+    jobs = request.user.export_jobs.all()[:10]
+    return render(request, "accounts/export_jobs.html", {"jobs": jobs})
 
-        if previous is not None:
-            distance_delta = fillup.odometer_km - previous.odometer_km
-            if distance_delta > 0:
-                distance_since_last = distance_delta
-                distance_decimal = Decimal(distance_delta)
-
-                if liters > 0:
-                    consumption = (
-                        (liters * Decimal("100")) / distance_decimal
-                    ).quantize(Decimal("0.1"), rounding=ROUND_HALF_UP)
-
-                if total_amount > 0:
-                    cost_per_km = (total_amount / distance_decimal).quantize(
-                        Decimal("0.01"), rounding=ROUND_HALF_UP
-                    )
-
-        prev_fillup_by_vehicle[fillup.vehicle_id] = fillup
-
-        fillup_writer.writerow(
-            [
-                fillup.id,
-                fillup.vehicle_id,
-                fillup.date.isoformat(),
-                fillup.odometer_km,
-                fillup.station_name,
-                fillup.fuel_brand,
-                fillup.fuel_grade,
-                format(liters, ".2f"),
-                format(total_amount, ".2f"),
-                currency_code,
-                fillup.notes,
-                fillup.created_at.isoformat(),
-                fillup.updated_at.isoformat(),
-                _format_decimal(unit_price, ".2f"),
-                distance_since_last or "",
-                _format_decimal(consumption, ".1f"),
-                _format_decimal(cost_per_km, ".2f"),
-            ]
-        )
 
-    zip_buffer = io.BytesIO()
-    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as archive:
-        archive.writestr("vehicles.csv", vehicle_buffer.getvalue())
-        archive.writestr("fillups.csv", fillup_buffer.getvalue())
+@login_required
+def account_export_job_view(request: HttpRequest, pk: int) -> HttpResponse:
+    job = get_object_or_404(ExportJob, pk=pk, user=request.user)
+    return render(request, "accounts/export_job.html", {"job": job})
 
-    zip_buffer.seek(0)
-    today = timezone.now().date().strftime("%Y%m%d")
-    filename = f"fuel_tracker_export_{user.id}_{today}.zip"
 
-    response = HttpResponse(zip_buffer.getvalue(), content_type="application/zip")
-    response["Content-Disposition"] = f'attachment; filename="{filename}"'
-    return response
+@login_required
+def account_export_job_download_view(request: HttpRequest, pk: int) -> FileResponse:
+    job = get_object_or_404(ExportJob, pk=pk, user=request.user, status=ExportJob.Status.DONE)
+    try:
+        handle = artifact_path(job).open("rb")
+    except FileNotFoundError as exc:
+        raise Http404("Export file has expired") from exc
+    return FileResponse(
+        handle, as_attachment=True, filename=job.file_name, content_type="application/zip"
+    )
 
 
 @login_required
@@ -29,6 +29,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "accounts.apps.AccountsConfig",
     "audit.apps.AuditConfig",
     "core",
@@ -115,6 +116,46 @@ SESSION_COOKIE_SECURE = os.environ.get("DJANGO_SESSION_COOKIE_SECURE", "false").
 CSRF_COOKIE_SECURE = os.environ.get("DJANGO_CSRF_COOKIE_SECURE", "false").lower() == "true"
 SECURE_SSL_REDIRECT = os.environ.get("DJANGO_SECURE_SSL_REDIRECT", "false").lower() == "true"
 
+# Statistics backend: "python", "numpy" (needs the optional numpy package) or
+# "auto", which switches to numpy from FILLUP_NUMPY_MIN_ROWS fill-ups on.
+FILLUP_STATS_BACKEND = os.environ.get("FILLUP_STATS_BACKEND", "auto").lower()
+FILLUP_NUMPY_MIN_ROWS = int(os.environ.get("FILLUP_NUMPY_MIN_ROWS", "20000"))
+
+# Statistics charts are downsampled (LTTB) to at most this many points.
+FILLUP_CHART_MAX_POINTS = int(os.environ.get("FILLUP_CHART_MAX_POINTS", "300"))
+
+# Metrics/Statistics results are cached per (user, data version, day, params):
+# a bounded in-process LRU in front of the shared cache alias below, which all
+# workers read. Set FILLUP_RESULT_CACHE_ALIAS to "" to keep the LRU tier only.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "results": {
+        "BACKEND": os.environ.get(
+            "FILLUP_RESULT_CACHE_BACKEND", "django.core.cache.backends.db.DatabaseCache"
+        ),
+        "LOCATION": os.environ.get("FILLUP_RESULT_CACHE_LOCATION", "fillup_result_cache"),
+    },
+}
+FILLUP_RESULT_CACHE_ALIAS = os.environ.get("FILLUP_RESULT_CACHE_ALIAS", "results")
+FILLUP_RESULT_CACHE_LRU_ENTRIES = int(os.environ.get("FILLUP_RESULT_CACHE_LRU_ENTRIES", "256"))
+FILLUP_RESULT_CACHE_TIMEOUT = int(os.environ.get("FILLUP_RESULT_CACHE_TIMEOUT", "86400"))
+
+# Background account exports are written here by `manage.py run_export_jobs`
+# and pruned, with their job rows, once older than the maximum age.
+ACCOUNT_EXPORT_DIR = Path(os.environ.get("ACCOUNT_EXPORT_DIR", BASE_DIR / "var" / "exports"))
+ACCOUNT_EXPORT_MAX_AGE_HOURS = int(os.environ.get("ACCOUNT_EXPORT_MAX_AGE_HOURS", "24"))
+# Deleted ids are kept this long for delta exports (?since=...); older
+# ``since`` values are refused.
+ACCOUNT_EXPORT_TOMBSTONE_DAYS = int(os.environ.get("ACCOUNT_EXPORT_TOMBSTONE_DAYS", "90"))
+# A delta export's ``exported_at`` is moved back by this much on top of the
+# oldest write still open, so rows stamped just before their transaction
+# began are not skipped by the next delta.
+ACCOUNT_EXPORT_DELTA_MARGIN_SECONDS = int(
+    os.environ.get("ACCOUNT_EXPORT_DELTA_MARGIN_SECONDS", "60")
+)
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -7,6 +7,7 @@ from core import views
 urlpatterns = [
     path("", views.home_view, name="home"),
     path("health", views.health_view, name="health"),
+    path("health/result-cache", views.result_cache_view, name="health-result-cache"),
     path(
         "legal/terms",
         TemplateView.as_view(template_name="legal/terms.html"),
@@ -2,13 +2,16 @@
 from __future__ import annotations
 
 import time
-from typing import Iterable
 
 from django.contrib.auth import get_user_model
 from django.core.management.base import BaseCommand, CommandError
 
+from fillups.counters import fillup_count
+from fillups.loaders import project_history
 from fillups.metrics import aggregate_metrics
 from fillups.models import FillUp
+from fillups.series import FillSeries
+from fillups.vectorized import BACKEND_CHOICES, ArraySeries, load_series
 from fillups.stats import (
     brand_grade_summary,
     timeseries_consumption,
@@ -26,6 +29,12 @@ class Command(BaseCommand):
             default="all",
             help="Vehicle ID to scope queries to, or 'all' for every vehicle (default)",
         )
+        parser.add_argument(
+            "--backend",
+            choices=BACKEND_CHOICES,
+            default=None,
+            help="Statistics backend (defaults to the FILLUP_STATS_BACKEND setting)",
+        )
 
     def handle(self, *args, **options):
         email: str = options["email"].strip().lower()
@@ -54,22 +63,16 @@ class Command(BaseCommand):
             filters["vehicle_id"] = vehicle_id
             vehicle_label = str(vehicle_id)
 
-        history_qs = (
-            FillUp.objects.filter(**filters)
-            .select_related("vehicle")
-            .order_by("-date", "-id")
-        )
+        history_qs = project_history(FillUp.objects.filter(**filters)).order_by("-date", "-id")
         start = time.monotonic()
         history_rows = list(history_qs[:50])
         history_elapsed = (time.monotonic() - start) * 1000
 
-        stats_qs = (
-            FillUp.objects.filter(**filters)
-            .select_related("vehicle")
-            .order_by("vehicle_id", "date", "id")
-        )
+        row_count = fillup_count(user, filters.get("vehicle_id"))
         start = time.monotonic()
-        stats_rows = list(stats_qs)
+        stats_rows = load_series(
+            FillUp.objects.filter(**filters), row_count=row_count, backend=options["backend"]
+        )
         stats_elapsed = (time.monotonic() - start) * 1000
 
         start = time.monotonic()
@@ -81,6 +84,8 @@ class Command(BaseCommand):
         )
         self.stdout.write(f"User: {email}")
         self.stdout.write(f"Vehicle scope: {vehicle_label}")
+        backend = "numpy" if isinstance(stats_rows, ArraySeries) else "python"
+        self.stdout.write(f"Statistics backend: {backend}")
         self.stdout.write(
             f"History query: fetched {len(history_rows)} rows in {history_elapsed:.1f} ms",
         )
@@ -91,9 +96,8 @@ class Command(BaseCommand):
             f"Statistics helpers (aggregates & series): {helper_elapsed:.1f} ms",
         )
 
-    def _run_statistics_helpers(self, entries: Iterable[FillUp]) -> None:
-        entries_list = list(entries)
-        aggregate_metrics(entries_list)
-        brand_grade_summary(entries_list)
-        timeseries_cost_per_liter(entries_list)
-        timeseries_consumption(entries_list)
+    def _run_statistics_helpers(self, series: FillSeries | ArraySeries) -> None:
+        aggregate_metrics(series)
+        brand_grade_summary(series)
+        timeseries_cost_per_liter(series)
+        timeseries_consumption(series)
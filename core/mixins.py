@@ -1,7 +1,15 @@
-"""Reusable mixins for enforcing per-user data ownership."""
+"""Reusable mixins for per-user views: data ownership and conditional GET."""
 from __future__ import annotations
 
+import hashlib
+from datetime import date
+
+from django.contrib.messages import get_messages
 from django.http import Http404
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+
+from .versions import data_version
 
 
 class OwnedQuerysetMixin:
@@ -28,3 +36,43 @@ class OwnedQuerysetMixin:
         if owner is not None and owner != self.request.user:
             raise Http404()
         return obj
+
+
+class DataVersionETagMixin:
+    """Answer repeated GETs of an unchanged page with ``304 Not Modified``.
+
+    The ETag hashes the view, the user's data version (bumped by every
+    fill-up, vehicle and profile write, so preferences are covered too), the
+    date, the query string and the CSRF cookie the page's forms embed. It is
+    checked in ``dispatch`` before the view runs any of its own queries.
+    Pages carrying flash messages are never validated.
+    """
+
+    def get_etag(self, request) -> str | None:
+        if len(get_messages(request)):
+            return None
+        parts = [
+            type(self).__name__,
+            str(request.user.pk),
+            str(data_version(request.user)),
+            date.today().isoformat(),
+            repr(sorted(request.GET.lists())),
+            request.META.get("CSRF_COOKIE", ""),
+        ]
+        return quote_etag(hashlib.sha1("|".join(parts).encode()).hexdigest())
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD") or not request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)  # type: ignore[misc]
+        etag = self.get_etag(request)
+        if etag is None:
+            return super().dispatch(request, *args, **kwargs)  # type: ignore[misc]
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)  # type: ignore[misc]
+        if response.status_code in (200, 304):
+            response.headers.setdefault("ETag", etag)
+            # Browsers keep the page but revalidate it on every visit.
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
@@ -1,6 +1,7 @@
 """Database models for the core app."""
 from __future__ import annotations
 
+from django.conf import settings
 from django.db import models
 
 
@@ -19,3 +20,28 @@ class BaselineSeed(models.Model):
 
     def __str__(self) -> str:  # pragma: no cover - representation helper
         return f"BaselineSeed<{self.pk}>"
+
+
+class UserDataVersion(models.Model):
+    """Monotonic per-user counter of writes to fill-ups, vehicles and the profile.
+
+    Bumped by the write receivers in ``core.signals`` inside the writing
+    transaction, so results computed from a user's data can be cached under
+    ``(user, version, params)`` and never outlive a change.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="data_version",
+    )
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "User data version"
+        verbose_name_plural = "User data versions"
+
+    def __str__(self) -> str:  # pragma: no cover - representation helper
+        return f"UserDataVersion<{self.user_id}:{self.version}>"
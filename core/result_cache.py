@@ -0,0 +1,127 @@
+"""Two-tier cache for results computed from a user's data.
+
+Entries are keyed by the user, their data version (see ``core.versions``),
+the current date and the caller's parameters, so a write or a change of day
+simply moves readers to a new key; nothing is ever invalidated explicitly.
+Lookups try a bounded in-process LRU first and then the shared Django cache
+named by ``FILLUP_RESULT_CACHE_ALIAS``, which every worker can read. Cached
+values are shared between requests and must be treated as read-only.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Callable, Hashable, TypeVar
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .versions import data_version
+
+T = TypeVar("T")
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe mapping that drops the least recently used entry when full."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            try:
+                self._entries.move_to_end(key)
+            except KeyError:
+                return default
+            return self._entries[key]
+
+    def set(self, key: str, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_local = LRUCache(settings.FILLUP_RESULT_CACHE_LRU_ENTRIES)
+_counters = {"local_hits": 0, "shared_hits": 0, "misses": 0}
+_counters_lock = threading.Lock()
+
+
+def _count(name: str) -> None:
+    with _counters_lock:
+        _counters[name] += 1
+
+
+def _shared_cache():
+    alias = settings.FILLUP_RESULT_CACHE_ALIAS
+    return caches[alias] if alias else None
+
+
+def result_key(user, namespace: str, params: Hashable) -> str:
+    """Return the cache key of ``namespace`` results for ``user`` and ``params``.
+
+    The version is read before the caller computes anything, so a value
+    stored under it is never older than the data it is keyed by.
+    """
+
+    digest = hashlib.sha1(repr(params).encode()).hexdigest()
+    return f"results:{namespace}:{user.pk}:{data_version(user)}:{date.today().isoformat()}:{digest}"
+
+
+def cached_result(user, namespace: str, params: Hashable, compute: Callable[[], T]) -> T:
+    """Return ``compute()`` for ``user`` and ``params``, reusing a cached copy."""
+
+    key = result_key(user, namespace, params)
+    value = _local.get(key, _MISSING)
+    if value is not _MISSING:
+        _count("local_hits")
+        return value
+
+    shared = _shared_cache()
+    if shared is not None:
+        value = shared.get(key, _MISSING)
+        if value is not _MISSING:
+            _count("shared_hits")
+            _local.set(key, value)
+            return value
+
+    _count("misses")
+    value = compute()
+    _local.set(key, value)
+    if shared is not None:
+        shared.set(key, value, settings.FILLUP_RESULT_CACHE_TIMEOUT)
+    return value
+
+
+def cache_stats() -> dict[str, int]:
+    """Return this process's hit/miss counters and LRU size."""
+
+    with _counters_lock:
+        stats = dict(_counters)
+    stats["local_entries"] = len(_local)
+    return stats
+
+
+def clear() -> None:
+    """Empty the in-process tier and reset the counters (the shared tier is kept)."""
+
+    _local.clear()
+    with _counters_lock:
+        for name in _counters:
+            _counters[name] = 0
@@ -0,0 +1,40 @@
+"""Write receivers that bump the per-user data version."""
+from __future__ import annotations
+
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from fillups.models import FillUp
+from profiles.models import Profile
+from vehicles.models import Vehicle
+
+from . import versions
+
+
+def _deleted_directly(origin, model) -> bool:
+    """Return whether a delete started from ``model`` rather than a parent cascade."""
+
+    if isinstance(origin, QuerySet):
+        return origin.model is model
+    return isinstance(origin, model)
+
+
+@receiver(post_save, sender=FillUp)
+@receiver(post_save, sender=Vehicle)
+@receiver(post_save, sender=Profile)
+def bump_after_save(sender, instance, raw: bool = False, **kwargs) -> None:
+    if raw:
+        return
+    versions.bump(instance.user_id)
+
+
+@receiver(post_delete, sender=FillUp)
+@receiver(post_delete, sender=Vehicle)
+@receiver(post_delete, sender=Profile)
+def bump_after_delete(sender, instance, origin=None, **kwargs) -> None:
+    # A vehicle delete bumps once for its cascaded fill-ups; an account delete
+    # removes the version row together with the user.
+    if not _deleted_directly(origin, sender):
+        return
+    versions.bump(instance.user_id)
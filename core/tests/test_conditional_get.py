@@ -0,0 +1,74 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from fillups.models import FillUp
+from vehicles.models import Vehicle
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            email="etag@example.com", password="password123"
+        )
+        self.client.force_login(self.user)
+        self.vehicle = Vehicle.objects.create(user=self.user, name="Car")
+        self._fill(0)
+
+    def _fill(self, step: int) -> FillUp:
+        return FillUp.objects.create(
+            vehicle=self.vehicle,
+            date=date.today() - timedelta(days=30 - step * 10),
+            odometer_km=8000 + step * 420,
+            station_name="Main Street",
+            liters=Decimal("41.00"),
+            total_amount=Decimal("66.00"),
+        )
+
+    def _etag(self, name: str, params: dict | None = None) -> str:
+        response = self.client.get(reverse(name), params or {})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("no-cache", response["Cache-Control"])
+        return response["ETag"]
+
+    def test_unchanged_pages_answer_not_modified_before_any_work(self) -> None:
+        for name in ("history-list", "metrics", "statistics"):
+            with self.subTest(view=name):
+                # The first visit sets the CSRF cookie that History's forms embed.
+                self._etag(name)
+                etag = self._etag(name)
+                self.assertEqual(self._etag(name), etag)
+                # Session, user and the data version only.
+                with self.assertNumQueries(3):
+                    response = self.client.get(reverse(name), HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response["ETag"], etag)
+                self.assertEqual(response.content, b"")
+
+    def test_writes_and_parameters_change_the_etag(self) -> None:
+        etag = self._etag("metrics")
+
+        self.assertNotEqual(self._etag("metrics", {"window": "90"}), etag)
+        self.assertNotEqual(self._etag("statistics"), etag)
+
+        self._fill(1)
+        response = self.client.get(reverse("metrics"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        profile = self.user.profile
+        profile.distance_unit = "mi"
+        profile.save()
+        fresh = self._etag("metrics")
+        profile.distance_unit = "km"
+        profile.save()
+        self.assertNotEqual(self._etag("metrics"), fresh)
+
+    def test_anonymous_requests_still_redirect(self) -> None:
+        self.client.logout()
+
+        response = self.client.get(reverse("history-list"), HTTP_IF_NONE_MATCH='"anything"')
+
+        self.assertEqual(response.status_code, 302)
@@ -0,0 +1,100 @@
+import io
+from contextlib import contextmanager
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import TestCase
+
+from core.models import UserDataVersion
+from core.versions import data_version
+from fillups.importer import import_fillups
+from fillups.models import FillUp
+from vehicles.models import Vehicle
+
+
+class UserDataVersionTests(TestCase):
+    def setUp(self) -> None:
+        User = get_user_model()
+        self.user = User.objects.create_user(email="version@example.com", password="password123")
+        self.other = User.objects.create_user(email="bystander@example.com", password="password123")
+        self.vehicle = Vehicle.objects.create(user=self.user, name="Car")
+        self.start = date.today() - timedelta(days=60)
+
+    def _fill(self, step: int, vehicle: Vehicle | None = None) -> FillUp:
+        return FillUp.objects.create(
+            vehicle=vehicle or self.vehicle,
+            date=self.start + timedelta(days=step * 7),
+            odometer_km=10000 + step * 400,
+            station_name="Main Street",
+            liters=Decimal("40.00"),
+            total_amount=Decimal("70.00"),
+        )
+
+    @contextmanager
+    def assertBumps(self, count: int):
+        before = data_version(self.user)
+        other_before = data_version(self.other)
+        yield
+        self.assertEqual(data_version(self.user) - before, count)
+        self.assertEqual(data_version(self.other), other_before)
+
+    def test_fillup_writes_bump_once_each(self) -> None:
+        with self.assertBumps(1):
+            fill = self._fill(0)
+        with self.assertBumps(1):
+            fill.station_name = "Harbour Road"
+            fill.save()
+        with self.assertBumps(1):
+            fill.delete()
+
+    def test_vehicle_and_profile_writes_bump(self) -> None:
+        with self.assertBumps(1):
+            Vehicle.objects.create(user=self.user, name="Van")
+        with self.assertBumps(1):
+            self.vehicle.make = "Acme"
+            self.vehicle.save()
+        with self.assertBumps(1):
+            profile = self.user.profile
+            profile.currency = "EUR"
+            profile.save()
+
+    def test_vehicle_delete_bumps_once_for_its_fillups(self) -> None:
+        for step in range(3):
+            self._fill(step)
+
+        with self.assertBumps(1):
+            self.vehicle.delete()
+
+    def test_bulk_import_bumps_once(self) -> None:
+        # The import bypasses the save receivers, so it bumps explicitly.
+        self._fill(5)
+        text = "vehicle,date,odometer,station,volume,total_amount\n" + "".join(
+            f"Car,{self.start + timedelta(days=step)},{9000 + step},Depot,30.00,50.00\n"
+            for step in range(3)
+        )
+
+        with self.assertBumps(1):
+            result = import_fillups(self.user, io.StringIO(text))
+
+        self.assertEqual(result.created, 3)
+
+    def test_bump_rolls_back_with_the_write(self) -> None:
+        before = data_version(self.user)
+
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                self._fill(0)
+                raise RuntimeError("abort")
+
+        self.assertEqual(data_version(self.user), before)
+
+    def test_account_delete_removes_the_version(self) -> None:
+        self._fill(0)
+        user_id = self.user.pk
+
+        self.user.delete()
+
+        self.assertFalse(UserDataVersion.objects.filter(user_id=user_id).exists())
+        self.assertEqual(data_version(self.other), 1)
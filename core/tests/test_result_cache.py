@@ -0,0 +1,117 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import result_cache
+from core.result_cache import LRUCache, cache_stats, cached_result
+from fillups.models import FillUp
+from vehicles.models import Vehicle
+
+
+class LRUCacheTests(TestCase):
+    def test_evicts_least_recently_used(self) -> None:
+        cache = LRUCache(2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(len(cache), 2)
+
+
+class ResultCacheStatsViewTests(TestCase):
+    def test_counters_are_staff_only(self) -> None:
+        User = get_user_model()
+        url = reverse("health-result-cache")
+
+        self.assertNotIn("result_cache", self.client.get(reverse("health")).json())
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.force_login(User.objects.create_user(email="u@example.com", password="pw"))
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_login(
+            User.objects.create_user(email="s@example.com", password="pw", is_staff=True)
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("misses", response.json()["result_cache"])
+
+
+class CachedResultTests(TestCase):
+    def setUp(self) -> None:
+        result_cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="cache@example.com", password="password123"
+        )
+        self.vehicle = Vehicle.objects.create(user=self.user, name="Car")
+        self.calls = 0
+
+    def _compute(self) -> dict:
+        self.calls += 1
+        return {"calls": self.calls}
+
+    def _fill(self, step: int) -> FillUp:
+        return FillUp.objects.create(
+            vehicle=self.vehicle,
+            date=date.today() - timedelta(days=40 - step * 10),
+            odometer_km=5000 + step * 450,
+            station_name="Main Street",
+            liters=Decimal("38.00"),
+            total_amount=Decimal(f"{60 + step}.00"),
+        )
+
+    def test_tiers_and_counters(self) -> None:
+        self.assertEqual(cached_result(self.user, "test", ("a",), self._compute), {"calls": 1})
+        self.assertEqual(cached_result(self.user, "test", ("a",), self._compute), {"calls": 1})
+        # A fresh worker still finds the value in the shared tier.
+        result_cache._local.clear()
+        self.assertEqual(cached_result(self.user, "test", ("a",), self._compute), {"calls": 1})
+        cached_result(self.user, "test", ("b",), self._compute)
+
+        stats = cache_stats()
+        self.assertEqual(
+            (stats["local_hits"], stats["shared_hits"], stats["misses"]), (1, 1, 2)
+        )
+        self.assertEqual(self.calls, 2)
+
+    def test_writes_move_to_a_new_key(self) -> None:
+        cached_result(self.user, "test", (), self._compute)
+        self._fill(0)
+
+        self.assertEqual(cached_result(self.user, "test", (), self._compute), {"calls": 2})
+
+    @override_settings(FILLUP_RESULT_CACHE_ALIAS="")
+    def test_local_tier_alone(self) -> None:
+        cached_result(self.user, "test", (), self._compute)
+        cached_result(self.user, "test", (), self._compute)
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(cache_stats()["local_hits"], 1)
+
+    def test_metrics_and_statistics_views_reuse_results_until_a_write(self) -> None:
+        self.client.force_login(self.user)
+        for step in range(3):
+            self._fill(step)
+
+        for name in ("metrics", "statistics"):
+            with self.subTest(view=name):
+                result_cache.clear()
+                caches["results"].clear()
+                first = self.client.get(reverse(name), {"window": "90"})
+                with self.assertNumQueries(6):
+                    # Session, user, the data version (ETag and cache key),
+                    # profile and the vehicle selector.
+                    second = self.client.get(reverse(name), {"window": "90"})
+                self.assertEqual(first.content, second.content)
+                self.assertEqual(cache_stats()["local_hits"], 1)
+
+        before = self.client.get(reverse("metrics"), {"window": "90"})
+        self._fill(3)
+        after = self.client.get(reverse("metrics"), {"window": "90"})
+        self.assertNotEqual(before.context["rolling_metrics"], after.context["rolling_metrics"])
@@ -0,0 +1,44 @@
+"""Per-user data versions used to key cached results.
+
+Saves and deletes of ``FillUp``, ``Vehicle`` and ``Profile`` bump the version
+through the receivers in :mod:`core.signals`, and the fill-up maintenance
+helpers (``derived``, ``cumulative``, ``rollups``, ``counters``,
+``vocabulary``) only run inside those writes. Any other writer that bypasses
+the receivers -- ``QuerySet.update``, ``bulk_create``/``bulk_update``, raw SQL
+or ``COPY``, such as ``fillups.importer`` -- must call :func:`bump` for each
+affected user in the same transaction.
+"""
+from __future__ import annotations
+
+from django.db import connection
+
+from .models import UserDataVersion
+
+
+_BUMP_SQL = """
+INSERT INTO {table} (user_id, version, updated_at)
+VALUES (%(user)s, 1, NOW())
+ON CONFLICT (user_id)
+DO UPDATE SET version = {table}.version + 1, updated_at = NOW()
+"""
+
+
+def bump(user_id: int) -> None:
+    """Advance the data version of ``user_id`` in the current transaction.
+
+    A single upsert, so concurrent first writes of a user still each move the
+    version instead of racing to create the row.
+    """
+
+    table = connection.ops.quote_name(UserDataVersion._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(_BUMP_SQL.format(table=table), {"user": user_id})
+
+
+def data_version(user) -> int:
+    """Return the current data version of ``user`` (``0`` before any write)."""
+
+    version = (
+        UserDataVersion.objects.filter(user=user).values_list("version", flat=True).first()
+    )
+    return version or 0
@@ -1,6 +1,8 @@
 """Views for the bootstrap service."""
 from __future__ import annotations
 
+from django.contrib.auth.decorators import login_required
+from django.core.exceptions import PermissionDenied
 from django.db import connection
 from django.db.migrations.exceptions import MigrationSchemaMissing
 from django.db.migrations.executor import MigrationExecutor
@@ -8,6 +10,7 @@ from django.http import HttpRequest, HttpResponse, JsonResponse
 from django.shortcuts import render
 
 from core.models import BaselineSeed
+from core.result_cache import cache_stats
 
 
 def home_view(request: HttpRequest) -> HttpResponse:
@@ -57,10 +60,22 @@ def health_view(request: HttpRequest) -> JsonResponse:
     status_code = 200 if is_healthy else 503
     status_label = "ok" if is_healthy else "degraded"
 
-    payload: dict[str, object] = {"status": status_label, "db": db_state}
+    payload: dict[str, object] = {
+        "status": status_label,
+        "db": db_state,
+    }
 
     if reasons:
         deduped_reasons = list(dict.fromkeys(reasons))
         payload["reason"] = "; ".join(deduped_reasons)
 
     return JsonResponse(payload, status=status_code)
+
+
+@login_required
+def result_cache_view(request: HttpRequest) -> JsonResponse:
+    """Staff-only hit/miss counters of this worker's result cache."""
+
+    if not request.user.is_staff:
+        raise PermissionDenied
+    return JsonResponse({"result_cache": cache_stats()})
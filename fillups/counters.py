@@ -0,0 +1,82 @@
+"""Maintenance and lookup helpers for cached per-user and per-vehicle fill-up counts."""
+from __future__ import annotations
+
+from collections import Counter
+from typing import Mapping
+
+from django.db.models import Count, F
+
+from .models import FillUp, FillUpCounter
+
+
+def counter_keys(state: Mapping | None) -> Counter:
+    """Return the ``(user_id, vehicle_id)`` counters a fill-up state contributes to.
+
+    ``vehicle_id`` is ``None`` for the user's overall total.
+    """
+
+    keys: Counter = Counter()
+    if not state:
+        return keys
+    keys[(state["user_id"], None)] += 1
+    keys[(state["user_id"], state["vehicle_id"])] += 1
+    return keys
+
+
+def apply_change(previous: Mapping | None, current: Mapping | None) -> None:
+    """Move counts from the ``previous`` fill-up state to ``current``.
+
+    Either side may be ``None`` for inserts and deletes; edits that keep the
+    vehicle leave every counter untouched.
+    """
+
+    added = counter_keys(current)
+    removed = counter_keys(previous)
+    added, removed = added - removed, removed - added
+
+    for (user_id, vehicle_id), count in added.items():
+        entry, created = FillUpCounter.objects.get_or_create(
+            user_id=user_id,
+            vehicle_id=vehicle_id,
+            defaults={"fillup_count": count},
+        )
+        if not created:
+            FillUpCounter.objects.filter(pk=entry.pk).update(
+                fillup_count=F("fillup_count") + count
+            )
+
+    for (user_id, vehicle_id), count in removed.items():
+        FillUpCounter.objects.filter(
+            user_id=user_id, vehicle_id=vehicle_id, fillup_count__gte=count
+        ).update(fillup_count=F("fillup_count") - count)
+
+
+def rebuild_for_user(user_id: int) -> None:
+    """Recount the counters for ``user_id`` from its fill-ups."""
+
+    per_vehicle = dict(
+        FillUp.objects.filter(user_id=user_id)
+        .order_by()
+        .values_list("vehicle_id")
+        .annotate(fillup_count=Count("id"))
+    )
+    FillUpCounter.objects.filter(user_id=user_id).delete()
+    counters = [
+        FillUpCounter(user_id=user_id, vehicle_id=vehicle_id, fillup_count=count)
+        for vehicle_id, count in per_vehicle.items()
+    ]
+    counters.append(
+        FillUpCounter(user_id=user_id, vehicle_id=None, fillup_count=sum(per_vehicle.values()))
+    )
+    FillUpCounter.objects.bulk_create(counters)
+
+
+def fillup_count(user, vehicle_id: int | None = None) -> int:
+    """Return the cached number of fill-ups for ``user``, optionally for one vehicle."""
+
+    count = (
+        FillUpCounter.objects.filter(user=user, vehicle_id=vehicle_id)
+        .values_list("fillup_count", flat=True)
+        .first()
+    )
+    return count or 0
@@ -0,0 +1,230 @@
+"""Maintenance and range queries for the running totals stored on ``FillUp``.
+
+Each fill carries the sums of its vehicle's fills up to and including itself
+in ``(date, id)`` order, so the totals of any date range are the difference
+between the last fill on or before the range end and the last fill before the
+range start.
+"""
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Mapping
+
+from django.db import connection
+from django.db.models import OuterRef, Subquery
+
+from vehicles.models import Vehicle
+
+from .derived import VALUE_FIELDS
+from .metrics import metrics_from_totals
+from .models import FillUp
+
+
+CUMULATIVE_FIELDS = (
+    "cum_fill_count",
+    "cum_spend",
+    "cum_liters",
+    "cum_distance_km",
+    "cum_distance_liters",
+    "cum_distance_cost",
+)
+
+# What each fill adds to the running totals; a fill without a stored distance
+# (the first of a vehicle or a non-increasing reading) adds no distance, fuel
+# or cost towards the distance-based averages.
+_CONTRIBUTIONS = {
+    "cum_fill_count": "1",
+    "cum_spend": "total_amount",
+    "cum_liters": "liters",
+    "cum_distance_km": "COALESCE(distance_since_last_km, 0)",
+    "cum_distance_liters": (
+        "CASE WHEN distance_since_last_km IS NULL THEN 0 ELSE liters END"
+    ),
+    "cum_distance_cost": (
+        "CASE WHEN distance_since_last_km IS NULL THEN 0 ELSE total_amount END"
+    ),
+}
+
+
+def advance(
+    totals: Mapping | None, liters: Decimal, total_amount: Decimal, distance_km: int | None
+) -> dict:
+    """Return the running totals after a fill given those of its predecessor.
+
+    The Python counterpart of ``_CONTRIBUTIONS``, for writers that compute
+    the totals of new rows themselves; ``totals`` is ``None`` for the first
+    fill of a vehicle.
+    """
+
+    totals = totals or dict.fromkeys(CUMULATIVE_FIELDS, 0)
+    with_distance = distance_km is not None
+    return {
+        "cum_fill_count": totals["cum_fill_count"] + 1,
+        "cum_spend": totals["cum_spend"] + total_amount,
+        "cum_liters": totals["cum_liters"] + liters,
+        "cum_distance_km": totals["cum_distance_km"] + (distance_km or 0),
+        "cum_distance_liters": totals["cum_distance_liters"] + (liters if with_distance else 0),
+        "cum_distance_cost": totals["cum_distance_cost"] + (total_amount if with_distance else 0),
+    }
+
+
+_RUNNING_SQL = """
+WITH anchor AS (
+    SELECT {anchor_columns}
+    FROM {table}
+    WHERE {anchor_filter}
+    ORDER BY date DESC, id DESC
+    LIMIT 1
+),
+running AS (
+    SELECT id, {running_columns}
+    FROM {table}
+    WHERE {filter}
+    WINDOW w AS (PARTITION BY vehicle_id ORDER BY date, id ROWS UNBOUNDED PRECEDING)
+)
+UPDATE {table} AS fill
+SET {assignments}
+FROM running
+WHERE fill.id = running.id
+"""
+
+
+def _running_update(where: str, anchor_where: str) -> str:
+    return _RUNNING_SQL.format(
+        table=connection.ops.quote_name(FillUp._meta.db_table),
+        anchor_columns=", ".join(CUMULATIVE_FIELDS),
+        anchor_filter=anchor_where,
+        running_columns=", ".join(
+            f"SUM({expression}) OVER w AS {name}" for name, expression in _CONTRIBUTIONS.items()
+        ),
+        filter=where,
+        assignments=", ".join(
+            f"{name} = COALESCE((SELECT {name} FROM anchor), 0) + running.{name}"
+            for name in CUMULATIVE_FIELDS
+        ),
+    )
+
+
+def refresh_from(vehicle_id: int, fill_date: date | None = None, fillup_id: int | None = None) -> None:
+    """Recompute the running totals of ``vehicle_id`` from ``(fill_date, fillup_id)`` on.
+
+    Only that suffix is read and written; it continues from the totals of the
+    fill right before it. Without a position the whole vehicle is recomputed.
+    Callers bump the data version (see :mod:`core.versions`).
+    """
+
+    if fill_date is None:
+        sql = _running_update("vehicle_id = %(vehicle)s", "false")
+    else:
+        sql = _running_update(
+            "vehicle_id = %(vehicle)s AND (date, id) >= (%(date)s, %(id)s)",
+            "vehicle_id = %(vehicle)s AND (date, id) < (%(date)s, %(id)s)",
+        )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, {"vehicle": vehicle_id, "date": fill_date, "id": fillup_id})
+
+
+def apply_change(fillup_id: int, previous: Mapping | None, current: Mapping | None) -> None:
+    """Shift the running totals after a fill-up write.
+
+    Expects the derived columns to be refreshed already. Everything from the
+    earliest old or new position of the fill onwards is recomputed, which
+    also covers the successor whose stored distance changed.
+    """
+
+    if previous and current and all(previous[name] == current[name] for name in VALUE_FIELDS):
+        return
+
+    starts: dict[int, tuple[date, int]] = {}
+    for state in (previous, current):
+        if state is None:
+            continue
+        position = (state["date"], fillup_id)
+        vehicle_id = state["vehicle_id"]
+        if vehicle_id not in starts or position < starts[vehicle_id]:
+            starts[vehicle_id] = position
+    for vehicle_id, (fill_date, position_id) in starts.items():
+        refresh_from(vehicle_id, fill_date, position_id)
+
+
+def rebuild_for_user(user_id: int) -> None:
+    """Recompute the running totals of every fill owned by ``user_id``."""
+
+    with connection.cursor() as cursor:
+        cursor.execute(_running_update("user_id = %(user)s", "false"), {"user": user_id})
+
+
+def _last_fill(end: date | None) -> Subquery:
+    fills = FillUp.objects.filter(vehicle_id=OuterRef("pk"))
+    if end is not None:
+        fills = fills.filter(date__lte=end)
+    return Subquery(fills.order_by("-date", "-id").values("id")[:1])
+
+
+def range_metrics(
+    user, start: date | None = None, end: date | None = None, vehicle_id: int | None = None
+) -> dict:
+    """Return ``aggregate_metrics`` for fills dated within ``[start, end]``.
+
+    Three index probes per vehicle find the last fill before the range, the
+    first fill in it and the last fill on or before its end; a second query
+    loads those rows. The range totals are the difference of the running
+    totals, less the stored distance of the first fill in the range, which
+    ``aggregate_metrics`` does not count because its predecessor lies outside.
+    """
+
+    vehicles = Vehicle.objects.filter(user=user)
+    if vehicle_id is not None:
+        vehicles = vehicles.filter(id=vehicle_id)
+
+    first_fill = FillUp.objects.filter(vehicle_id=OuterRef("pk"))
+    probes = {"end_id": _last_fill(end)}
+    if start is not None:
+        probes["before_id"] = _last_fill(start - timedelta(days=1))
+        first_fill = first_fill.filter(date__gte=start)
+    probes["first_id"] = Subquery(first_fill.order_by("date", "id").values("id")[:1])
+    bounds = list(vehicles.annotate(**probes).values(*probes))
+
+    fill_ids = {fillup_id for row in bounds for fillup_id in row.values() if fillup_id is not None}
+    fills = {
+        fill["id"]: fill
+        for fill in FillUp.objects.filter(id__in=fill_ids).values(
+            "id", "date", "distance_since_last_km", "liters", "total_amount", *CUMULATIVE_FIELDS
+        )
+    }
+
+    totals = dict.fromkeys(CUMULATIVE_FIELDS, 0)
+    min_date: date | None = None
+    max_date: date | None = None
+    for row in bounds:
+        last = fills.get(row["end_id"])
+        before = fills.get(row.get("before_id"))
+        if last is None:
+            continue
+        if last["cum_fill_count"] - (before["cum_fill_count"] if before else 0) <= 0:
+            continue
+        for name in CUMULATIVE_FIELDS:
+            totals[name] += last[name] - (before[name] if before else 0)
+
+        first = fills[row["first_id"]]
+        if start is not None and first["distance_since_last_km"] is not None:
+            totals["cum_distance_km"] -= first["distance_since_last_km"]
+            totals["cum_distance_liters"] -= first["liters"]
+            totals["cum_distance_cost"] -= first["total_amount"]
+        if min_date is None or first["date"] < min_date:
+            min_date = first["date"]
+        if max_date is None or last["date"] > max_date:
+            max_date = last["date"]
+
+    return metrics_from_totals(
+        total_spend=Decimal(totals["cum_spend"]),
+        total_liters=Decimal(totals["cum_liters"]),
+        total_distance=Decimal(totals["cum_distance_km"]),
+        liters_for_distance=Decimal(totals["cum_distance_liters"]),
+        cost_for_distance=Decimal(totals["cum_distance_cost"]),
+        min_date=min_date,
+        max_date=max_date,
+        window_start=start,
+        window_end=end,
+    )
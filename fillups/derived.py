@@ -0,0 +1,179 @@
+"""Maintenance of the derived per-fill columns stored on ``FillUp``."""
+from __future__ import annotations
+
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Iterable, Mapping
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .metrics import previous_odometer_subquery
+from .models import FillUp
+
+
+DERIVED_FIELDS = (
+    "distance_since_last_km",
+    "unit_price_per_liter",
+    "consumption_l_per_100km",
+    "cost_per_km",
+)
+
+# Changing any of these moves a fill within its vehicle history or changes the
+# odometer its successor measures from.
+POSITION_FIELDS = ("vehicle_id", "date", "odometer_km")
+VALUE_FIELDS = POSITION_FIELDS + ("liters", "total_amount")
+
+# A derived change is a change of the exported row, so it moves ``changed_at``
+# and delta exports pick the row up; ``updated_at`` is left to user edits.
+WRITTEN_FIELDS = DERIVED_FIELDS + ("changed_at",)
+
+DERIVED_QUANTUM = Decimal("0.000001")
+
+BATCH_SIZE = 1000
+
+
+def _quantize(value: Decimal) -> Decimal:
+    return value.quantize(DERIVED_QUANTUM, rounding=ROUND_HALF_UP)
+
+
+def derived_values(
+    odometer_km: int,
+    liters: Decimal,
+    total_amount: Decimal,
+    previous_odometer_km: int | None,
+) -> dict:
+    """Return the derived column values for one fill given its predecessor's odometer."""
+
+    values = dict.fromkeys(DERIVED_FIELDS)
+    if liters > 0:
+        values["unit_price_per_liter"] = _quantize(total_amount / liters)
+
+    if previous_odometer_km is not None:
+        distance = odometer_km - previous_odometer_km
+        if distance > 0:
+            distance_decimal = Decimal(distance)
+            values["distance_since_last_km"] = distance
+            if liters > 0:
+                values["consumption_l_per_100km"] = _quantize(
+                    (liters * Decimal(100)) / distance_decimal
+                )
+            if total_amount > 0:
+                values["cost_per_km"] = _quantize(total_amount / distance_decimal)
+    return values
+
+
+def _successor_id(vehicle_id: int, fill_date, fillup_id: int) -> int | None:
+    """Return the fill following ``(fill_date, fillup_id)`` in ``vehicle_id``."""
+
+    return (
+        FillUp.objects.filter(vehicle_id=vehicle_id)
+        .filter(Q(date__gt=fill_date) | Q(date=fill_date, id__gt=fillup_id))
+        .exclude(id=fillup_id)
+        .order_by("date", "id")
+        .values_list("id", flat=True)
+        .first()
+    )
+
+
+def refresh(ids: Iterable[int]) -> dict[int, dict]:
+    """Recompute the derived columns of the given fills and write the ones that changed.
+
+    Returns the freshly computed values keyed by fill id; ids that no longer
+    exist are skipped. The write bypasses the receivers, so callers bump the
+    data version (see :mod:`core.versions`).
+    """
+
+    ids = set(ids)
+    if not ids:
+        return {}
+
+    rows = (
+        FillUp.objects.filter(id__in=ids)
+        .annotate(previous_odometer_km=previous_odometer_subquery())
+        .only("id", "odometer_km", "liters", "total_amount", *DERIVED_FIELDS)
+    )
+    now = timezone.now()
+    computed: dict[int, dict] = {}
+    changed: list[FillUp] = []
+    for row in rows:
+        values = derived_values(
+            row.odometer_km, row.liters, row.total_amount, row.previous_odometer_km
+        )
+        computed[row.id] = values
+        if any(getattr(row, name) != value for name, value in values.items()):
+            for name, value in values.items():
+                setattr(row, name, value)
+            row.changed_at = now
+            changed.append(row)
+
+    if changed:
+        FillUp.objects.bulk_update(changed, WRITTEN_FIELDS)
+    return computed
+
+
+def apply_change(fillup_id: int, previous: Mapping | None, current: Mapping | None) -> dict[int, dict]:
+    """Refresh the fills affected by moving ``fillup_id`` from ``previous`` to ``current``.
+
+    That is the fill itself plus, when its position or odometer changed, the
+    fill that follows its old and its new position. Backdated inserts and
+    moves between vehicles therefore touch at most three rows.
+    """
+
+    if previous and current and all(previous[name] == current[name] for name in VALUE_FIELDS):
+        return {}
+
+    ids: set[int] = set()
+    if current is not None:
+        ids.add(fillup_id)
+
+    moved = (
+        previous is None
+        or current is None
+        or any(previous[name] != current[name] for name in POSITION_FIELDS)
+    )
+    if moved:
+        for state in (previous, current):
+            if state is None:
+                continue
+            successor_id = _successor_id(state["vehicle_id"], state["date"], fillup_id)
+            if successor_id is not None:
+                ids.add(successor_id)
+
+    return refresh(ids)
+
+
+def rebuild_for_vehicle(vehicle_id: int) -> None:
+    """Recompute the derived columns of every fill in ``vehicle_id``."""
+
+    rows = (
+        FillUp.objects.filter(vehicle_id=vehicle_id)
+        .order_by("date", "id")
+        .only("id", "odometer_km", "liters", "total_amount", *DERIVED_FIELDS)
+    )
+    now = timezone.now()
+    previous_odometer_km: int | None = None
+    changed: list[FillUp] = []
+    for row in rows.iterator(chunk_size=BATCH_SIZE):
+        values = derived_values(
+            row.odometer_km, row.liters, row.total_amount, previous_odometer_km
+        )
+        if any(getattr(row, name) != value for name, value in values.items()):
+            for name, value in values.items():
+                setattr(row, name, value)
+            row.changed_at = now
+            changed.append(row)
+        previous_odometer_km = row.odometer_km
+    FillUp.objects.bulk_update(changed, WRITTEN_FIELDS, batch_size=BATCH_SIZE)
+
+
+def rebuild_for_user(user_id: int) -> None:
+    """Recompute the derived columns of every fill owned by ``user_id``."""
+
+    vehicle_ids = (
+        FillUp.objects.filter(user_id=user_id)
+        .order_by()
+        .values_list("vehicle_id", flat=True)
+        .distinct()
+    )
+    for vehicle_id in vehicle_ids:
+        rebuild_for_vehicle(vehicle_id)
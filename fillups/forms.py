@@ -120,3 +120,14 @@ class FillUpForm(forms.ModelForm):
         cleaned_data["station_name"] = _normalize(cleaned_data.get("station_name"))
 
         return cleaned_data
+
+
+class FillUpImportForm(forms.Form):
+    file = forms.FileField(
+        label="CSV file",
+        help_text=(
+            "Columns: vehicle, date, odometer, station, volume, total_amount and "
+            "optionally fuel_brand, fuel_grade, notes. Odometer and volume are read "
+            "in your profile units."
+        ),
+    )
@@ -0,0 +1,400 @@
+"""Bulk import of fill-ups from CSV.
+
+The file is read row by row; each row is checked on its own (dates, amounts,
+lengths) and converted from the profile's units the way ``FillUpForm`` does.
+Odometer order is then checked for each vehicle in one sorted pass over the
+imported rows merged with that vehicle's existing fills, which are fetched
+once. An import is all or nothing: with any error nothing is written.
+
+Rows are inserted with ``COPY ... FROM STDIN`` (psycopg 3), which sends no
+signals, so the derived values of the new rows are computed during the sorted
+pass and the maintained tables are rebuilt once afterwards.
+"""
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from typing import IO, Iterable, Iterator, NamedTuple
+
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from core import versions
+from profiles.models import Profile
+from profiles.units import gallons_to_liters, miles_to_km
+from vehicles.models import Vehicle
+
+from . import counters, cumulative, derived, rollups, vocabulary
+from .models import FillUp
+
+BATCH_SIZE = 2000
+
+# Reporting stops after this many errors.
+MAX_ERRORS = 50
+
+# Accepted header names mapped to the import fields. ``odometer`` and
+# ``volume`` are read in the profile's units; ``odometer_km`` and ``liters``
+# (as written by the account export) are always metric.
+COLUMN_ALIASES = {
+    "vehicle": "vehicle",
+    "vehicle_name": "vehicle",
+    "vehicle_id": "vehicle_id",
+    "date": "date",
+    "odometer": "odometer",
+    "odometer_km": "odometer_km",
+    "station": "station_name",
+    "station_name": "station_name",
+    "fuel_brand": "fuel_brand",
+    "brand": "fuel_brand",
+    "fuel_grade": "fuel_grade",
+    "grade": "fuel_grade",
+    "volume": "volume",
+    "liters": "liters",
+    "total_amount": "total_amount",
+    "total_currency_amount": "total_amount",
+    "notes": "notes",
+}
+
+REQUIRED_FIELDS = ("date", "station_name", "total_amount")
+
+CENT = Decimal("0.01")
+
+# Columns whose values for new rows come out of ``plan_rows``.
+PLANNED_COLUMNS = (*derived.DERIVED_FIELDS, *cumulative.CUMULATIVE_FIELDS)
+
+COPY_COLUMNS = (
+    "user_id",
+    "vehicle_id",
+    "date",
+    "odometer_km",
+    "station_name",
+    "fuel_brand",
+    "fuel_grade",
+    "liters",
+    "total_amount",
+    "notes",
+    "created_at",
+    "updated_at",
+    "changed_at",
+    *PLANNED_COLUMNS,
+)
+
+
+class ImportRow(NamedTuple):
+    line: int
+    vehicle_id: int
+    date: date
+    odometer_km: int
+    station_name: str
+    fuel_brand: str
+    fuel_grade: str
+    liters: Decimal
+    total_amount: Decimal
+    notes: str
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+class _TooManyErrors(Exception):
+    pass
+
+
+def _normalize(value: str | None) -> str:
+    return " ".join((value or "").split())
+
+
+def _number(value: str) -> Decimal:
+    try:
+        number = Decimal(value.strip())
+    except InvalidOperation as exc:
+        raise ValueError("Numbers must be plain decimals.") from exc
+    if not number.is_finite():
+        raise ValueError("Numbers must be plain decimals.")
+    return number
+
+
+def _to_km(value: str, unit: str) -> int:
+    odometer = _number(value)
+    if unit == Profile.UNIT_MILES:
+        return int(round(miles_to_km(float(odometer))))
+    if odometer != odometer.to_integral_value():
+        raise ValueError("Odometer reading must be a whole number.")
+    return int(odometer)
+
+
+def _to_liters(value: str, unit: str) -> Decimal:
+    volume = _number(value)
+    if unit == Profile.UNIT_GALLONS:
+        return Decimal(str(gallons_to_liters(float(volume)))).quantize(CENT)
+    return volume
+
+
+def _decimal_field(value: Decimal, name: str, max_digits: int) -> Decimal:
+    if value.as_tuple().exponent < -2:
+        raise ValueError(f"{name} must have at most 2 decimal places.")
+    if value <= 0:
+        raise ValueError(f"{name} must be greater than 0.")
+    if value >= Decimal(10) ** (max_digits - 2):
+        raise ValueError(f"{name} is too large.")
+    return value.quantize(CENT)
+
+
+def _parse_row(line: int, raw: dict, vehicles: dict, units: tuple[str, str]) -> ImportRow:
+    """Return the validated ``ImportRow`` of one CSV record; raise ``ValueError``."""
+
+    distance_unit, volume_unit = units
+    for name in REQUIRED_FIELDS:
+        if not _normalize(raw.get(name)):
+            raise ValueError(f"{name} is required.")
+
+    if raw.get("vehicle_id"):
+        vehicle_id = vehicles["ids"].get(raw["vehicle_id"].strip())
+    else:
+        vehicle_id = vehicles["names"].get(_normalize(raw.get("vehicle")))
+    if vehicle_id is None:
+        raise ValueError("Unknown vehicle.")
+
+    fill_date = parse_date(raw["date"].strip())
+    if fill_date is None:
+        raise ValueError("Date must be in YYYY-MM-DD format.")
+    if fill_date > timezone.localdate():
+        raise ValueError("Date cannot be in the future.")
+
+    if raw.get("odometer_km"):
+        odometer_km = _to_km(raw["odometer_km"], Profile.UNIT_KILOMETERS)
+    elif raw.get("odometer"):
+        odometer_km = _to_km(raw["odometer"], distance_unit)
+    else:
+        raise ValueError("odometer is required.")
+    if raw.get("liters"):
+        liters = _to_liters(raw["liters"], Profile.UNIT_LITERS)
+    elif raw.get("volume"):
+        liters = _to_liters(raw["volume"], volume_unit)
+    else:
+        raise ValueError("volume is required.")
+    total_amount = _number(raw["total_amount"])
+
+    if odometer_km <= 0:
+        raise ValueError("Odometer reading must be greater than 0.")
+    if odometer_km > 2147483647:
+        raise ValueError("Odometer reading is too large.")
+    liters = _decimal_field(liters, "Fuel volume", 8)
+    total_amount = _decimal_field(total_amount, "Total amount", 10)
+
+    station_name = _normalize(raw.get("station_name"))
+    fuel_brand = _normalize(raw.get("fuel_brand"))
+    fuel_grade = _normalize(raw.get("fuel_grade"))
+    notes = (raw.get("notes") or "").strip()
+    for name, value, limit in (
+        ("Station", station_name, 100),
+        ("Brand", fuel_brand, 64),
+        ("Grade", fuel_grade, 64),
+        ("Notes", notes, 500),
+    ):
+        if len(value) > limit:
+            raise ValueError(f"{name} must be at most {limit} characters.")
+
+    return ImportRow(
+        line,
+        vehicle_id,
+        fill_date,
+        odometer_km,
+        station_name,
+        fuel_brand,
+        fuel_grade,
+        liters,
+        total_amount,
+        notes,
+    )
+
+
+def read_rows(handle: IO[str], user, result: ImportResult) -> Iterator[ImportRow]:
+    """Yield the valid rows of the CSV in ``handle``; errors are added to ``result``."""
+
+    reader = csv.DictReader(handle)
+    header = {
+        name: COLUMN_ALIASES[name.strip().lower()]
+        for name in reader.fieldnames or []
+        if name and name.strip().lower() in COLUMN_ALIASES
+    }
+    fields = set(header.values())
+    missing = [name for name in REQUIRED_FIELDS if name not in fields]
+    if not fields & {"vehicle", "vehicle_id"}:
+        missing.append("vehicle")
+    if not fields & {"odometer", "odometer_km"}:
+        missing.append("odometer")
+    if not fields & {"volume", "liters"}:
+        missing.append("volume")
+    if missing:
+        _add_error(result, f"Missing columns: {', '.join(missing)}.")
+        return
+
+    profile = Profile.objects.filter(user=user).first()
+    units = (
+        profile.distance_unit if profile else Profile.UNIT_KILOMETERS,
+        profile.volume_unit if profile else Profile.UNIT_LITERS,
+    )
+    vehicles = {"ids": {}, "names": {}}
+    for vehicle_id, name in Vehicle.objects.filter(user=user).values_list("id", "name"):
+        vehicles["ids"][str(vehicle_id)] = vehicle_id
+        vehicles["names"][name] = vehicle_id
+
+    for raw in reader:
+        record = {header[name]: value for name, value in raw.items() if name in header}
+        try:
+            yield _parse_row(reader.line_num, record, vehicles, units)
+        except ValueError as exc:
+            _add_error(result, f"Line {reader.line_num}: {exc}")
+
+
+def _add_error(result: ImportResult, message: str) -> None:
+    result.errors.append(message)
+    if len(result.errors) >= MAX_ERRORS:
+        raise _TooManyErrors
+
+
+@dataclass
+class ImportPlan:
+    """What inserting the checked rows involves besides the rows themselves."""
+
+    # Derived and running-total column values of each new row, by line.
+    values_by_line: dict[int, dict] = field(default_factory=dict)
+    # Stored fills whose predecessor becomes a new row, so their distance changes.
+    stale_ids: set[int] = field(default_factory=set)
+    # Per vehicle, the first stored fill after a new row: totals change from there.
+    resume_at: dict[int, tuple[date, int]] = field(default_factory=dict)
+
+
+def plan_rows(rows: list[ImportRow], existing: Iterable[tuple], result: ImportResult) -> ImportPlan:
+    """Check odometer order per vehicle in one sorted pass and plan the insert.
+
+    ``existing`` are ``(vehicle_id, date, id, odometer_km, liters,
+    total_amount, distance_since_last_km)`` of the stored fills of the same
+    vehicles. Imported rows sort after stored fills of the same day (they get
+    higher ids), in file order. The pass replays each vehicle's history, so
+    the derived values and running totals of the new rows come out of it.
+    """
+
+    # (vehicle, date, 0, id, ...) for stored fills; (vehicle, date, 1, line, ...) for new rows.
+    merged = [
+        (vehicle_id, day, 0, pk, odometer, liters, total_amount, distance)
+        for vehicle_id, day, pk, odometer, liters, total_amount, distance in existing
+    ]
+    merged.extend(
+        (row.vehicle_id, row.date, 1, row.line, row.odometer_km, row.liters, row.total_amount, None)
+        for row in rows
+    )
+    merged.sort()
+
+    plan = ImportPlan()
+    previous = None
+    totals = None
+    for entry in merged:
+        vehicle_id, day, is_new, key, odometer, liters, total_amount, stored_distance = entry
+        if previous is not None and previous[0] != vehicle_id:
+            previous = totals = None
+        if previous is not None and odometer <= previous[4]:
+            if is_new:
+                _add_error(
+                    result,
+                    f"Line {key}: Odometer reading must be greater than the previous fill-up.",
+                )
+                continue
+            if previous[2]:
+                _add_error(
+                    result,
+                    f"Line {previous[3]}: Odometer reading must be less than the next fill-up.",
+                )
+
+        values = derived.derived_values(
+            odometer, liters, total_amount, previous[4] if previous is not None else None
+        )
+        distance = values["distance_since_last_km"]
+        totals = cumulative.advance(totals, liters, total_amount, distance)
+        if is_new:
+            plan.values_by_line[key] = {**values, **totals}
+        elif vehicle_id in plan.resume_at or (previous is not None and previous[2]):
+            plan.resume_at.setdefault(vehicle_id, (day, key))
+            if distance != stored_distance:
+                plan.stale_ids.add(key)
+        previous = entry
+    return plan
+
+
+def import_fillups(user, handle: IO[str]) -> ImportResult:
+    """Import the fill-ups in the CSV text stream ``handle`` for ``user``."""
+
+    result = ImportResult()
+    try:
+        rows = list(read_rows(handle, user, result))
+        if result.errors or not rows:
+            return result
+
+        with transaction.atomic():
+            vehicle_ids = sorted({row.vehicle_id for row in rows})
+            # Serialises imports into the same vehicles.
+            list(Vehicle.objects.select_for_update().filter(id__in=vehicle_ids).values("id"))
+            existing = (
+                FillUp.objects.filter(vehicle_id__in=vehicle_ids)
+                .order_by()
+                .values_list(
+                    "vehicle_id",
+                    "date",
+                    "id",
+                    "odometer_km",
+                    "liters",
+                    "total_amount",
+                    "distance_since_last_km",
+                )
+            )
+            plan = plan_rows(rows, existing.iterator(chunk_size=BATCH_SIZE), result)
+            if result.errors:
+                return result
+
+            _insert(user.pk, rows, plan.values_by_line)
+            result.created = len(rows)
+            _rebuild(user.pk, plan)
+    except _TooManyErrors:
+        result.errors.append(f"Stopped after {MAX_ERRORS} errors; nothing was imported.")
+    return result
+
+
+def _insert(user_id: int, rows: list[ImportRow], values_by_line: dict[int, dict]) -> None:
+    """Insert ``rows`` in file order, so fills of the same day keep that order by id."""
+
+    now = timezone.now()
+    statement = "COPY {table} ({columns}) FROM STDIN".format(
+        table=connection.ops.quote_name(FillUp._meta.db_table),
+        columns=", ".join(COPY_COLUMNS),
+    )
+    with connection.cursor() as cursor:
+        with cursor.copy(statement) as copy:
+            for row in rows:
+                values = values_by_line[row.line]
+                copy.write_row(
+                    (user_id, *row[1:], now, now, now, *(values[name] for name in PLANNED_COLUMNS))
+                )
+
+
+def _rebuild(user_id: int, plan: ImportPlan) -> None:
+    """Bring the stored fills after new rows and the per-user tables in line."""
+
+    derived.refresh(plan.stale_ids)
+    for vehicle_id, (fill_date, fillup_id) in plan.resume_at.items():
+        cumulative.refresh_from(vehicle_id, fill_date, fillup_id)
+    vocabulary.rebuild_for_user(user_id)
+    counters.rebuild_for_user(user_id)
+    rollups.rebuild_for_user(user_id)
+    # COPY and the refreshes above bypass the save receivers.
+    versions.bump(user_id)
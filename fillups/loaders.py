@@ -0,0 +1,72 @@
+"""Column-projected loaders for the fill-up read paths.
+
+The aggregate and statistics helpers only read a handful of columns, listed by
+:class:`FillRow`; ``FillSeries.load`` selects just those instead of loading
+model instances with notes, timestamps and a joined vehicle.
+"""
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+from typing import NamedTuple
+
+from django.db.models import QuerySet
+
+
+class FillRow(NamedTuple):
+    """The columns read by ``fillups.metrics`` and ``fillups.stats``.
+
+    Attribute names match ``FillUp`` so either can be passed to the helpers.
+    """
+
+    id: int
+    vehicle_id: int
+    date: date
+    odometer_km: int
+    liters: Decimal
+    total_amount: Decimal
+    fuel_brand: str
+    fuel_grade: str
+
+
+# Columns rendered or used for keyset cursors on the History page.
+HISTORY_FIELDS = (
+    "id",
+    "user",
+    "vehicle",
+    "vehicle__name",
+    "date",
+    "odometer_km",
+    "station_name",
+    "fuel_brand",
+    "fuel_grade",
+    "liters",
+    "total_amount",
+    "distance_since_last_km",
+    "unit_price_per_liter",
+    "consumption_l_per_100km",
+    "cost_per_km",
+)
+
+# Columns written to ``fillups.csv`` by the account export, in file order.
+EXPORT_FIELDS = (
+    "id",
+    "vehicle_id",
+    "date",
+    "odometer_km",
+    "station_name",
+    "fuel_brand",
+    "fuel_grade",
+    "liters",
+    "total_amount",
+    "notes",
+    "created_at",
+    "updated_at",
+    "distance_since_last_km",
+)
+
+
+def project_history(queryset: QuerySet) -> QuerySet:
+    """Restrict ``queryset`` to the History columns plus the vehicle name."""
+
+    return queryset.select_related("vehicle").only(*HISTORY_FIELDS)
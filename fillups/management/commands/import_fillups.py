@@ -0,0 +1,45 @@
+"""Management command importing fill-ups from a CSV file."""
+from __future__ import annotations
+
+import sys
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from fillups.importer import import_fillups
+
+
+class Command(BaseCommand):
+    help = "Import fill-ups for a user from a CSV file (see README, 'Bulk import')."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--email", required=True, help="Email of the account to import into")
+        parser.add_argument("path", help="CSV file to read, or '-' for standard input")
+
+    def handle(self, *args, **options):
+        email: str = options["email"].strip().lower()
+        User = get_user_model()
+        try:
+            user = User.objects.get(email=email)
+        except User.DoesNotExist as exc:
+            raise CommandError(f"No user found for email {email!r}") from exc
+
+        start = time.monotonic()
+        if options["path"] == "-":
+            result = import_fillups(user, sys.stdin)
+        else:
+            try:
+                with open(options["path"], encoding="utf-8-sig", newline="") as handle:
+                    result = import_fillups(user, handle)
+            except OSError as exc:
+                raise CommandError(str(exc)) from exc
+        elapsed = time.monotonic() - start
+
+        if not result.ok:
+            for error in result.errors:
+                self.stderr.write(error)
+            raise CommandError("Import failed; no fill-ups were written.")
+        self.stdout.write(
+            self.style.SUCCESS(f"Imported {result.created} fill-ups in {elapsed:.1f} s.")
+        )
@@ -4,11 +4,17 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import date
 from decimal import Decimal
-from typing import Iterable, List
+from typing import Iterable, List, Mapping
+
+from django.db.models import Count, F, Max, Min, OuterRef, Q, QuerySet, Subquery, Sum, Window
+from django.db.models.functions import Lag
 
 from profiles.units import km_to_miles, liters_to_gallons
 
+from .loaders import FillRow
 from .models import FillUp
+from .series import FillSeries
+from . import vectorized
 
 
 def _decimal_from_float(value: float) -> Decimal:
@@ -30,72 +36,120 @@ class PerFill:
     cost_per_mile: Decimal | None
 
 
+def per_fill_from_previous(entry: FillUp, previous_odometer_km: int | None) -> PerFill:
+    """Compute per-fill metrics for ``entry`` given the previous fill's odometer reading."""
+
+    miles_per_km_decimal = _decimal_from_float(km_to_miles(1.0))
+    km_per_mile_decimal = Decimal("1") / miles_per_km_decimal
+
+    distance_km: float | None = None
+    unit_price: Decimal | None = None
+    efficiency_l_per_100km: float | None = None
+    efficiency_mpg: float | None = None
+    cost_per_km: Decimal | None = None
+    cost_per_mile: Decimal | None = None
+
+    liters = entry.liters
+    total_amount = entry.total_amount
+
+    if liters > 0:
+        unit_price = total_amount / liters
+
+    if previous_odometer_km is not None:
+        raw_distance = entry.odometer_km - previous_odometer_km
+        if raw_distance > 0:
+            distance_decimal = Decimal(raw_distance)
+            distance_km = float(distance_decimal)
+
+            if liters > 0:
+                efficiency_l_per_100km = float((liters * Decimal(100)) / distance_decimal)
+                gallons = liters_to_gallons(float(liters))
+                miles = km_to_miles(distance_km)
+                if gallons > 0:
+                    efficiency_mpg = miles / gallons
+
+            if total_amount > 0:
+                cost_per_km = total_amount / distance_decimal
+                cost_per_mile = cost_per_km * km_per_mile_decimal
+
+    return PerFill(
+        fillup=entry,
+        distance_since_last_km=distance_km,
+        unit_price_per_liter=unit_price,
+        efficiency_l_per_100km=efficiency_l_per_100km,
+        efficiency_mpg=efficiency_mpg,
+        cost_per_km=cost_per_km,
+        cost_per_mile=cost_per_mile,
+    )
+
+
+def per_fill_from_stored(entry: FillUp) -> PerFill:
+    """Compute per-fill metrics for ``entry`` from its stored ``distance_since_last_km``.
+
+    The stored distance already reflects the previous fill of the vehicle, so
+    no other rows are needed.
+    """
+
+    previous_odometer_km: int | None = None
+    if entry.distance_since_last_km is not None:
+        previous_odometer_km = entry.odometer_km - entry.distance_since_last_km
+    return per_fill_from_previous(entry, previous_odometer_km)
+
+
 def per_fill_metrics(entries: List[FillUp]) -> list[PerFill]:
     """Compute per-fill metrics for the provided, pre-sorted fill-up entries."""
 
     results: list[PerFill] = []
     previous: FillUp | None = None
 
-    miles_per_km_decimal = _decimal_from_float(km_to_miles(1.0))
-    km_per_mile_decimal = Decimal("1") / miles_per_km_decimal
-
     for entry in entries:
-        distance_km: float | None = None
-        unit_price: Decimal | None = None
-        efficiency_l_per_100km: float | None = None
-        efficiency_mpg: float | None = None
-        cost_per_km: Decimal | None = None
-        cost_per_mile: Decimal | None = None
-
-        liters = entry.liters
-        total_amount = entry.total_amount
-
-        if liters > 0:
-            unit_price = total_amount / liters
-
-        if previous is not None:
-            raw_distance = entry.odometer_km - previous.odometer_km
-            if raw_distance > 0:
-                distance_decimal = Decimal(raw_distance)
-                distance_km = float(distance_decimal)
-
-                if liters > 0:
-                    efficiency_l_per_100km = float((liters * Decimal(100)) / distance_decimal)
-                    gallons = liters_to_gallons(float(liters))
-                    miles = km_to_miles(distance_km)
-                    if gallons > 0:
-                        efficiency_mpg = miles / gallons
-
-                if total_amount > 0:
-                    cost_per_km = total_amount / distance_decimal
-                    cost_per_mile = cost_per_km * km_per_mile_decimal
-
-        results.append(
-            PerFill(
-                fillup=entry,
-                distance_since_last_km=distance_km,
-                unit_price_per_liter=unit_price,
-                efficiency_l_per_100km=efficiency_l_per_100km,
-                efficiency_mpg=efficiency_mpg,
-                cost_per_km=cost_per_km,
-                cost_per_mile=cost_per_mile,
-            )
-        )
-
+        previous_odometer_km = previous.odometer_km if previous is not None else None
+        results.append(per_fill_from_previous(entry, previous_odometer_km))
         previous = entry
 
     return results
 
 
-def aggregate_metrics(entries: Iterable[FillUp], window_start: date | None = None) -> dict:
-    """Compute aggregate metrics over the provided fill-up entries."""
+def previous_odometer_subquery() -> Subquery:
+    """Return the odometer of the preceding fill-up in the same vehicle.
 
-    if window_start is not None:
-        filtered = [entry for entry in entries if entry.date >= window_start]
-    else:
-        filtered = list(entries)
+    Equivalent to ``LAG(odometer_km) OVER (PARTITION BY vehicle_id ORDER BY
+    date, id)`` but evaluated per outer row with a single index probe, so it
+    does not depend on which rows the outer query filters or limits.
+    """
 
-    if not filtered:
+    previous = (
+        FillUp.objects.filter(vehicle_id=OuterRef("vehicle_id"))
+        .filter(
+            Q(date__lt=OuterRef("date"))
+            | Q(date=OuterRef("date"), id__lt=OuterRef("id"))
+        )
+        .order_by("-date", "-id")
+        .values("odometer_km")[:1]
+    )
+    return Subquery(previous)
+
+
+def metrics_from_totals(
+    *,
+    total_spend: Decimal,
+    total_liters: Decimal,
+    total_distance: Decimal,
+    liters_for_distance: Decimal,
+    cost_for_distance: Decimal,
+    min_date: date | None,
+    max_date: date | None,
+    window_start: date | None = None,
+    window_end: date | None = None,
+) -> dict:
+    """Build the ``aggregate_metrics`` result dictionary from window sums.
+
+    ``min_date``/``max_date`` are ``None`` when the window holds no entries.
+    The per-day average spans the window bounds where given (an open start
+    falls back to ``min_date``, an open end to today or ``max_date``).
+    """
+
+    if min_date is None or max_date is None:
         return {
             "avg_cost_per_liter": None,
             "avg_consumption_l_per_100km": None,
@@ -107,73 +161,39 @@ def aggregate_metrics(entries: Iterable[FillUp], window_start: date | None = Non
             "total_distance_km": 0.0,
         }
 
-    sorted_entries = sorted(filtered, key=lambda entry: (entry.vehicle_id, entry.date, entry.id))
-
-    total_spend = Decimal("0")
-    total_liters = Decimal("0")
-    total_distance_decimal = Decimal("0")
-    liters_for_distance = Decimal("0")
-    cost_for_distance = Decimal("0")
-
-    prev_by_vehicle: dict[int, FillUp] = {}
-    min_date: date | None = None
-    max_date: date | None = None
-
-    for entry in sorted_entries:
-        total_spend += entry.total_amount
-        total_liters += entry.liters
-
-        if min_date is None or entry.date < min_date:
-            min_date = entry.date
-        if max_date is None or entry.date > max_date:
-            max_date = entry.date
-
-        previous = prev_by_vehicle.get(entry.vehicle_id)
-        if previous is not None:
-            raw_distance = entry.odometer_km - previous.odometer_km
-            if raw_distance > 0:
-                distance_decimal = Decimal(raw_distance)
-                total_distance_decimal += distance_decimal
-                liters_for_distance += entry.liters
-                cost_for_distance += entry.total_amount
-
-        prev_by_vehicle[entry.vehicle_id] = entry
-
     avg_cost_per_liter: Decimal | None = None
     if total_liters > 0:
         avg_cost_per_liter = total_spend / total_liters
 
     avg_consumption_l_per_100km: float | None = None
     avg_consumption_mpg: float | None = None
-    if total_distance_decimal > 0 and liters_for_distance > 0:
-        avg_consumption_l_per_100km = float((liters_for_distance * Decimal(100)) / total_distance_decimal)
+    if total_distance > 0 and liters_for_distance > 0:
+        avg_consumption_l_per_100km = float((liters_for_distance * Decimal(100)) / total_distance)
         gallons = liters_to_gallons(float(liters_for_distance))
-        miles = km_to_miles(float(total_distance_decimal))
+        miles = km_to_miles(float(total_distance))
         if gallons > 0:
             avg_consumption_mpg = miles / gallons
 
     avg_cost_per_km: Decimal | None = None
     avg_cost_per_mile: Decimal | None = None
-    if total_distance_decimal > 0 and cost_for_distance > 0:
-        avg_cost_per_km = cost_for_distance / total_distance_decimal
+    if total_distance > 0 and cost_for_distance > 0:
+        avg_cost_per_km = cost_for_distance / total_distance
         miles_per_km_decimal = _decimal_from_float(km_to_miles(1.0))
         km_per_mile_decimal = Decimal("1") / miles_per_km_decimal
         avg_cost_per_mile = avg_cost_per_km * km_per_mile_decimal
 
-    avg_distance_per_day_km: float | None = None
-    if max_date is not None and min_date is not None:
-        if window_start is not None:
-            period_start = window_start
-            period_end = date.today()
-        else:
-            period_start = min_date
-            period_end = max_date
+    if window_start is not None:
+        period_start = window_start
+        period_end = window_end if window_end is not None else date.today()
+    else:
+        period_start = min_date
+        period_end = window_end if window_end is not None else max_date
 
-        if period_end < period_start:
-            period_end = period_start
+    if period_end < period_start:
+        period_end = period_start
 
-        day_count = max((period_end - period_start).days + 1, 1)
-        avg_distance_per_day_km = float(total_distance_decimal / Decimal(day_count))
+    day_count = max((period_end - period_start).days + 1, 1)
+    avg_distance_per_day_km = float(total_distance / Decimal(day_count))
 
     return {
         "avg_cost_per_liter": avg_cost_per_liter,
@@ -183,5 +203,126 @@ def aggregate_metrics(entries: Iterable[FillUp], window_start: date | None = Non
         "avg_cost_per_km": avg_cost_per_km,
         "avg_cost_per_mile": avg_cost_per_mile,
         "total_spend": total_spend,
-        "total_distance_km": float(total_distance_decimal),
+        "total_distance_km": float(total_distance),
     }
+
+
+def metrics_from_series(
+    series: FillSeries, window_start: date | None = None, window_end: date | None = None
+) -> dict:
+    """Build the ``aggregate_metrics`` result from a series already cut to the window."""
+
+    total_distance = 0
+    liters_for_distance = Decimal("0")
+    cost_for_distance = Decimal("0")
+    for distance, liters, amount in zip(series.distances, series.liters, series.amounts):
+        if distance is not None:
+            total_distance += distance
+            liters_for_distance += liters
+            cost_for_distance += amount
+
+    return metrics_from_totals(
+        total_spend=sum(series.amounts, Decimal("0")),
+        total_liters=sum(series.liters, Decimal("0")),
+        total_distance=Decimal(total_distance),
+        liters_for_distance=liters_for_distance,
+        cost_for_distance=cost_for_distance,
+        min_date=min(series.dates) if series.dates else None,
+        max_date=max(series.dates) if series.dates else None,
+        window_start=window_start,
+        window_end=window_end,
+    )
+
+
+def aggregate_metrics(
+    entries: FillSeries | vectorized.ArraySeries | Iterable[FillUp | FillRow],
+    window_start: date | None = None,
+    window_end: date | None = None,
+) -> dict:
+    """Compute aggregate metrics over the provided fill-up entries.
+
+    ``window_start`` and ``window_end`` optionally restrict the entries to an
+    inclusive date range. An :class:`~fillups.vectorized.ArraySeries` is
+    aggregated by the NumPy backend.
+    """
+
+    if isinstance(entries, vectorized.ArraySeries):
+        return vectorized.aggregate_metrics(entries, window_start, window_end)
+    series = FillSeries.coerce(entries).window(window_start, window_end)
+    return metrics_from_series(series, window_start, window_end)
+
+
+def aggregate_metrics_windows_sql(
+    queryset: QuerySet, windows: Mapping[str, date | None]
+) -> dict[str, dict]:
+    """Compute ``aggregate_metrics`` for several windows in PostgreSQL with one query.
+
+    The views read the daily rollups instead; this is kept as the SQL
+    reference that ``rollups.rollup_metrics_windows`` is tested against, as it
+    works from the raw fills rather than from maintained tables.
+
+    ``queryset`` selects the fill-ups to aggregate (typically one user's,
+    optionally one vehicle's). ``LAG`` over each vehicle supplies the previous
+    odometer reading and date; a fill's distance counts for a window only when
+    that previous fill falls inside the window too, which matches measuring
+    deltas within the window's entries. Every window becomes a set of
+    ``FILTER``-ed ``SUM``/``MIN``/``MAX`` columns of the one result row.
+    """
+
+    queryset = queryset.order_by()
+    starts = list(windows.values())
+    if starts and None not in starts:
+        # Fills before the earliest window cannot contribute to any window.
+        queryset = queryset.filter(date__gte=min(starts))
+
+    vehicle_order = [F("date").asc(), F("id").asc()]
+    queryset = queryset.annotate(
+        previous_odometer_km=Window(
+            Lag("odometer_km"), partition_by=[F("vehicle_id")], order_by=vehicle_order
+        ),
+        previous_date=Window(
+            Lag("date"), partition_by=[F("vehicle_id")], order_by=vehicle_order
+        ),
+    )
+
+    distance = F("odometer_km") - F("previous_odometer_km")
+    aggregates = {}
+    for index, window_start in enumerate(starts):
+        in_window = Q(date__gte=window_start) if window_start is not None else None
+        with_distance = Q(odometer_km__gt=F("previous_odometer_km"))
+        if window_start is not None:
+            with_distance &= Q(previous_date__gte=window_start)
+        aggregates.update(
+            {
+                f"w{index}_count": Count("id", filter=in_window),
+                f"w{index}_spend": Sum("total_amount", filter=in_window),
+                f"w{index}_liters": Sum("liters", filter=in_window),
+                f"w{index}_min_date": Min("date", filter=in_window),
+                f"w{index}_max_date": Max("date", filter=in_window),
+                f"w{index}_distance": Sum(distance, filter=with_distance),
+                f"w{index}_distance_liters": Sum("liters", filter=with_distance),
+                f"w{index}_distance_cost": Sum("total_amount", filter=with_distance),
+            }
+        )
+    row = queryset.aggregate(**aggregates) if aggregates else {}
+
+    results: dict[str, dict] = {}
+    for index, (key, window_start) in enumerate(windows.items()):
+        has_entries = bool(row[f"w{index}_count"])
+        results[key] = metrics_from_totals(
+            total_spend=row[f"w{index}_spend"] or Decimal("0"),
+            total_liters=row[f"w{index}_liters"] or Decimal("0"),
+            total_distance=Decimal(row[f"w{index}_distance"] or 0),
+            liters_for_distance=row[f"w{index}_distance_liters"] or Decimal("0"),
+            cost_for_distance=row[f"w{index}_distance_cost"] or Decimal("0"),
+            min_date=row[f"w{index}_min_date"] if has_entries else None,
+            max_date=row[f"w{index}_max_date"] if has_entries else None,
+            window_start=window_start,
+        )
+    return results
+
+
+def aggregate_metrics_sql(queryset: QuerySet, window_start: date | None = None) -> dict:
+    """Return ``aggregate_metrics`` for ``queryset`` computed by PostgreSQL (reference only)."""
+
+    return aggregate_metrics_windows_sql(queryset, {"window": window_start})["window"]
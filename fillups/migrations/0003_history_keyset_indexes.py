@@ -0,0 +1,44 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fillups", "0002_add_user_and_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="fillup",
+            index=models.Index(
+                fields=["user", "date", "id"],
+                name="ix_fill_user_date_id",
+            ),
+        ),
+        # Scanned backwards, (user, date, id) serves every (user, -date) query.
+        migrations.RemoveIndex(
+            model_name="fillup",
+            name="ix_fill_user_date",
+        ),
+        migrations.AddIndex(
+            model_name="fillup",
+            index=models.Index(
+                fields=["user", "odometer_km", "id"],
+                name="ix_fill_user_odo_id",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="fillup",
+            index=models.Index(
+                fields=["user", "liters", "id"],
+                name="ix_fill_user_liters_id",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="fillup",
+            index=models.Index(
+                fields=["user", "total_amount", "id"],
+                name="ix_fill_user_total_id",
+            ),
+        ),
+    ]
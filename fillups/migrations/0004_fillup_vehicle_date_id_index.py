@@ -0,0 +1,18 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fillups", "0003_history_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="fillup",
+            index=models.Index(
+                fields=["vehicle", "date", "id"],
+                name="ix_fill_vehicle_date_id",
+            ),
+        ),
+    ]
@@ -0,0 +1,60 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+from django.db.models.functions import Upper
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fillups", "0004_fillup_vehicle_date_id_index"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name="fillup",
+            index=GinIndex(
+                OpClass(Upper("fuel_brand"), name="gin_trgm_ops"),
+                name="ix_fill_brand_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="fillup",
+            index=GinIndex(
+                OpClass(Upper("fuel_grade"), name="gin_trgm_ops"),
+                name="ix_fill_grade_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="fillup",
+            index=GinIndex(
+                OpClass(Upper("station_name"), name="gin_trgm_ops"),
+                name="ix_fill_station_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="fillup",
+            index=models.Index(
+                models.F("user"),
+                OpClass(Upper("fuel_brand"), name="text_pattern_ops"),
+                name="ix_fill_user_brand_prefix",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="fillup",
+            index=models.Index(
+                models.F("user"),
+                OpClass(Upper("fuel_grade"), name="text_pattern_ops"),
+                name="ix_fill_user_grade_prefix",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="fillup",
+            index=models.Index(
+                models.F("user"),
+                OpClass(Upper("station_name"), name="text_pattern_ops"),
+                name="ix_fill_user_station_prefix",
+            ),
+        ),
+    ]
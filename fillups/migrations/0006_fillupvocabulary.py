@@ -0,0 +1,89 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max
+import django.db.models.deletion
+import django.utils.timezone
+
+
+VOCABULARY_FIELDS = {
+    "brand": "fuel_brand",
+    "grade": "fuel_grade",
+    "station": "station_name",
+}
+
+
+def populate_vocabulary(apps, schema_editor):
+    FillUp = apps.get_model("fillups", "FillUp")
+    FillUpVocabulary = apps.get_model("fillups", "FillUpVocabulary")
+
+    for kind, field_name in VOCABULARY_FIELDS.items():
+        grouped = (
+            FillUp.objects.exclude(**{field_name: ""})
+            .order_by()
+            .values("user_id", field_name)
+            .annotate(usage_count=Count("id"), last_used_at=Max("updated_at"))
+        )
+        FillUpVocabulary.objects.bulk_create(
+            [
+                FillUpVocabulary(
+                    user_id=row["user_id"],
+                    kind=kind,
+                    value=row[field_name],
+                    usage_count=row["usage_count"],
+                    last_used_at=row["last_used_at"],
+                )
+                for row in grouped.iterator()
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("fillups", "0005_history_text_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FillUpVocabulary",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("brand", "Brand"), ("grade", "Grade"), ("station", "Station")],
+                        max_length=16,
+                    ),
+                ),
+                ("value", models.CharField(max_length=100)),
+                ("usage_count", models.PositiveIntegerField(default=0)),
+                ("last_used_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="fillup_vocabulary",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["user", "kind", "-usage_count", "value"],
+                        name="ix_vocab_user_kind_usage",
+                    ),
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="fillupvocabulary",
+            constraint=models.UniqueConstraint(
+                fields=("user", "kind", "value"),
+                name="uniq_vocab_user_kind_value",
+            ),
+        ),
+        migrations.RunPython(populate_vocabulary, migrations.RunPython.noop),
+    ]
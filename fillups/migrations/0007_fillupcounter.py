@@ -0,0 +1,85 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def populate_counters(apps, schema_editor):
+    FillUp = apps.get_model("fillups", "FillUp")
+    FillUpCounter = apps.get_model("fillups", "FillUpCounter")
+
+    per_vehicle = (
+        FillUp.objects.order_by()
+        .values("user_id", "vehicle_id")
+        .annotate(fillup_count=Count("id"))
+    )
+    counters = []
+    totals: dict[int, int] = {}
+    for row in per_vehicle.iterator():
+        counters.append(
+            FillUpCounter(
+                user_id=row["user_id"],
+                vehicle_id=row["vehicle_id"],
+                fillup_count=row["fillup_count"],
+            )
+        )
+        totals[row["user_id"]] = totals.get(row["user_id"], 0) + row["fillup_count"]
+    counters.extend(
+        FillUpCounter(user_id=user_id, vehicle_id=None, fillup_count=total)
+        for user_id, total in totals.items()
+    )
+    FillUpCounter.objects.bulk_create(counters, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("vehicles", "0002_vehicle_user_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("fillups", "0006_fillupvocabulary"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FillUpCounter",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("fillup_count", models.PositiveIntegerField(default=0)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="fillup_counters",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "vehicle",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="fillup_counters",
+                        to="vehicles.vehicle",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="fillupcounter",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("vehicle__isnull", True)),
+                fields=("user",),
+                name="uniq_fillcount_user_total",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="fillupcounter",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("vehicle__isnull", False)),
+                fields=("vehicle",),
+                name="uniq_fillcount_vehicle",
+            ),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,80 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import migrations, models
+
+
+QUANTUM = Decimal("0.000001")
+
+
+DERIVED_FIELDS = [
+    "distance_since_last_km",
+    "unit_price_per_liter",
+    "consumption_l_per_100km",
+    "cost_per_km",
+]
+
+
+def populate_derived_columns(apps, schema_editor):
+    FillUp = apps.get_model("fillups", "FillUp")
+
+    def quantize(value):
+        return value.quantize(QUANTUM, rounding=ROUND_HALF_UP)
+
+    rows = FillUp.objects.order_by("vehicle_id", "date", "id").only(
+        "id", "vehicle_id", "odometer_km", "liters", "total_amount"
+    )
+    batch = []
+    previous_vehicle_id = None
+    previous_odometer_km = None
+    for row in rows.iterator(chunk_size=1000):
+        if row.vehicle_id != previous_vehicle_id:
+            previous_odometer_km = None
+        if row.liters > 0:
+            row.unit_price_per_liter = quantize(row.total_amount / row.liters)
+        if previous_odometer_km is not None and row.odometer_km > previous_odometer_km:
+            distance = row.odometer_km - previous_odometer_km
+            row.distance_since_last_km = distance
+            if row.liters > 0:
+                row.consumption_l_per_100km = quantize(row.liters * Decimal(100) / Decimal(distance))
+            if row.total_amount > 0:
+                row.cost_per_km = quantize(row.total_amount / Decimal(distance))
+        batch.append(row)
+        previous_vehicle_id = row.vehicle_id
+        previous_odometer_km = row.odometer_km
+
+        if len(batch) >= 1000:
+            FillUp.objects.bulk_update(batch, DERIVED_FIELDS)
+            batch = []
+    if batch:
+        FillUp.objects.bulk_update(batch, DERIVED_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fillups", "0007_fillupcounter"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="fillup",
+            name="consumption_l_per_100km",
+            field=models.DecimalField(blank=True, decimal_places=6, editable=False, max_digits=18, null=True),
+        ),
+        migrations.AddField(
+            model_name="fillup",
+            name="cost_per_km",
+            field=models.DecimalField(blank=True, decimal_places=6, editable=False, max_digits=18, null=True),
+        ),
+        migrations.AddField(
+            model_name="fillup",
+            name="distance_since_last_km",
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="fillup",
+            name="unit_price_per_liter",
+            field=models.DecimalField(blank=True, decimal_places=6, editable=False, max_digits=18, null=True),
+        ),
+        migrations.RunPython(populate_derived_columns, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fillups", "0008_fillup_derived_columns"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="fillup",
+            index=models.Index(
+                fields=["user", "consumption_l_per_100km", "id"],
+                name="ix_fill_user_consumption_id",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="fillup",
+            index=models.Index(
+                fields=["user", "unit_price_per_liter", "id"],
+                name="ix_fill_user_unit_price_id",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="fillup",
+            index=models.Index(
+                fields=["user", "cost_per_km", "id"],
+                name="ix_fill_user_cost_km_id",
+            ),
+        ),
+    ]
@@ -0,0 +1,97 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+import django.db.models.deletion
+
+
+def populate_rollups(apps, schema_editor):
+    FillUp = apps.get_model("fillups", "FillUp")
+    FillUpDailyRollup = apps.get_model("fillups", "FillUpDailyRollup")
+
+    with_distance = Q(distance_since_last_km__isnull=False)
+    grouped = (
+        FillUp.objects.order_by()
+        .values("user_id", "vehicle_id", "date")
+        .annotate(
+            fill_count=Count("id"),
+            total_spend=Sum("total_amount"),
+            total_liters=Sum("liters"),
+            distance_km=Sum("distance_since_last_km"),
+            distance_liters=Sum("liters", filter=with_distance),
+            distance_cost=Sum("total_amount", filter=with_distance),
+        )
+    )
+    FillUpDailyRollup.objects.bulk_create(
+        [
+            FillUpDailyRollup(
+                user_id=row["user_id"],
+                vehicle_id=row["vehicle_id"],
+                day=row["date"],
+                fill_count=row["fill_count"],
+                total_spend=row["total_spend"],
+                total_liters=row["total_liters"],
+                distance_km=row["distance_km"] or 0,
+                distance_liters=row["distance_liters"] or 0,
+                distance_cost=row["distance_cost"] or 0,
+            )
+            for row in grouped.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("vehicles", "0002_vehicle_user_index"),
+        ("fillups", "0009_history_derived_sort_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FillUpDailyRollup",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("day", models.DateField()),
+                ("fill_count", models.PositiveIntegerField(default=0)),
+                ("total_spend", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ("total_liters", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ("distance_km", models.PositiveIntegerField(default=0)),
+                ("distance_liters", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ("distance_cost", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="fillup_daily_rollups",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "vehicle",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="fillup_daily_rollups",
+                        to="vehicles.vehicle",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["user", "day"],
+                        name="ix_rollup_user_day",
+                    ),
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="fillupdailyrollup",
+            constraint=models.UniqueConstraint(
+                fields=("vehicle", "day"),
+                name="uniq_rollup_vehicle_day",
+            ),
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
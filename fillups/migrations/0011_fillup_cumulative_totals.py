@@ -0,0 +1,70 @@
+from django.db import migrations, models
+
+
+POPULATE_CUMULATIVE_TOTALS = """
+WITH running AS (
+    SELECT
+        id,
+        SUM(1) OVER w AS cum_fill_count,
+        SUM(total_amount) OVER w AS cum_spend,
+        SUM(liters) OVER w AS cum_liters,
+        SUM(COALESCE(distance_since_last_km, 0)) OVER w AS cum_distance_km,
+        SUM(CASE WHEN distance_since_last_km IS NULL THEN 0 ELSE liters END) OVER w
+            AS cum_distance_liters,
+        SUM(CASE WHEN distance_since_last_km IS NULL THEN 0 ELSE total_amount END) OVER w
+            AS cum_distance_cost
+    FROM fillups_fillup
+    WINDOW w AS (PARTITION BY vehicle_id ORDER BY date, id ROWS UNBOUNDED PRECEDING)
+)
+UPDATE fillups_fillup AS fill
+SET
+    cum_fill_count = running.cum_fill_count,
+    cum_spend = running.cum_spend,
+    cum_liters = running.cum_liters,
+    cum_distance_km = running.cum_distance_km,
+    cum_distance_liters = running.cum_distance_liters,
+    cum_distance_cost = running.cum_distance_cost
+FROM running
+WHERE fill.id = running.id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fillups", "0010_fillupdailyrollup"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="fillup",
+            name="cum_fill_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="fillup",
+            name="cum_spend",
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=16),
+        ),
+        migrations.AddField(
+            model_name="fillup",
+            name="cum_liters",
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=16),
+        ),
+        migrations.AddField(
+            model_name="fillup",
+            name="cum_distance_km",
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="fillup",
+            name="cum_distance_liters",
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=16),
+        ),
+        migrations.AddField(
+            model_name="fillup",
+            name="cum_distance_cost",
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=16),
+        ),
+        migrations.RunSQL(POPULATE_CUMULATIVE_TOTALS, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,18 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fillups", "0011_fillup_cumulative_totals"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="fillup",
+            index=models.Index(
+                fields=["user", "updated_at"],
+                name="ix_fill_user_updated",
+            ),
+        ),
+    ]
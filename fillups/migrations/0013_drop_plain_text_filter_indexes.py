@@ -0,0 +1,25 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fillups", "0012_fillup_user_updated_index"),
+    ]
+
+    # History text filters compare UPPER(column) and use the expression
+    # indexes from 0005; nothing filters on the raw columns any more.
+    operations = [
+        migrations.RemoveIndex(
+            model_name="fillup",
+            name="ix_fill_user_brand",
+        ),
+        migrations.RemoveIndex(
+            model_name="fillup",
+            name="ix_fill_user_grade",
+        ),
+        migrations.RemoveIndex(
+            model_name="fillup",
+            name="ix_fill_user_station",
+        ),
+    ]
@@ -0,0 +1,53 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.operations import BtreeGinExtension
+from django.db import migrations, models
+from django.db.models.functions import Upper
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fillups", "0013_drop_plain_text_filter_indexes"),
+    ]
+
+    # btree_gin lets the trigram indexes lead with user_id, so substring
+    # filters no longer scan every user's matches and recheck the owner.
+    operations = [
+        BtreeGinExtension(),
+        migrations.RemoveIndex(
+            model_name="fillup",
+            name="ix_fill_brand_trgm",
+        ),
+        migrations.AddIndex(
+            model_name="fillup",
+            index=GinIndex(
+                models.F("user"),
+                OpClass(Upper("fuel_brand"), name="gin_trgm_ops"),
+                name="ix_fill_user_brand_trgm",
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="fillup",
+            name="ix_fill_grade_trgm",
+        ),
+        migrations.AddIndex(
+            model_name="fillup",
+            index=GinIndex(
+                models.F("user"),
+                OpClass(Upper("fuel_grade"), name="gin_trgm_ops"),
+                name="ix_fill_user_grade_trgm",
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="fillup",
+            name="ix_fill_station_trgm",
+        ),
+        migrations.AddIndex(
+            model_name="fillup",
+            index=GinIndex(
+                models.F("user"),
+                OpClass(Upper("station_name"), name="gin_trgm_ops"),
+                name="ix_fill_user_station_trgm",
+            ),
+        ),
+    ]
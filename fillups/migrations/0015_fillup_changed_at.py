@@ -0,0 +1,35 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fillups", "0014_user_scoped_trigram_indexes"),
+    ]
+
+    # Delta exports move from updated_at to changed_at so that derived
+    # refreshes no longer touch updated_at; existing rows start from it.
+    operations = [
+        migrations.AddField(
+            model_name="fillup",
+            name="changed_at",
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunSQL(
+            "UPDATE fillups_fillup SET changed_at = updated_at",
+            migrations.RunSQL.noop,
+        ),
+        migrations.RemoveIndex(
+            model_name="fillup",
+            name="ix_fill_user_updated",
+        ),
+        migrations.AddIndex(
+            model_name="fillup",
+            index=models.Index(
+                fields=["user", "changed_at"],
+                name="ix_fill_user_changed",
+            ),
+        ),
+    ]
@@ -1,13 +1,26 @@
 from __future__ import annotations
 
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.core.exceptions import ValidationError
-from django.db import models
-from django.db.models import Q
+from django.db import models, transaction
+from django.db.models import F, Q, Value
+from django.db.models.functions import Cast, Upper
+from django.utils import timezone
 
 from . import validators
 
 
+def user_key(user) -> Cast:
+    """Return ``user``'s id as a ``bigint`` SQL value for ``user_id`` filters.
+
+    ``btree_gin`` only indexes ``bigint = bigint``; against a plain integer
+    literal the user-scoped trigram indexes cannot use their user column.
+    """
+
+    return Cast(Value(user.pk), models.BigIntegerField())
+
+
 class FillUp(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -30,6 +43,52 @@ class FillUp(models.Model):
     notes = models.CharField(max_length=500, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Last change of any exported column, including derived values refreshed
+    # after an edit of another fill; delta exports filter on it so that
+    # ``updated_at`` keeps meaning the last edit of this fill.
+    changed_at = models.DateTimeField(auto_now=True)
+
+    # Derived per-fill values, maintained by the save/delete receivers from the
+    # previous fill of the same vehicle in (date, id) order.
+    distance_since_last_km = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    unit_price_per_liter = models.DecimalField(
+        max_digits=18, decimal_places=6, null=True, blank=True, editable=False
+    )
+    consumption_l_per_100km = models.DecimalField(
+        max_digits=18, decimal_places=6, null=True, blank=True, editable=False
+    )
+    cost_per_km = models.DecimalField(
+        max_digits=18, decimal_places=6, null=True, blank=True, editable=False
+    )
+
+    # Running totals over the vehicle's fills in (date, id) order, inclusive of
+    # this fill; a date range total is the difference of two rows.
+    cum_fill_count = models.PositiveIntegerField(default=0, editable=False)
+    cum_spend = models.DecimalField(max_digits=16, decimal_places=2, default=0, editable=False)
+    cum_liters = models.DecimalField(max_digits=16, decimal_places=2, default=0, editable=False)
+    cum_distance_km = models.PositiveBigIntegerField(default=0, editable=False)
+    cum_distance_liters = models.DecimalField(
+        max_digits=16, decimal_places=2, default=0, editable=False
+    )
+    cum_distance_cost = models.DecimalField(
+        max_digits=16, decimal_places=2, default=0, editable=False
+    )
+
+    # Columns written only by the save/delete receivers (see fillups.signals).
+    MAINTAINED_FIELDS = frozenset(
+        {
+            "distance_since_last_km",
+            "unit_price_per_liter",
+            "consumption_l_per_100km",
+            "cost_per_km",
+            "cum_fill_count",
+            "cum_spend",
+            "cum_liters",
+            "cum_distance_km",
+            "cum_distance_liters",
+            "cum_distance_cost",
+        }
+    )
 
     class Meta:
         indexes = [
@@ -38,24 +97,83 @@ class FillUp(models.Model):
                 name="ix_fill_user_veh_date",
             ),
             models.Index(
-                fields=["user", "-date"],
-                name="ix_fill_user_date",
+                fields=["vehicle", "odometer_km"],
+                name="ix_fill_vehicle_odo",
             ),
+            # Previous/next fill lookups walk a vehicle in (date, id) order.
             models.Index(
-                fields=["user", "fuel_brand"],
-                name="ix_fill_user_brand",
+                fields=["vehicle", "date", "id"],
+                name="ix_fill_vehicle_date_id",
             ),
+            # Keyset pagination: one (user, sort column, id) index per History
+            # sort. Scanned backwards, (user, date, id) also serves newest-first
+            # date listings.
             models.Index(
-                fields=["user", "fuel_grade"],
-                name="ix_fill_user_grade",
+                fields=["user", "date", "id"],
+                name="ix_fill_user_date_id",
             ),
             models.Index(
-                fields=["user", "station_name"],
-                name="ix_fill_user_station",
+                fields=["user", "odometer_km", "id"],
+                name="ix_fill_user_odo_id",
             ),
             models.Index(
-                fields=["vehicle", "odometer_km"],
-                name="ix_fill_vehicle_odo",
+                fields=["user", "liters", "id"],
+                name="ix_fill_user_liters_id",
+            ),
+            models.Index(
+                fields=["user", "total_amount", "id"],
+                name="ix_fill_user_total_id",
+            ),
+            models.Index(
+                fields=["user", "consumption_l_per_100km", "id"],
+                name="ix_fill_user_consumption_id",
+            ),
+            models.Index(
+                fields=["user", "unit_price_per_liter", "id"],
+                name="ix_fill_user_unit_price_id",
+            ),
+            models.Index(
+                fields=["user", "cost_per_km", "id"],
+                name="ix_fill_user_cost_km_id",
+            ),
+            # Delta exports select the fills changed after a timestamp.
+            models.Index(
+                fields=["user", "changed_at"],
+                name="ix_fill_user_changed",
+            ),
+            # History text filters compare UPPER(column): trigram GIN indexes
+            # serve substring matches, pattern_ops B-trees serve prefix matches.
+            # Both lead with the user (btree_gin for the GIN ones) so a filter
+            # only scans the requesting user's rows.
+            GinIndex(
+                F("user"),
+                OpClass(Upper("fuel_brand"), name="gin_trgm_ops"),
+                name="ix_fill_user_brand_trgm",
+            ),
+            GinIndex(
+                F("user"),
+                OpClass(Upper("fuel_grade"), name="gin_trgm_ops"),
+                name="ix_fill_user_grade_trgm",
+            ),
+            GinIndex(
+                F("user"),
+                OpClass(Upper("station_name"), name="gin_trgm_ops"),
+                name="ix_fill_user_station_trgm",
+            ),
+            models.Index(
+                F("user"),
+                OpClass(Upper("fuel_brand"), name="text_pattern_ops"),
+                name="ix_fill_user_brand_prefix",
+            ),
+            models.Index(
+                F("user"),
+                OpClass(Upper("fuel_grade"), name="text_pattern_ops"),
+                name="ix_fill_user_grade_prefix",
+            ),
+            models.Index(
+                F("user"),
+                OpClass(Upper("station_name"), name="text_pattern_ops"),
+                name="ix_fill_user_station_prefix",
             ),
         ]
         constraints = [
@@ -118,7 +236,139 @@ class FillUp(models.Model):
             # Keep the user field aligned with the related vehicle owner.
             self.user_id = self.vehicle.user_id
         self.full_clean()
-        return super().save(*args, **kwargs)
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            # Never write back possibly stale maintained columns on update.
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.MAINTAINED_FIELDS
+            ]
+        # Derived tables maintained by the save receivers commit with the row.
+        with transaction.atomic():
+            return super().save(*args, **kwargs)
 
     def __str__(self) -> str:
         return f"Fill-up on {self.date} at {self.odometer_km} km"
+
+
+class FillUpVocabulary(models.Model):
+    """Per-user brand, grade, and station values with usage counts.
+
+    Maintained by the fill-up save/delete receivers so option lists come from
+    one small indexed read instead of ``SELECT DISTINCT`` over every fill-up.
+    """
+
+    class Kind(models.TextChoices):
+        BRAND = "brand", "Brand"
+        GRADE = "grade", "Grade"
+        STATION = "station", "Station"
+
+    FIELD_BY_KIND = {
+        Kind.BRAND: "fuel_brand",
+        Kind.GRADE: "fuel_grade",
+        Kind.STATION: "station_name",
+    }
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="fillup_vocabulary",
+    )
+    kind = models.CharField(max_length=16, choices=Kind.choices)
+    value = models.CharField(max_length=100)
+    usage_count = models.PositiveIntegerField(default=0)
+    last_used_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "kind", "-usage_count", "value"],
+                name="ix_vocab_user_kind_usage",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "kind", "value"],
+                name="uniq_vocab_user_kind_value",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.kind}: {self.value} ({self.usage_count})"
+
+
+class FillUpCounter(models.Model):
+    """Running fill-up totals per user (``vehicle`` unset) and per vehicle.
+
+    Kept current by the fill-up save/delete receivers so unfiltered History
+    pages can skip ``COUNT(*)`` over the user's fill-ups.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="fillup_counters",
+    )
+    vehicle = models.ForeignKey(
+        "vehicles.Vehicle",
+        on_delete=models.CASCADE,
+        related_name="fillup_counters",
+        null=True,
+        blank=True,
+    )
+    fillup_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user"],
+                condition=Q(vehicle__isnull=True),
+                name="uniq_fillcount_user_total",
+            ),
+            models.UniqueConstraint(
+                fields=["vehicle"],
+                condition=Q(vehicle__isnull=False),
+                name="uniq_fillcount_vehicle",
+            ),
+        ]
+
+
+class FillUpDailyRollup(models.Model):
+    """Per-vehicle daily sums of fill-up spend, volume, and attributed distance.
+
+    ``distance_km`` comes from the stored ``distance_since_last_km`` of the
+    day's fills; ``distance_liters``/``distance_cost`` sum the fills that
+    carry a distance. Maintained by the fill-up save/delete receivers.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="fillup_daily_rollups",
+    )
+    vehicle = models.ForeignKey(
+        "vehicles.Vehicle",
+        on_delete=models.CASCADE,
+        related_name="fillup_daily_rollups",
+    )
+    day = models.DateField()
+    fill_count = models.PositiveIntegerField(default=0)
+    total_spend = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_liters = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    distance_km = models.PositiveIntegerField(default=0)
+    distance_liters = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    distance_cost = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "day"],
+                name="ix_rollup_user_day",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["vehicle", "day"],
+                name="uniq_rollup_vehicle_day",
+            ),
+        ]
@@ -0,0 +1,256 @@
+"""Pagination helpers for fill-up listings: keyset cursors and count-free paginators."""
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+from typing import Any
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import models
+from django.db.models import F, Func, Value
+from django.utils.functional import cached_property
+
+
+class Row(Func):
+    """Render a SQL row constructor so ``(col, id) < (%s, %s)`` stays index friendly."""
+
+    function = ""
+    template = "(%(expressions)s)"
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """Decoded position within an ordered fill-up listing."""
+
+    sort_key: str
+    direction: str
+    value: str
+    pk: int
+    backwards: bool = False
+
+    def encode(self) -> str:
+        payload = json.dumps(
+            {
+                "s": self.sort_key,
+                "d": self.direction,
+                "v": self.value,
+                "i": self.pk,
+                "b": int(self.backwards),
+            },
+            separators=(",", ":"),
+        )
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str | None) -> Cursor | None:
+    """Return the cursor encoded in ``token`` or ``None`` when it is malformed."""
+
+    if not token:
+        return None
+    padded = token + "=" * (-len(token) % 4)
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return Cursor(
+            sort_key=str(payload["s"]),
+            direction=str(payload["d"]),
+            value=str(payload["v"]),
+            pk=int(payload["i"]),
+            backwards=bool(payload.get("b", 0)),
+        )
+    except (binascii.Error, ValueError, TypeError, KeyError, UnicodeDecodeError):
+        return None
+
+
+@dataclass
+class KeysetPage:
+    """Page of results produced by :func:`paginate_keyset`.
+
+    Mirrors the parts of Django's ``Page`` API used by the templates so the
+    same context keys work in both paging modes.
+    """
+
+    object_list: list = field(default_factory=list)
+    has_next_page: bool = False
+    has_previous_page: bool = False
+    next_cursor: str | None = None
+    previous_cursor: str | None = None
+
+    def has_next(self) -> bool:
+        return self.has_next_page
+
+    def has_previous(self) -> bool:
+        return self.has_previous_page
+
+    def has_other_pages(self) -> bool:
+        return self.has_next_page or self.has_previous_page
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+
+def _sort_value(obj: Any, field_name: str) -> str:
+    value = getattr(obj, field_name)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def paginate_keyset(
+    queryset: models.QuerySet,
+    *,
+    sort_key: str,
+    field_name: str,
+    direction: str,
+    cursor: Cursor | None,
+    per_page: int,
+) -> KeysetPage:
+    """Return one page of ``queryset`` ordered by ``field_name`` with ``id`` as tie-breaker.
+
+    Each page is a single range scan over an ``(user, field, id)`` index: the
+    cursor becomes a row comparison on ``(field, id)`` rather than an OFFSET.
+    A cursor that belongs to a different sort or cannot be parsed restarts
+    from the first page.
+    """
+
+    if cursor is not None and (cursor.sort_key != sort_key or cursor.direction != direction):
+        cursor = None
+
+    model_field = queryset.model._meta.get_field(field_name)
+    descending = direction == "desc"
+    backwards = cursor is not None and cursor.backwards
+    scan_descending = descending != backwards
+
+    if cursor is not None:
+        try:
+            boundary = model_field.to_python(cursor.value)
+        except ValidationError:
+            cursor = None
+            backwards = False
+            scan_descending = descending
+        else:
+            lookup = "lt" if scan_descending else "gt"
+            queryset = queryset.alias(
+                _keyset=Row(F(field_name), F("id"), output_field=model_field)
+            ).filter(
+                **{
+                    f"_keyset__{lookup}": Row(
+                        Value(boundary, output_field=model_field),
+                        Value(cursor.pk, output_field=models.BigIntegerField()),
+                        output_field=model_field,
+                    )
+                }
+            )
+
+    if scan_descending:
+        ordering = [f"-{field_name}", "-id"]
+    else:
+        ordering = [field_name, "id"]
+
+    rows = list(queryset.order_by(*ordering)[: per_page + 1])
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+
+    if backwards:
+        rows.reverse()
+        has_next_page = True
+        has_previous_page = has_more
+    else:
+        has_next_page = has_more
+        has_previous_page = cursor is not None
+
+    page = KeysetPage(
+        object_list=rows,
+        has_next_page=has_next_page,
+        has_previous_page=has_previous_page,
+    )
+    if rows and has_next_page:
+        last = rows[-1]
+        page.next_cursor = Cursor(
+            sort_key=sort_key,
+            direction=direction,
+            value=_sort_value(last, field_name),
+            pk=last.pk,
+        ).encode()
+    if rows and has_previous_page:
+        first = rows[0]
+        page.previous_cursor = Cursor(
+            sort_key=sort_key,
+            direction=direction,
+            value=_sort_value(first, field_name),
+            pk=first.pk,
+            backwards=True,
+        ).encode()
+    return page
+
+
+class CountedPaginator(Paginator):
+    """Paginator that trusts a precomputed row count instead of running ``COUNT(*)``."""
+
+    def __init__(self, object_list, per_page, *, known_count: int, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.known_count = known_count
+
+    @cached_property
+    def count(self) -> int:
+        return self.known_count
+
+
+class LookaheadPage(Page):
+    """Page whose ``has_next`` comes from one extra fetched row, not the total."""
+
+    def __init__(self, object_list, number, paginator, *, has_next_page: bool):
+        super().__init__(object_list, number, paginator)
+        self.has_next_page = has_next_page
+
+    def has_next(self) -> bool:
+        return self.has_next_page
+
+    def end_index(self) -> int:
+        return self.start_index() + len(self.object_list) - 1
+
+
+class LookaheadPaginator(Paginator):
+    """OFFSET paginator that never counts the full result.
+
+    Each page reads ``per_page + 1`` rows to learn whether another page
+    follows, so ``count`` and ``num_pages`` are ``None`` and templates show the
+    current page number only.
+    """
+
+    @cached_property
+    def count(self) -> None:
+        return None
+
+    @cached_property
+    def num_pages(self) -> None:
+        return None
+
+    def validate_number(self, number) -> int:
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger("That page number is not an integer")
+        if number < 1:
+            raise EmptyPage("That page number is less than 1")
+        return number
+
+    def page(self, number) -> LookaheadPage:
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom : bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage("That page contains no results")
+        return LookaheadPage(
+            rows[: self.per_page],
+            number,
+            self,
+            has_next_page=len(rows) > self.per_page,
+        )
@@ -0,0 +1,216 @@
+"""Maintenance and window queries for the per-vehicle daily fill-up rollups."""
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+from typing import Iterable, Mapping
+
+from django.db import connection
+from django.db.models import Count, Max, Min, OuterRef, Q, QuerySet, Subquery, Sum
+
+from vehicles.models import Vehicle
+
+from .metrics import metrics_from_totals
+from .models import FillUp, FillUpDailyRollup
+
+
+SUM_FIELDS = ("total_spend", "total_liters", "distance_km", "distance_liters", "distance_cost")
+
+
+def daily_sums(queryset: QuerySet) -> QuerySet:
+    """Group ``queryset`` fill-ups into rollup values per ``(user, vehicle, date)``."""
+
+    with_distance = Q(distance_since_last_km__isnull=False)
+    return (
+        queryset.order_by()
+        .values("user_id", "vehicle_id", "date")
+        .annotate(
+            fill_count=Count("id"),
+            total_spend=Sum("total_amount"),
+            total_liters=Sum("liters"),
+            distance_km=Sum("distance_since_last_km"),
+            distance_liters=Sum("liters", filter=with_distance),
+            distance_cost=Sum("total_amount", filter=with_distance),
+        )
+    )
+
+
+def _rollup_from_row(row: Mapping) -> FillUpDailyRollup:
+    return FillUpDailyRollup(
+        user_id=row["user_id"],
+        vehicle_id=row["vehicle_id"],
+        day=row["date"],
+        fill_count=row["fill_count"],
+        **{name: row[name] or 0 for name in SUM_FIELDS},
+    )
+
+
+def refresh_days(days: Iterable[tuple[int, date]]) -> None:
+    """Recompute the rollup rows of the given ``(vehicle_id, day)`` pairs."""
+
+    for vehicle_id, day in set(days):
+        rows = list(daily_sums(FillUp.objects.filter(vehicle_id=vehicle_id, date=day)))
+        row = rows[0] if rows else None
+        if row is None:
+            FillUpDailyRollup.objects.filter(vehicle_id=vehicle_id, day=day).delete()
+            continue
+        rollup = _rollup_from_row(row)
+        FillUpDailyRollup.objects.update_or_create(
+            vehicle_id=vehicle_id,
+            day=day,
+            defaults={
+                "user_id": rollup.user_id,
+                "fill_count": rollup.fill_count,
+                **{name: getattr(rollup, name) for name in SUM_FIELDS},
+            },
+        )
+
+
+def apply_change(
+    previous: Mapping | None, current: Mapping | None, refreshed_ids: Iterable[int] = ()
+) -> None:
+    """Refresh the days touched by a fill-up write.
+
+    Those are the old and new day of the fill itself plus the days of fills
+    whose derived distance was recomputed (see :func:`fillups.derived.apply_change`).
+    """
+
+    refreshed_ids = set(refreshed_ids)
+    if previous and current and not refreshed_ids and all(
+        previous[name] == current[name]
+        for name in ("vehicle_id", "date", "liters", "total_amount")
+    ):
+        return
+
+    days = {
+        (state["vehicle_id"], state["date"])
+        for state in (previous, current)
+        if state is not None
+    }
+    if refreshed_ids:
+        days.update(
+            FillUp.objects.filter(id__in=refreshed_ids).values_list("vehicle_id", "date")
+        )
+    refresh_days(days)
+
+
+# ``daily_sums`` as one INSERT ... SELECT, so a rebuild never round-trips rows.
+_REBUILD_SQL = """
+INSERT INTO {rollups} (
+    user_id, vehicle_id, day, fill_count,
+    total_spend, total_liters, distance_km, distance_liters, distance_cost
+)
+SELECT
+    user_id,
+    vehicle_id,
+    date,
+    COUNT(*),
+    COALESCE(SUM(total_amount), 0),
+    COALESCE(SUM(liters), 0),
+    COALESCE(SUM(distance_since_last_km), 0),
+    COALESCE(SUM(liters) FILTER (WHERE distance_since_last_km IS NOT NULL), 0),
+    COALESCE(SUM(total_amount) FILTER (WHERE distance_since_last_km IS NOT NULL), 0)
+FROM {fillups}
+WHERE user_id = %(user)s
+GROUP BY user_id, vehicle_id, date
+"""
+
+
+def rebuild_for_user(user_id: int) -> None:
+    """Recompute every rollup row of ``user_id`` from its fill-ups."""
+
+    FillUpDailyRollup.objects.filter(user_id=user_id).delete()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            _REBUILD_SQL.format(
+                rollups=connection.ops.quote_name(FillUpDailyRollup._meta.db_table),
+                fillups=connection.ops.quote_name(FillUp._meta.db_table),
+            ),
+            {"user": user_id},
+        )
+
+
+def rollup_metrics_windows(
+    user, windows: Mapping[str, date | None], vehicle_id: int | None = None
+) -> dict[str, dict]:
+    """Return ``aggregate_metrics`` results for each window from the daily rollups.
+
+    One query sums the rollup rows of every window. In ``aggregate_metrics`` the
+    first fill of a vehicle inside a window has no distance (its predecessor
+    lies outside), whereas the stored distance counts it; a second query finds
+    those first fills, one index probe per vehicle and window, and their
+    distance is taken back out.
+    """
+
+    rollups = FillUpDailyRollup.objects.filter(user=user)
+    vehicles = Vehicle.objects.filter(user=user)
+    if vehicle_id is not None:
+        rollups = rollups.filter(vehicle_id=vehicle_id)
+        vehicles = vehicles.filter(id=vehicle_id)
+
+    starts = list(windows.values())
+    aggregates = {}
+    for index, window_start in enumerate(starts):
+        in_window = Q(day__gte=window_start) if window_start is not None else None
+        aggregates[f"w{index}_count"] = Sum("fill_count", filter=in_window)
+        aggregates[f"w{index}_min_day"] = Min("day", filter=in_window)
+        aggregates[f"w{index}_max_day"] = Max("day", filter=in_window)
+        for name in SUM_FIELDS:
+            aggregates[f"w{index}_{name}"] = Sum(name, filter=in_window)
+    row = rollups.aggregate(**aggregates) if aggregates else {}
+
+    first_fills = {
+        f"w{index}": Subquery(
+            FillUp.objects.filter(vehicle_id=OuterRef("pk"), date__gte=window_start)
+            .order_by("date", "id")
+            .values("id")[:1]
+        )
+        for index, window_start in enumerate(starts)
+        if window_start is not None
+    }
+    first_ids_by_window: dict[int, set[int]] = {}
+    if first_fills:
+        for first_ids in vehicles.annotate(**first_fills).values(*first_fills):
+            for name, fillup_id in first_ids.items():
+                if fillup_id is not None:
+                    first_ids_by_window.setdefault(int(name[1:]), set()).add(fillup_id)
+    overcounted: dict[int, dict] = {}
+    all_first_ids = set().union(*first_ids_by_window.values())
+    if all_first_ids:
+        overcounted = {
+            fill["id"]: fill
+            for fill in FillUp.objects.filter(
+                id__in=all_first_ids, distance_since_last_km__isnull=False
+            ).values("id", "distance_since_last_km", "liters", "total_amount")
+        }
+
+    results: dict[str, dict] = {}
+    for index, (key, window_start) in enumerate(windows.items()):
+        distance_km = row[f"w{index}_distance_km"] or 0
+        distance_liters = row[f"w{index}_distance_liters"] or Decimal("0")
+        distance_cost = row[f"w{index}_distance_cost"] or Decimal("0")
+        for fillup_id in first_ids_by_window.get(index, ()):
+            fill = overcounted.get(fillup_id)
+            if fill is not None:
+                distance_km -= fill["distance_since_last_km"]
+                distance_liters -= fill["liters"]
+                distance_cost -= fill["total_amount"]
+
+        has_entries = bool(row[f"w{index}_count"])
+        results[key] = metrics_from_totals(
+            total_spend=row[f"w{index}_total_spend"] or Decimal("0"),
+            total_liters=row[f"w{index}_total_liters"] or Decimal("0"),
+            total_distance=Decimal(distance_km),
+            liters_for_distance=distance_liters,
+            cost_for_distance=distance_cost,
+            min_date=row[f"w{index}_min_day"] if has_entries else None,
+            max_date=row[f"w{index}_max_day"] if has_entries else None,
+            window_start=window_start,
+        )
+    return results
+
+
+def rollup_metrics(user, window_start: date | None = None, vehicle_id: int | None = None) -> dict:
+    """Return ``aggregate_metrics`` for one window computed from the daily rollups."""
+
+    return rollup_metrics_windows(user, {"window": window_start}, vehicle_id=vehicle_id)["window"]
@@ -0,0 +1,122 @@
+"""Columnar view of a set of fill-ups shared by the aggregate and statistics helpers."""
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+from typing import Iterable
+
+from django.db.models import QuerySet
+
+from .loaders import FillRow
+from .models import FillUp
+
+
+class FillSeries:
+    """Fill-ups held as parallel columns in ``(vehicle_id, date, id)`` order.
+
+    Sorting and the per-vehicle deltas are done once on construction:
+    ``distances[i]`` is the positive odometer increase since the previous fill
+    of the same vehicle *within the series* (``None`` otherwise), and
+    ``consumptions[i]`` the matching L/100km. ``chronological`` lists the
+    positions in ``(date, id)`` order for the time series.
+    """
+
+    def __init__(self, entries: Iterable[FillUp | FillRow] = ()) -> None:
+        ordered = sorted(entries, key=lambda entry: (entry.vehicle_id, entry.date, entry.id))
+        self._set_columns(
+            [entry.id for entry in ordered],
+            [entry.vehicle_id for entry in ordered],
+            [entry.date for entry in ordered],
+            [entry.odometer_km for entry in ordered],
+            [entry.liters for entry in ordered],
+            [entry.total_amount for entry in ordered],
+            [entry.fuel_brand for entry in ordered],
+            [entry.fuel_grade for entry in ordered],
+        )
+
+    @classmethod
+    def load(cls, queryset: QuerySet) -> "FillSeries":
+        """Build a series from ``queryset`` reading only the needed columns."""
+
+        rows = queryset.order_by("vehicle_id", "date", "id").values_list(*FillRow._fields)
+        columns = [list(column) for column in zip(*rows)] or [[] for _ in FillRow._fields]
+        series = cls.__new__(cls)
+        series._set_columns(*columns)
+        return series
+
+    @classmethod
+    def coerce(cls, entries: "FillSeries | Iterable[FillUp | FillRow]") -> "FillSeries":
+        """Return ``entries`` as a series, building one from model instances or rows."""
+
+        if isinstance(entries, cls):
+            return entries
+        return cls(entries)
+
+    def _set_columns(
+        self,
+        ids: list[int],
+        vehicle_ids: list[int],
+        dates: list[date],
+        odometers: list[int],
+        liters: list[Decimal],
+        amounts: list[Decimal],
+        brands: list[str],
+        grades: list[str],
+    ) -> None:
+        self.ids = ids
+        self.vehicle_ids = vehicle_ids
+        self.dates = dates
+        self.odometers = odometers
+        self.liters = liters
+        self.amounts = amounts
+        self.brands = brands
+        self.grades = grades
+
+        self.distances: list[int | None] = []
+        self.consumptions: list[float | None] = []
+        previous_vehicle_id = None
+        previous_odometer = 0
+        for vehicle_id, odometer, volume in zip(vehicle_ids, odometers, liters):
+            distance = None
+            consumption = None
+            if vehicle_id == previous_vehicle_id and odometer - previous_odometer > 0:
+                distance = odometer - previous_odometer
+                if volume > 0:
+                    consumption = float((volume * Decimal(100)) / Decimal(distance))
+            self.distances.append(distance)
+            self.consumptions.append(consumption)
+            previous_vehicle_id = vehicle_id
+            previous_odometer = odometer
+
+        self.chronological = sorted(range(len(ids)), key=lambda index: (dates[index], ids[index]))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def window(self, start: date | None = None, end: date | None = None) -> "FillSeries":
+        """Return the fills dated within ``[start, end]`` with deltas measured inside it."""
+
+        if start is None and end is None:
+            return self
+        keep = [
+            index
+            for index, fill_date in enumerate(self.dates)
+            if (start is None or fill_date >= start) and (end is None or fill_date <= end)
+        ]
+        series = FillSeries.__new__(FillSeries)
+        series._set_columns(
+            *(
+                [column[index] for index in keep]
+                for column in (
+                    self.ids,
+                    self.vehicle_ids,
+                    self.dates,
+                    self.odometers,
+                    self.liters,
+                    self.amounts,
+                    self.brands,
+                    self.grades,
+                )
+            )
+        )
+        return series
@@ -0,0 +1,87 @@
+"""Signal handlers keeping fill-up derived data in step with writes."""
+from __future__ import annotations
+
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from vehicles.models import Vehicle
+
+from . import counters, cumulative, derived, rollups, vocabulary
+from .models import FillUp
+
+
+TRACKED_FIELDS = (
+    "user_id",
+    "vehicle_id",
+    "date",
+    "odometer_km",
+    "station_name",
+    "fuel_brand",
+    "fuel_grade",
+    "liters",
+    "total_amount",
+)
+
+
+def fillup_state(instance: FillUp) -> dict:
+    """Return the tracked column values of ``instance`` as a plain mapping."""
+
+    return {name: getattr(instance, name) for name in TRACKED_FIELDS}
+
+
+def _deleted_directly(origin, model) -> bool:
+    """Return whether a delete started from ``model`` rather than a parent cascade."""
+
+    if isinstance(origin, QuerySet):
+        return origin.model is model
+    return isinstance(origin, model)
+
+
+@receiver(pre_save, sender=FillUp)
+def remember_previous_state(sender, instance: FillUp, raw: bool = False, **kwargs) -> None:
+    """Load the stored row so post-save handlers can diff old and new values."""
+
+    instance._previous_state = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    instance._previous_state = (
+        FillUp.objects.filter(pk=instance.pk).values(*TRACKED_FIELDS).first()
+    )
+
+
+@receiver(post_save, sender=FillUp)
+def update_after_save(sender, instance: FillUp, raw: bool = False, **kwargs) -> None:
+    if raw:
+        return
+    previous = getattr(instance, "_previous_state", None)
+    current = fillup_state(instance)
+    vocabulary.apply_change(previous, current)
+    counters.apply_change(previous, current)
+    refreshed = derived.apply_change(instance.pk, previous, current)
+    for name, value in refreshed.get(instance.pk, {}).items():
+        setattr(instance, name, value)
+    rollups.apply_change(previous, current, refreshed)
+    cumulative.apply_change(instance.pk, previous, current)
+
+
+@receiver(post_delete, sender=FillUp)
+def update_after_delete(sender, instance: FillUp, origin=None, **kwargs) -> None:
+    # Vehicle and account cascades are reconciled once by the parent handler.
+    if not _deleted_directly(origin, FillUp):
+        return
+    previous = fillup_state(instance)
+    vocabulary.apply_change(previous, None)
+    counters.apply_change(previous, None)
+    refreshed = derived.apply_change(instance.pk, previous, None)
+    rollups.apply_change(previous, None, refreshed)
+    cumulative.apply_change(instance.pk, previous, None)
+
+
+@receiver(post_delete, sender=Vehicle)
+def update_after_vehicle_delete(sender, instance: Vehicle, origin=None, **kwargs) -> None:
+    # Account deletion removes the derived rows through their own cascade.
+    if not _deleted_directly(origin, Vehicle):
+        return
+    vocabulary.rebuild_for_user(instance.user_id)
+    counters.rebuild_for_user(instance.user_id)
@@ -5,7 +5,15 @@ from datetime import date, timedelta
 from decimal import Decimal
 from typing import Iterable
 
+from django.core.exceptions import EmptyResultSet
+from django.db import connection
+from django.db.models import F, QuerySet, Value, Window
+from django.db.models.functions import Coalesce, Lag, RowNumber
+
+from .loaders import FillRow
 from .models import FillUp
+from .series import FillSeries
+from . import vectorized
 
 
 def window_start_from_param(param: str, today: date) -> date | None:
@@ -22,55 +30,56 @@ def window_start_from_param(param: str, today: date) -> date | None:
     return today - timedelta(days=30)
 
 
-def timeseries_cost_per_liter(entries: Iterable[FillUp]) -> list[tuple[date, Decimal]]:
-    """Return a chronological series of per-fill cost per liter values."""
+def timeseries_cost_per_liter(
+    entries: FillSeries | vectorized.ArraySeries | Iterable[FillUp | FillRow],
+) -> list[tuple[date, Decimal | float]]:
+    """Return a chronological series of per-fill cost per liter values.
+
+    The NumPy backend returns the prices as floats.
+    """
+
+    if isinstance(entries, vectorized.ArraySeries):
+        return vectorized.timeseries_cost_per_liter(entries)
 
-    series: list[tuple[date, Decimal]] = []
-    for entry in sorted(entries, key=lambda item: (item.date, item.id)):
-        liters = entry.liters
+    series = FillSeries.coerce(entries)
+    result: list[tuple[date, Decimal]] = []
+    for index in series.chronological:
+        liters = series.liters[index]
         if liters is None or liters <= 0:
             continue
-        price = entry.total_amount / liters
-        series.append((entry.date, price))
-    return series
+        result.append((series.dates[index], series.amounts[index] / liters))
+    return result
 
 
-def timeseries_consumption(entries: Iterable[FillUp]) -> list[tuple[date, float | None]]:
+def timeseries_consumption(
+    entries: FillSeries | vectorized.ArraySeries | Iterable[FillUp | FillRow],
+) -> list[tuple[date, float | None]]:
     """Return a chronological series of per-fill consumption values in L/100km."""
 
-    entries_list = list(entries)
-    if not entries_list:
-        return []
-
-    consumption_by_id: dict[int, float | None] = {}
-    previous_by_vehicle: dict[int, FillUp] = {}
+    if isinstance(entries, vectorized.ArraySeries):
+        return vectorized.timeseries_consumption(entries)
 
-    for entry in sorted(entries_list, key=lambda item: (item.vehicle_id, item.date, item.id)):
-        previous = previous_by_vehicle.get(entry.vehicle_id)
-        value: float | None = None
-        if previous is not None:
-            distance = entry.odometer_km - previous.odometer_km
-            if distance > 0 and entry.liters > 0:
-                value = float((entry.liters * Decimal(100)) / Decimal(distance))
-        consumption_by_id[entry.id] = value
-        previous_by_vehicle[entry.vehicle_id] = entry
+    series = FillSeries.coerce(entries)
+    return [(series.dates[index], series.consumptions[index]) for index in series.chronological]
 
-    ordered = sorted(entries_list, key=lambda item: (item.date, item.id))
-    return [(entry.date, consumption_by_id.get(entry.id)) for entry in ordered]
 
-
-def brand_grade_summary(entries: Iterable[FillUp]) -> list[dict]:
+def brand_grade_summary(
+    entries: FillSeries | vectorized.ArraySeries | Iterable[FillUp | FillRow],
+) -> list[dict]:
     """Compute average cost per liter and consumption grouped by brand/grade."""
 
-    entries_list = list(entries)
-    if not entries_list:
+    if isinstance(entries, vectorized.ArraySeries):
+        return vectorized.brand_grade_summary(entries)
+
+    series = FillSeries.coerce(entries)
+    if not series:
         return []
 
     group_totals: dict[tuple[str, str], dict] = {}
-    previous_by_vehicle: dict[int, FillUp] = {}
-
-    for entry in sorted(entries_list, key=lambda item: (item.vehicle_id, item.date, item.id)):
-        key = (entry.fuel_brand or "", entry.fuel_grade or "")
+    for brand, grade, liters, amount, consumption in zip(
+        series.brands, series.grades, series.liters, series.amounts, series.consumptions
+    ):
+        key = (brand or "", grade or "")
         data = group_totals.setdefault(
             key,
             {
@@ -83,20 +92,12 @@ def brand_grade_summary(entries: Iterable[FillUp]) -> list[dict]:
             },
         )
 
-        liters = entry.liters
         if liters is not None and liters > 0:
-            data["total_amount"] += entry.total_amount
+            data["total_amount"] += amount
             data["total_liters"] += liters
-
-        previous = previous_by_vehicle.get(entry.vehicle_id)
-        if previous is not None:
-            distance = entry.odometer_km - previous.odometer_km
-            if distance > 0 and liters is not None and liters > 0:
-                consumption = float((liters * Decimal(100)) / Decimal(distance))
-                data["consumptions"].append(consumption)
-
+        if consumption is not None:
+            data["consumptions"].append(consumption)
         data["count"] += 1
-        previous_by_vehicle[entry.vehicle_id] = entry
 
     results: list[dict] = []
     for data in group_totals.values():
@@ -122,6 +123,119 @@ def brand_grade_summary(entries: Iterable[FillUp]) -> list[dict]:
     return results
 
 
+_BRAND_GRADE_SQL = """
+SELECT
+    brand,
+    grade,
+    COUNT(*),
+    SUM(total_amount) FILTER (WHERE liters > 0),
+    SUM(liters) FILTER (WHERE liters > 0),
+    AVG(liters * 100 / (odometer_km - previous_odometer_km))
+        FILTER (WHERE odometer_km > previous_odometer_km AND liters > 0)
+FROM ({fills}) AS fills
+GROUP BY brand, grade
+ORDER BY MIN(position)
+"""
+
+
+def brand_grade_summary_sql(queryset: QuerySet) -> list[dict]:
+    """Compute :func:`brand_grade_summary` in PostgreSQL with a single query.
+
+    ``LAG`` over each vehicle in a subquery of ``queryset`` supplies the
+    previous odometer reading, so consumption is measured within the selected
+    fills just like the reference; the outer query groups by brand and grade
+    and returns one row per group. Groups come back in first-seen order so
+    the final case-insensitive sort breaks ties the same way.
+    """
+
+    vehicle_order = [F("date").asc(), F("id").asc()]
+    fills = (
+        queryset.order_by()
+        .annotate(
+            brand=Coalesce("fuel_brand", Value("")),
+            grade=Coalesce("fuel_grade", Value("")),
+            previous_odometer_km=Window(
+                Lag("odometer_km"), partition_by=[F("vehicle_id")], order_by=vehicle_order
+            ),
+            position=Window(
+                RowNumber(), order_by=[F("vehicle_id").asc(), *vehicle_order]
+            ),
+        )
+        .values(
+            "brand",
+            "grade",
+            "odometer_km",
+            "liters",
+            "total_amount",
+            "previous_odometer_km",
+            "position",
+        )
+    )
+    try:
+        sql, params = fills.query.sql_with_params()
+    except EmptyResultSet:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(_BRAND_GRADE_SQL.format(fills=sql), params)
+        rows = cursor.fetchall()
+
+    results = [
+        {
+            "brand": brand,
+            "grade": grade,
+            "avg_cost_per_liter": total_amount / total_liters if total_liters else None,
+            "avg_consumption_l_per_100km": (
+                float(avg_consumption) if avg_consumption is not None else None
+            ),
+            "count": count,
+        }
+        for brand, grade, count, total_amount, total_liters, avg_consumption in rows
+    ]
+    results.sort(key=lambda item: (item["brand"].lower(), item["grade"].lower()))
+    return results
+
+
+def downsample_lttb(points: list[tuple[float, float]], threshold: int) -> list[int]:
+    """Return the indices of at most ``threshold`` points kept by Largest-Triangle-Three-Buckets.
+
+    ``points`` must be ordered by x. The first and last points are always kept;
+    every bucket in between contributes the point forming the largest
+    triangle with the previously kept point and the next bucket's average.
+    """
+
+    count = len(points)
+    if threshold >= count or threshold < 3:
+        return list(range(count))
+
+    kept = [0]
+    bucket_size = (count - 2) / (threshold - 2)
+    previous = 0
+    for bucket in range(threshold - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+        next_start = end
+        next_end = min(int((bucket + 2) * bucket_size) + 1, count)
+        next_points = points[next_start:next_end] or [points[-1]]
+        average_x = sum(x for x, _ in next_points) / len(next_points)
+        average_y = sum(y for _, y in next_points) / len(next_points)
+
+        anchor_x, anchor_y = points[previous]
+        best_index = start
+        best_area = -1.0
+        for index in range(start, end):
+            x, y = points[index]
+            area = abs(
+                (anchor_x - average_x) * (y - anchor_y) - (anchor_x - x) * (average_y - anchor_y)
+            )
+            if area > best_area:
+                best_area = area
+                best_index = index
+        kept.append(best_index)
+        previous = best_index
+    kept.append(count - 1)
+    return kept
+
+
 def to_svg_path(points: list[tuple[float, float]]) -> str:
     """Convert a list of 2D points into an SVG path string."""
 
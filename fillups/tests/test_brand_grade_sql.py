@@ -0,0 +1,87 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from fillups.models import FillUp
+from fillups.stats import brand_grade_summary, brand_grade_summary_sql
+from vehicles.models import Vehicle
+
+
+class BrandGradeSummarySqlTests(TestCase):
+    """``brand_grade_summary_sql`` must group exactly like the Python reference."""
+
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            email="brand-sql@example.com", password="password123"
+        )
+        other = get_user_model().objects.create_user(
+            email="brand-sql-other@example.com", password="password123"
+        )
+        self.today = date.today()
+        for owner, name, odometer in (
+            (self.user, "Car", 10000),
+            (self.user, "Van", 52000),
+            (other, "Other", 3000),
+        ):
+            vehicle = Vehicle.objects.create(user=owner, name=name)
+            for step in range(10):
+                odometer += 180 + 37 * (step % 5)
+                FillUp.objects.create(
+                    vehicle=vehicle,
+                    date=self.today - timedelta(days=200 - step * 19 - len(name)),
+                    odometer_km=odometer,
+                    station_name="Main Street",
+                    fuel_brand=["Shell", "shell", "", "BP", "Aral"][step % 5],
+                    fuel_grade=["95", "Diesel", ""][step % 3],
+                    liters=Decimal(f"{28 + step % 5}.{(step * 29) % 100:02d}"),
+                    total_amount=Decimal(f"{52 + step * 4}.{(step * 47) % 100:02d}"),
+                )
+        self.queryset = FillUp.objects.filter(user=self.user)
+
+    def _assert_equivalent(self, queryset) -> None:
+        expected = brand_grade_summary(list(queryset))
+        summary = brand_grade_summary_sql(queryset)
+
+        def exact_columns(rows: list[dict]) -> list[tuple]:
+            return [
+                (row["brand"], row["grade"], row["count"], row["avg_cost_per_liter"])
+                for row in rows
+            ]
+
+        self.assertEqual(exact_columns(summary), exact_columns(expected))
+        for row, expected_row in zip(summary, expected):
+            if expected_row["avg_consumption_l_per_100km"] is None:
+                self.assertIsNone(row["avg_consumption_l_per_100km"])
+            else:
+                self.assertAlmostEqual(
+                    row["avg_consumption_l_per_100km"],
+                    expected_row["avg_consumption_l_per_100km"],
+                    places=9,
+                )
+
+    def test_matches_reference_for_user_vehicle_and_window(self) -> None:
+        window_start = self.today - timedelta(days=90)
+        querysets = {
+            "user": self.queryset,
+            "vehicle": self.queryset.filter(vehicle__name="Van"),
+            "window": self.queryset.filter(date__gte=window_start),
+            "empty": self.queryset.none(),
+        }
+        for label, queryset in querysets.items():
+            with self.subTest(queryset=label):
+                self._assert_equivalent(queryset)
+
+    def test_non_increasing_readings_and_single_query(self) -> None:
+        # Readings are validated on save; force a regression to cover the > 0 guard.
+        fill = self.queryset.order_by("date", "id")[4]
+        FillUp.objects.filter(pk=fill.pk).update(odometer_km=1)
+
+        with CaptureQueriesContext(connection) as queries:
+            brand_grade_summary_sql(self.queryset)
+
+        self.assertEqual(len(queries), 1)
+        self._assert_equivalent(self.queryset)
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import io
+import os
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.urls import reverse
+
+from core.versions import data_version
+from fillups import counters, cumulative, derived, rollups, vocabulary
+from fillups.counters import fillup_count
+from fillups.derived import DERIVED_FIELDS
+from fillups.cumulative import CUMULATIVE_FIELDS
+from fillups.importer import import_fillups
+from fillups.models import FillUp, FillUpDailyRollup, FillUpVocabulary
+from profiles.models import Profile
+from vehicles.models import Vehicle
+
+HEADER = "vehicle,date,odometer,station,fuel_brand,fuel_grade,volume,total_amount,notes\n"
+
+
+class BulkImportTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            email="import@example.com", password="password123"
+        )
+        self.car = Vehicle.objects.create(user=self.user, name="Car")
+        self.van = Vehicle.objects.create(user=self.user, name="Van")
+        self.start = date.today() - timedelta(days=100)
+        for step, odometer in enumerate([1000, 1500, 2600]):
+            FillUp.objects.create(
+                vehicle=self.car,
+                date=self.start + timedelta(days=step * 20),
+                odometer_km=odometer,
+                station_name="Main Street",
+                fuel_brand="Shell",
+                liters=Decimal("30.00"),
+                total_amount=Decimal("50.00"),
+            )
+
+    def day(self, offset: int) -> str:
+        return (self.start + timedelta(days=offset)).isoformat()
+
+    def run_import(self, text: str):
+        return import_fillups(self.user, io.StringIO(text))
+
+    def maintained_state(self) -> tuple:
+        fills = list(
+            FillUp.objects.filter(user=self.user)
+            .order_by("id")
+            .values_list("id", *DERIVED_FIELDS, *CUMULATIVE_FIELDS)
+        )
+        rollup_rows = list(
+            FillUpDailyRollup.objects.filter(user=self.user)
+            .order_by("vehicle_id", "day")
+            .values_list("vehicle_id", "day", "fill_count", "total_spend", "distance_km")
+        )
+        vocabulary_rows = sorted(
+            FillUpVocabulary.objects.filter(user=self.user).values_list(
+                "kind", "value", "usage_count"
+            )
+        )
+        return fills, rollup_rows, vocabulary_rows, fillup_count(self.user)
+
+    def test_import_matches_full_rebuild(self) -> None:
+        version = data_version(self.user)
+        text = HEADER + "".join(
+            [
+                # Between the first two stored fills, then appended after them.
+                f"Car,{self.day(10)},1200,North Road,BP,95,25.50,40.00,\n",
+                f"Car,{self.day(50)},3000,Main Street,Shell,,31.00,52.10,\"Trip, long\"\n",
+                f"Van,{self.day(5)},500,  North   Road ,,Diesel,60.00,99.99,\n",
+                f"Van,{self.day(5)},800,North Road,,Diesel,20.00,30.00,\n",
+            ]
+        )
+
+        result = self.run_import(text)
+
+        self.assertTrue(result.ok, result.errors)
+        self.assertEqual(result.created, 4)
+        self.assertGreater(data_version(self.user), version)
+        successor = FillUp.objects.get(vehicle=self.car, odometer_km=1500)
+        self.assertEqual(successor.distance_since_last_km, 300)
+        imported = FillUp.objects.get(vehicle=self.van, odometer_km=500)
+        self.assertEqual(imported.station_name, "North Road")
+        self.assertEqual(imported.user_id, self.user.id)
+
+        state = self.maintained_state()
+        derived.rebuild_for_user(self.user.id)
+        cumulative.rebuild_for_user(self.user.id)
+        rollups.rebuild_for_user(self.user.id)
+        vocabulary.rebuild_for_user(self.user.id)
+        counters.rebuild_for_user(self.user.id)
+        self.assertEqual(state, self.maintained_state())
+        self.assertEqual(state[3], 7)
+
+    def test_imperial_profile_units_are_converted(self) -> None:
+        Profile.objects.update_or_create(
+            user=self.user,
+            defaults={
+                "distance_unit": Profile.UNIT_MILES,
+                "volume_unit": Profile.UNIT_GALLONS,
+            },
+        )
+
+        result = self.run_import(HEADER + f"Van,{self.day(1)},1000,Depot,,,10,40.00,\n")
+
+        self.assertTrue(result.ok, result.errors)
+        fill = FillUp.objects.get(vehicle=self.van)
+        self.assertEqual(fill.odometer_km, 1609)
+        self.assertEqual(fill.liters, Decimal("37.85"))
+
+    def test_export_columns_are_read_as_metric(self) -> None:
+        Profile.objects.update_or_create(
+            user=self.user, defaults={"distance_unit": Profile.UNIT_MILES}
+        )
+        text = (
+            "vehicle_id,date,odometer_km,station,liters,total_currency_amount\n"
+            f"{self.van.id},{self.day(1)},1000,Depot,10.00,20.00\n"
+        )
+
+        self.assertTrue(self.run_import(text).ok)
+        self.assertEqual(FillUp.objects.get(vehicle=self.van).odometer_km, 1000)
+
+    def test_odometer_order_errors_reject_the_whole_file(self) -> None:
+        text = HEADER + "".join(
+            [
+                f"Car,{self.day(10)},1600,Main Street,,,20.00,30.00,\n",
+                f"Van,{self.day(1)},900,Main Street,,,20.00,30.00,\n",
+                f"Van,{self.day(2)},900,Main Street,,,20.00,30.00,\n",
+            ]
+        )
+
+        result = self.run_import(text)
+
+        self.assertFalse(result.ok)
+        self.assertEqual(
+            result.errors,
+            [
+                "Line 2: Odometer reading must be less than the next fill-up.",
+                "Line 4: Odometer reading must be greater than the previous fill-up.",
+            ],
+        )
+        self.assertEqual(FillUp.objects.filter(user=self.user).count(), 3)
+
+    def test_row_errors(self) -> None:
+        future = (date.today() + timedelta(days=1)).isoformat()
+        text = HEADER + "".join(
+            [
+                f"Boat,{self.day(1)},100,Dock,,,10.00,20.00,\n",
+                f"Van,{future},100,Dock,,,10.00,20.00,\n",
+                f"Van,{self.day(1)},100,Dock,,,10.001,20.00,\n",
+                f"Van,{self.day(1)},100,,,,10.00,20.00,\n",
+                f"Van,{self.day(1)},abc,Dock,,,10.00,20.00,\n",
+                f"Van,{self.day(1)},100,Dock,,,10.00,0,\n",
+                f"Van,{self.day(1)},0,Dock,,,10.00,20.00,\n",
+                f"Van,{self.day(1)},3000000000,Dock,,,10.00,20.00,\n",
+            ]
+        )
+
+        result = self.run_import(text)
+
+        self.assertEqual(
+            result.errors,
+            [
+                "Line 2: Unknown vehicle.",
+                "Line 3: Date cannot be in the future.",
+                "Line 4: Fuel volume must have at most 2 decimal places.",
+                "Line 5: station_name is required.",
+                "Line 6: Numbers must be plain decimals.",
+                "Line 7: Total amount must be greater than 0.",
+                "Line 8: Odometer reading must be greater than 0.",
+                "Line 9: Odometer reading is too large.",
+            ],
+        )
+        self.assertEqual(self.run_import("vehicle,date\n").errors[0][:16], "Missing columns:")
+
+    def test_upload_view(self) -> None:
+        self.client.force_login(self.user)
+        url = reverse("fillup-import")
+        upload = SimpleUploadedFile(
+            "fills.csv", (HEADER + f"Van,{self.day(1)},100,Dock,,,10.00,20.00,\n").encode()
+        )
+
+        response = self.client.post(url, {"file": upload})
+
+        self.assertRedirects(response, reverse("history-list"), fetch_redirect_response=False)
+        self.assertEqual(FillUp.objects.filter(vehicle=self.van).count(), 1)
+
+        upload = SimpleUploadedFile(
+            "fills.csv", (HEADER + f"Van,{self.day(1)},50,Dock,,,10.00,20.00,\n").encode()
+        )
+        response = self.client.post(url, {"file": upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Odometer reading must be greater than the previous fill-up.")
+
+    def test_management_command(self) -> None:
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as handle:
+            handle.write(HEADER + f"Van,{self.day(1)},100,Dock,,,10.00,20.00,\n")
+        self.addCleanup(os.unlink, handle.name)
+        stdout = io.StringIO()
+
+        call_command("import_fillups", handle.name, email=self.user.email, stdout=stdout)
+
+        self.assertIn("Imported 1 fill-ups", stdout.getvalue())
+        with self.assertRaises(CommandError):
+            call_command(
+                "import_fillups", handle.name, email=self.user.email, stderr=io.StringIO()
+            )
@@ -0,0 +1,74 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from fillups.models import FillUp
+from fillups.stats import downsample_lttb
+from vehicles.models import Vehicle
+
+
+class DownsampleLttbTests(SimpleTestCase):
+    def test_short_series_are_kept_whole(self) -> None:
+        points = [(float(x), float(x % 3)) for x in range(5)]
+
+        self.assertEqual(downsample_lttb(points, 5), [0, 1, 2, 3, 4])
+        self.assertEqual(downsample_lttb(points, 2), [0, 1, 2, 3, 4])
+
+    def test_keeps_ends_and_spikes_within_budget(self) -> None:
+        points = [(float(x), 0.0) for x in range(1000)]
+        points[437] = (437.0, 50.0)
+
+        kept = downsample_lttb(points, 20)
+
+        self.assertEqual(len(kept), 20)
+        self.assertEqual((kept[0], kept[-1]), (0, 999))
+        self.assertIn(437, kept)
+        self.assertEqual(kept, sorted(kept))
+
+
+class StatisticsChartBudgetTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            email="charts@example.com", password="password123"
+        )
+        self.client.force_login(self.user)
+        vehicle = Vehicle.objects.create(user=self.user, name="Chart Car")
+        start = date.today() - timedelta(days=200)
+        self.prices = []
+        odometer = 1000
+        for step in range(60):
+            odometer += 300 + (step * 7) % 90
+            liters = Decimal("40.00")
+            total = Decimal(f"{60 + (step * 37) % 23}.{(step * 11) % 100:02d}")
+            self.prices.append(total / liters)
+            FillUp.objects.create(
+                vehicle=vehicle,
+                date=start + timedelta(days=step * 3),
+                odometer_km=odometer,
+                station_name="Main Street",
+                liters=liters,
+                total_amount=total,
+            )
+
+    @override_settings(FILLUP_CHART_MAX_POINTS=12)
+    def test_chart_paths_respect_budget_and_exact_labels(self) -> None:
+        response = self.client.get(reverse("statistics"), {"window": "all"})
+
+        chart = response.context["chart_cost"]
+        self.assertLessEqual(len(chart["points"]), 14)
+        self.assertEqual(chart["path"].count(" L "), len(chart["points"]) - 1)
+        self.assertEqual(chart["y_min"], f"{min(self.prices):.2f}")
+        self.assertEqual(chart["y_max"], f"{max(self.prices):.2f}")
+        ys = [y for _, y in chart["points"]]
+        self.assertEqual((min(ys), max(ys)), (0.0, float(chart["height"])))
+
+        consumption = response.context["chart_consumption"]
+        self.assertLessEqual(len(consumption["points"]), 14)
+
+    def test_small_series_are_not_downsampled(self) -> None:
+        response = self.client.get(reverse("statistics"), {"window": "all"})
+
+        self.assertEqual(len(response.context["chart_cost"]["points"]), 60)
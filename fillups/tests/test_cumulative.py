@@ -0,0 +1,153 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from fillups.cumulative import CUMULATIVE_FIELDS, range_metrics
+from fillups.metrics import aggregate_metrics
+from fillups.models import FillUp
+from vehicles.models import Vehicle
+
+
+class CumulativeTotalsTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            email="cumulative@example.com", password="password123"
+        )
+        self.today = date.today()
+        self.car = Vehicle.objects.create(user=self.user, name="Car")
+        self.van = Vehicle.objects.create(user=self.user, name="Van")
+        self.empty = Vehicle.objects.create(user=self.user, name="Unused")
+        self._history(self.car, odometer=5000, days_back=300, fills=10, step_days=23)
+        self._history(self.van, odometer=70000, days_back=120, fills=8, step_days=13)
+
+    def _history(self, vehicle, *, odometer: int, days_back: int, fills: int, step_days: int):
+        for step in range(fills):
+            odometer += 210 + 33 * (step % 4)
+            FillUp.objects.create(
+                vehicle=vehicle,
+                date=self.today - timedelta(days=days_back - step * step_days),
+                odometer_km=odometer,
+                station_name="Main Street",
+                liters=Decimal(f"{30 + step % 5}.{(step * 41) % 100:02d}"),
+                total_amount=Decimal(f"{52 + step * 4}.{(step * 17) % 100:02d}"),
+            )
+
+    def _stored(self) -> dict[int, tuple]:
+        return dict(
+            (fill[0], fill[1:])
+            for fill in FillUp.objects.values_list("id", *CUMULATIVE_FIELDS)
+        )
+
+    def _expected(self) -> dict[int, tuple]:
+        expected: dict[int, tuple] = {}
+        for vehicle in Vehicle.objects.all():
+            running = [0, Decimal("0"), Decimal("0"), 0, Decimal("0"), Decimal("0")]
+            for fill in FillUp.objects.filter(vehicle=vehicle).order_by("date", "id"):
+                distance = fill.distance_since_last_km
+                running[0] += 1
+                running[1] += fill.total_amount
+                running[2] += fill.liters
+                if distance is not None:
+                    running[3] += distance
+                    running[4] += fill.liters
+                    running[5] += fill.total_amount
+                expected[fill.id] = tuple(running)
+        return expected
+
+    def _assert_totals_consistent(self) -> None:
+        self.assertEqual(self._stored(), self._expected())
+
+    def test_running_totals_follow_backdated_inserts_edits_and_deletes(self) -> None:
+        self._assert_totals_consistent()
+
+        fills = list(FillUp.objects.filter(vehicle=self.car).order_by("date", "id"))
+        backdated = FillUp.objects.create(
+            vehicle=self.car,
+            date=fills[2].date + timedelta(days=1),
+            odometer_km=fills[2].odometer_km + 100,
+            station_name="Backdated",
+            liters=Decimal("12.50"),
+            total_amount=Decimal("25.00"),
+        )
+        self._assert_totals_consistent()
+
+        backdated.liters = Decimal("14.00")
+        backdated.save()
+        self._assert_totals_consistent()
+
+        van_last = FillUp.objects.filter(vehicle=self.van).order_by("-date", "-id").first()
+        backdated.vehicle = self.van
+        backdated.date = self.today
+        backdated.odometer_km = van_last.odometer_km + 300
+        backdated.save()
+        self._assert_totals_consistent()
+
+        fills[4].delete()
+        self._assert_totals_consistent()
+        fills[0].delete()
+        self._assert_totals_consistent()
+
+    def test_saving_stale_instance_keeps_running_totals(self) -> None:
+        last = FillUp.objects.filter(vehicle=self.car).order_by("-date", "-id").first()
+        first = FillUp.objects.filter(vehicle=self.car).order_by("date", "id").first()
+        FillUp.objects.create(
+            vehicle=self.car,
+            date=first.date - timedelta(days=1),
+            odometer_km=first.odometer_km - 50,
+            station_name="Earlier",
+            liters=Decimal("10.00"),
+            total_amount=Decimal("20.00"),
+        )
+
+        last.notes = "stale copy"
+        last.save()
+
+        self._assert_totals_consistent()
+
+    def test_range_metrics_match_reference(self) -> None:
+        entries = list(FillUp.objects.filter(user=self.user))
+        dates = sorted({entry.date for entry in entries})
+        bounds = [None, dates[0], dates[3], dates[3] + timedelta(days=1), dates[-2], self.today]
+        for start in bounds:
+            for end in bounds:
+                for vehicle_id in (None, self.car.id, self.empty.id):
+                    with self.subTest(start=start, end=end, vehicle=vehicle_id):
+                        subset = [
+                            entry
+                            for entry in entries
+                            if vehicle_id is None or entry.vehicle_id == vehicle_id
+                        ]
+                        self.assertEqual(
+                            range_metrics(self.user, start, end, vehicle_id=vehicle_id),
+                            aggregate_metrics(subset, window_start=start, window_end=end),
+                        )
+
+    def test_range_metrics_runs_two_queries(self) -> None:
+        with CaptureQueriesContext(connection) as queries:
+            range_metrics(self.user, self.today - timedelta(days=200), self.today - timedelta(days=20))
+
+        self.assertEqual(len(queries), 2)
+
+    def test_views_accept_date_range(self) -> None:
+        self.client.force_login(self.user)
+        start = self.today - timedelta(days=100)
+        params = {"start": start.isoformat(), "end": "bogus"}
+
+        response = self.client.get(reverse("metrics"), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["window_label"], f"Since {start:%b %d, %Y}")
+        self.assertEqual(response.context["range_end"], "")
+
+        response = self.client.get(reverse("statistics"), {"start": start.isoformat()})
+        self.assertEqual(response.status_code, 200)
+        expected = aggregate_metrics(
+            list(FillUp.objects.filter(user=self.user)), window_start=start
+        )
+        self.assertEqual(
+            response.context["summary"]["total_spend"], f"USD {expected['total_spend']:.2f}"
+        )
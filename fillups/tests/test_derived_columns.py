@@ -0,0 +1,104 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from fillups.derived import DERIVED_FIELDS, derived_values, rebuild_for_user
+from fillups.metrics import per_fill_from_stored, per_fill_metrics
+from fillups.models import FillUp
+from vehicles.models import Vehicle
+
+
+class DerivedColumnTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            email="derived@example.com", password="password123"
+        )
+        self.car = Vehicle.objects.create(user=self.user, name="Car")
+        self.van = Vehicle.objects.create(user=self.user, name="Van")
+        self.start = date.today() - timedelta(days=90)
+
+    def _create(self, vehicle, day: int, odometer: int, liters: str = "40.00") -> FillUp:
+        return FillUp.objects.create(
+            vehicle=vehicle,
+            date=self.start + timedelta(days=day),
+            odometer_km=odometer,
+            station_name="Main Street",
+            liters=Decimal(liters),
+            total_amount=Decimal("70.00"),
+        )
+
+    def _stored(self) -> dict[int, tuple]:
+        return {
+            row[0]: row[1:]
+            for row in FillUp.objects.filter(user=self.user).values_list("id", *DERIVED_FIELDS)
+        }
+
+    def _expected(self) -> dict[int, tuple]:
+        expected: dict[int, tuple] = {}
+        for vehicle in (self.car, self.van):
+            previous_odometer_km = None
+            for fillup in FillUp.objects.filter(vehicle=vehicle).order_by("date", "id"):
+                values = derived_values(
+                    fillup.odometer_km, fillup.liters, fillup.total_amount, previous_odometer_km
+                )
+                expected[fillup.id] = tuple(values[name] for name in DERIVED_FIELDS)
+                previous_odometer_km = fillup.odometer_km
+        return expected
+
+    def test_insert_sets_row_and_backdated_insert_updates_successor(self) -> None:
+        first = self._create(self.car, 0, 1000)
+        later = self._create(self.car, 20, 1600)
+        self.assertIsNone(first.distance_since_last_km)
+        self.assertEqual(later.distance_since_last_km, 600)
+        self.assertEqual(later.consumption_l_per_100km, Decimal("6.666667"))
+
+        middle = self._create(self.car, 10, 1250, liters="20.00")
+
+        later.refresh_from_db()
+        self.assertEqual(middle.distance_since_last_km, 250)
+        self.assertEqual(later.distance_since_last_km, 350)
+        self.assertEqual(self._stored(), self._expected())
+
+    def test_edit_move_and_delete_keep_neighbours_consistent(self) -> None:
+        self._create(self.car, 0, 1000)
+        moving = self._create(self.car, 5, 1300)
+        self._create(self.car, 10, 1700)
+        self._create(self.van, 0, 5000)
+        self._create(self.van, 10, 5800)
+
+        moving.odometer_km = 1400
+        moving.save()
+        self.assertEqual(self._stored(), self._expected())
+
+        moving.vehicle = self.van
+        moving.odometer_km = 5400
+        moving.save()
+        self.assertEqual(self._stored(), self._expected())
+
+        moving.delete()
+        self.assertEqual(self._stored(), self._expected())
+
+    def test_stored_values_match_recomputed_metrics(self) -> None:
+        for day, odometer in enumerate([1000, 1320, 1321, 1700, 2150]):
+            self._create(self.car, day * 7, odometer, liters=f"{30 + day}.37")
+
+        entries = list(FillUp.objects.filter(vehicle=self.car).order_by("date", "id"))
+        for recomputed, entry in zip(per_fill_metrics(entries), entries):
+            stored = per_fill_from_stored(entry)
+            self.assertEqual(stored.distance_since_last_km, recomputed.distance_since_last_km)
+            self.assertEqual(stored.unit_price_per_liter, recomputed.unit_price_per_liter)
+            self.assertEqual(stored.efficiency_l_per_100km, recomputed.efficiency_l_per_100km)
+            self.assertEqual(stored.cost_per_mile, recomputed.cost_per_mile)
+
+    def test_rebuild_matches_incremental_state(self) -> None:
+        self._create(self.car, 10, 1500)
+        self._create(self.car, 0, 1000)
+        self._create(self.van, 3, 4000)
+        incremental = self._stored()
+
+        FillUp.objects.filter(user=self.user).update(distance_since_last_km=None, cost_per_km=None)
+        rebuild_for_user(self.user.id)
+
+        self.assertEqual(self._stored(), incremental)
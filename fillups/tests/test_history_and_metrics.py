@@ -127,3 +127,41 @@ class BaselineFillUpDisplayTests(TestCase):
         chart_cost = response.context["chart_cost"]
         self.assertTrue(chart_cost["has_data"])
         self.assertGreaterEqual(len(chart_cost["points"]), 1)
+
+
+class StatisticsMpgViewTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            email="mpg@example.com", password="password123"
+        )
+        self.client.force_login(self.user)
+        Profile.objects.update_or_create(
+            user=self.user,
+            defaults={
+                "distance_unit": Profile.UNIT_MILES,
+                "volume_unit": Profile.UNIT_GALLONS,
+                "efficiency_unit": Profile.EfficiencyUnit.MPG,
+            },
+        )
+        vehicle = Vehicle.objects.create(user=self.user, name="MPG Car")
+        base_date = date.today() - timedelta(days=10)
+        for step, odometer in enumerate([1000, 1400, 1800]):
+            FillUp.objects.create(
+                vehicle=vehicle,
+                date=base_date + timedelta(days=step),
+                odometer_km=odometer,
+                station_name="Station A",
+                fuel_brand="BrandA",
+                fuel_grade="Regular",
+                liters=Decimal("40.00"),
+                total_amount=Decimal("80.00"),
+            )
+
+    def test_statistics_renders_brand_consumption_in_mpg(self) -> None:
+        response = self.client.get(reverse("statistics"), {"window": "all"})
+
+        self.assertEqual(response.status_code, 200)
+        (row,) = response.context["brand_rows"]
+        # 400 km on 40 L is 10 L/100km, about 23.5 MPG.
+        self.assertEqual(row["avg_consumption"], "23.5 MPG")
+        self.assertTrue(response.context["chart_consumption"]["has_data"])
@@ -0,0 +1,103 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from fillups.counters import fillup_count, rebuild_for_user
+from fillups.models import FillUp, FillUpCounter
+from fillups.pagination import CountedPaginator, LookaheadPaginator
+from vehicles.models import Vehicle
+
+
+class FillUpCounterTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            email="counts@example.com", password="password123"
+        )
+        self.car = Vehicle.objects.create(user=self.user, name="Car")
+        self.van = Vehicle.objects.create(user=self.user, name="Van")
+        self.start = date.today() - timedelta(days=60)
+
+    def _create(self, vehicle, day: int, **fields) -> FillUp:
+        values = {
+            "station_name": "Main Street",
+            "fuel_brand": "Shell",
+            "liters": Decimal("40.00"),
+            "total_amount": Decimal("80.00"),
+        }
+        values.update(fields)
+        return FillUp.objects.create(
+            vehicle=vehicle,
+            date=self.start + timedelta(days=day),
+            odometer_km=1000 + day * 100,
+            **values,
+        )
+
+    def _counts(self) -> dict:
+        return dict(
+            FillUpCounter.objects.filter(user=self.user).values_list(
+                "vehicle_id", "fillup_count"
+            )
+        )
+
+    def test_counters_follow_create_move_and_delete(self) -> None:
+        first = self._create(self.car, 0)
+        self._create(self.car, 1)
+        self._create(self.van, 2)
+        self.assertEqual(self._counts(), {None: 3, self.car.id: 2, self.van.id: 1})
+
+        first.vehicle = self.van
+        first.save()
+        self.assertEqual(self._counts(), {None: 3, self.car.id: 1, self.van.id: 2})
+
+        first.delete()
+        self.assertEqual(fillup_count(self.user), 2)
+        self.assertEqual(fillup_count(self.user, vehicle_id=self.van.id), 1)
+
+        self.van.delete()
+        self.assertEqual(self._counts(), {None: 1, self.car.id: 1})
+
+    def test_rebuild_matches_incremental_state(self) -> None:
+        self._create(self.car, 0)
+        self._create(self.van, 1)
+        incremental = self._counts()
+
+        rebuild_for_user(self.user.id)
+
+        self.assertEqual(self._counts(), incremental)
+
+    def test_unfiltered_history_skips_count_query(self) -> None:
+        for day in range(30):
+            self._create(self.car if day % 2 else self.van, day)
+        self.client.force_login(self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("history-list"), {"vehicle": self.car.id})
+
+        self.assertIsInstance(response.context["paginator"], CountedPaginator)
+        self.assertEqual(response.context["paginator"].count, 15)
+        self.assertFalse(
+            any("COUNT(" in query["sql"] and '"fillups_fillup"' in query["sql"] for query in queries)
+        )
+
+    def test_filtered_history_uses_lookahead_pages(self) -> None:
+        for day in range(30):
+            self._create(self.car, day)
+        self.client.force_login(self.user)
+        url = reverse("history-list")
+
+        first = self.client.get(url, {"brand": "shell"})
+        self.assertIsInstance(first.context["paginator"], LookaheadPaginator)
+        self.assertTrue(first.context["page_obj"].has_next())
+        self.assertContains(first, "Page 1</span>")
+
+        second = self.client.get(url, {"brand": "shell", "page": 2})
+        self.assertFalse(second.context["page_obj"].has_next())
+        self.assertEqual(len(second.context["fillups"]), 5)
+        self.assertEqual(second.context["page_obj"].end_index(), 30)
+
+        self.assertEqual(self.client.get(url, {"brand": "shell", "page": 3}).status_code, 404)
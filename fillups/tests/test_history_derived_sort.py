@@ -0,0 +1,90 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from fillups.models import FillUp
+from fillups.pagination import LookaheadPaginator
+from profiles.models import Profile
+from vehicles.models import Vehicle
+
+
+class HistoryDerivedSortTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            email="derived-sort@example.com", password="password123"
+        )
+        self.client.force_login(self.user)
+        vehicle = Vehicle.objects.create(user=self.user, name="Sort Car")
+        start = date.today() - timedelta(days=30)
+
+        # Consumption per fill after the first: 10.0, 5.0, 8.0 L/100km.
+        odometer = 1000
+        for index, (distance, liters) in enumerate([(0, "30"), (400, "40"), (600, "30"), (500, "40")]):
+            odometer += distance
+            FillUp.objects.create(
+                vehicle=vehicle,
+                date=start + timedelta(days=index),
+                odometer_km=odometer,
+                station_name="Main Street",
+                liters=Decimal(liters),
+                total_amount=Decimal("60.00"),
+            )
+
+    def _consumptions(self, params: dict) -> list[Decimal]:
+        response = self.client.get(reverse("history-list"), params)
+        self.assertEqual(response.status_code, 200)
+        return [fillup.consumption_l_per_100km for fillup in response.context["fillups"]]
+
+    def test_sort_by_consumption_skips_fills_without_value(self) -> None:
+        self.assertEqual(
+            self._consumptions({"sort": "efficiency", "dir": "desc"}),
+            [Decimal("10"), Decimal("8"), Decimal("5")],
+        )
+
+        response = self.client.get(reverse("history-list"), {"sort": "efficiency"})
+        self.assertIsInstance(response.context["paginator"], LookaheadPaginator)
+
+    def test_sort_by_consumption_in_cursor_mode(self) -> None:
+        self.assertEqual(
+            self._consumptions({"sort": "efficiency", "dir": "asc", "paging": "cursor"}),
+            [Decimal("5"), Decimal("8"), Decimal("10")],
+        )
+
+    def test_mpg_users_sort_and_filter_in_mpg(self) -> None:
+        Profile.objects.filter(user=self.user).update(
+            efficiency_unit=Profile.EfficiencyUnit.MPG
+        )
+
+        # Lowest MPG first is the highest L/100km first.
+        self.assertEqual(
+            self._consumptions({"sort": "efficiency", "dir": "asc"}),
+            [Decimal("10"), Decimal("8"), Decimal("5")],
+        )
+        # 10 / 8 / 5 L/100km are roughly 23.5 / 29.4 / 47.0 MPG.
+        self.assertEqual(
+            self._consumptions({"sort": "efficiency", "efficiency_min": "25", "efficiency_max": "40"}),
+            [Decimal("8")],
+        )
+
+    def test_range_filters_use_metric_columns(self) -> None:
+        self.assertEqual(
+            self._consumptions({"efficiency_min": "6", "efficiency_max": "9.5"}),
+            [Decimal("8")],
+        )
+        self.assertEqual(len(self._consumptions({"unit_price_max": "1.9"})), 2)
+        self.assertEqual(len(self._consumptions({"cost_per_distance_min": "bogus"})), 4)
+
+    def test_consumption_sort_can_use_index(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("SET LOCAL enable_sort = off")
+            plan = (
+                FillUp.objects.filter(user=self.user, consumption_l_per_100km__isnull=False)
+                .order_by("-consumption_l_per_100km", "-id")[:25]
+                .explain()
+            )
+        self.assertIn("ix_fill_user_consumption_id", plan)
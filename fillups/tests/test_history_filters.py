@@ -0,0 +1,109 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from fillups.models import FillUp, user_key
+from vehicles.models import Vehicle
+
+
+class HistoryTextFilterTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            email="filters@example.com", password="password123"
+        )
+        self.client.force_login(self.user)
+        vehicle = Vehicle.objects.create(user=self.user, name="Filter Car")
+
+        start = date.today() - timedelta(days=10)
+        for index, (brand, station) in enumerate(
+            [("Shell", "Main Street"), ("Seashell", "Harbor"), ("Chevron", "Shellby Road")]
+        ):
+            FillUp.objects.create(
+                vehicle=vehicle,
+                date=start + timedelta(days=index),
+                odometer_km=1000 + index * 300,
+                station_name=station,
+                fuel_brand=brand,
+                fuel_grade="Regular",
+                liters=Decimal("40.00"),
+                total_amount=Decimal("80.00"),
+            )
+
+    def _brands(self, params: dict) -> list[str]:
+        response = self.client.get(reverse("history-list"), params)
+        self.assertEqual(response.status_code, 200)
+        return sorted(fillup.fuel_brand for fillup in response.context["fillups"])
+
+    def test_contains_is_default_match(self) -> None:
+        self.assertEqual(self._brands({"brand": "shell"}), ["Seashell", "Shell"])
+
+    def test_prefix_match_mode(self) -> None:
+        self.assertEqual(self._brands({"brand": "shell", "match": "prefix"}), ["Shell"])
+        self.assertEqual(self._brands({"station": "shell", "match": "prefix"}), ["Chevron"])
+
+        response = self.client.get(
+            reverse("history-list"), {"brand": "sh", "match": "prefix"}
+        )
+        self.assertIn("match=prefix", response.context["base_querystring"])
+
+
+class HistoryTextFilterIndexTests(TestCase):
+    """EXPLAIN checks on enough rows per user for the planner to pick the filter indexes."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.users = []
+        start = date.today() - timedelta(days=900)
+        # One large account among smaller ones, like the tenants the indexes serve.
+        for user_index, fill_count in enumerate([4000, 300, 300, 300]):
+            user = get_user_model().objects.create_user(
+                email=f"plans{user_index}@example.com", password="password123"
+            )
+            vehicle = Vehicle.objects.create(user=user, name="Plan Car")
+            FillUp.objects.bulk_create(
+                FillUp(
+                    user=user,
+                    vehicle=vehicle,
+                    date=start + timedelta(days=step // 2),
+                    odometer_km=1000 + step * 300,
+                    station_name=f"Station {step % 97}",
+                    # A few matches among many distinct brands.
+                    fuel_brand="Shell" if step % 500 == 0 else f"Brand {step}",
+                    fuel_grade="Regular",
+                    liters=Decimal("40.00"),
+                    total_amount=Decimal("80.00"),
+                )
+                for step in range(fill_count)
+            )
+            cls.users.append(user)
+        with connection.cursor() as cursor:
+            # GIN cost estimates read entry counts written by an index build.
+            cursor.execute("REINDEX INDEX ix_fill_user_brand_trgm")
+            cursor.execute("ANALYZE fillups_fillup")
+
+    def test_substring_filter_can_use_user_trigram_index(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("SET LOCAL enable_indexscan = off")
+            plan = (
+                FillUp.objects.filter(user_id=user_key(self.users[0]), fuel_brand__icontains="hell")
+                .order_by()
+                .explain()
+            )
+        # The user is part of the index condition, not a recheck filter.
+        self.assertRegex(plan, r"ix_fill_user_brand_trgm.*\n\s+Index Cond: \(\(user_id = ")
+
+    def test_prefix_filter_can_use_pattern_ops_index(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("SET LOCAL enable_bitmapscan = off")
+            plan = (
+                FillUp.objects.filter(user_id=user_key(self.users[0]), fuel_brand__istartswith="sh")
+                .order_by()
+                .explain()
+            )
+        self.assertIn("ix_fill_user_brand_prefix", plan)
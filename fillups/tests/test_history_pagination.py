@@ -0,0 +1,100 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from fillups.models import FillUp
+from fillups.pagination import Cursor, decode_cursor
+from vehicles.models import Vehicle
+
+
+class HistoryCursorPaginationTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            email="cursor@example.com", password="password123"
+        )
+        self.client.force_login(self.user)
+        self.vehicle = Vehicle.objects.create(user=self.user, name="Cursor Car")
+
+        start = date.today() - timedelta(days=60)
+        for index in range(30):
+            FillUp.objects.create(
+                vehicle=self.vehicle,
+                # Two fill-ups per day so the id tie-breaker matters.
+                date=start + timedelta(days=index // 2),
+                odometer_km=1000 + index * 100,
+                station_name="Station",
+                fuel_brand="Brand",
+                fuel_grade="Regular",
+                # Repeating volumes exercise ties on the liters sort.
+                liters=Decimal("30.00") + Decimal(index % 3),
+                total_amount=Decimal("60.00") + Decimal(index),
+            )
+
+    def _walk(self, params: dict) -> list[int]:
+        ids: list[int] = []
+        response = self.client.get(reverse("history-list"), params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            page = response.context["page_obj"]
+            ids.extend(fillup.id for fillup in page.object_list)
+            if not page.has_next():
+                return ids
+            response = self.client.get(
+                reverse("history-list"), {**params, "cursor": page.next_cursor}
+            )
+
+    def test_cursor_pages_match_offset_ordering(self) -> None:
+        for sort in ("date", "odometer", "liters", "total"):
+            for direction in ("asc", "desc"):
+                field = {
+                    "date": "date",
+                    "odometer": "odometer_km",
+                    "liters": "liters",
+                    "total": "total_amount",
+                }[sort]
+                prefix = "-" if direction == "desc" else ""
+                expected = list(
+                    FillUp.objects.filter(user=self.user)
+                    .order_by(f"{prefix}{field}", f"{prefix}id")
+                    .values_list("id", flat=True)
+                )
+                walked = self._walk({"paging": "cursor", "sort": sort, "dir": direction})
+                self.assertEqual(walked, expected, msg=f"{sort} {direction}")
+
+    def test_previous_cursor_returns_prior_page(self) -> None:
+        params = {"paging": "cursor", "sort": "liters", "dir": "asc"}
+        first = self.client.get(reverse("history-list"), params).context["page_obj"]
+        second = self.client.get(
+            reverse("history-list"), {**params, "cursor": first.next_cursor}
+        ).context["page_obj"]
+        self.assertTrue(second.has_previous())
+
+        back = self.client.get(
+            reverse("history-list"), {**params, "cursor": second.previous_cursor}
+        ).context["page_obj"]
+        self.assertEqual(
+            [fillup.id for fillup in back.object_list],
+            [fillup.id for fillup in first.object_list],
+        )
+        self.assertFalse(back.has_previous())
+
+    def test_links_keep_filters_and_paging_mode(self) -> None:
+        response = self.client.get(
+            reverse("history-list"), {"paging": "cursor", "brand": "Brand"}
+        )
+        self.assertIn("paging=cursor", response.context["base_querystring"])
+        self.assertIn("brand=Brand", response.context["sort_links"]["liters"])
+        self.assertIn("paging=cursor", response.context["sort_links"]["liters"])
+
+    def test_invalid_or_mismatched_cursor_restarts(self) -> None:
+        self.assertIsNone(decode_cursor("not-a-cursor"))
+        stale = Cursor(sort_key="total", direction="asc", value="70.00", pk=1).encode()
+        response = self.client.get(
+            reverse("history-list"), {"paging": "cursor", "sort": "date", "cursor": stale}
+        )
+        page = response.context["page_obj"]
+        self.assertFalse(page.has_previous())
+        self.assertEqual(len(page.object_list), 25)
@@ -0,0 +1,65 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from fillups.loaders import FillRow
+from fillups.metrics import aggregate_metrics
+from fillups.models import FillUp
+from fillups.series import FillSeries
+from fillups.stats import brand_grade_summary, timeseries_consumption, timeseries_cost_per_liter
+from vehicles.models import Vehicle
+
+
+class ProjectedLoaderTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            email="loaders@example.com", password="password123"
+        )
+        self.client.force_login(self.user)
+        start = date.today() - timedelta(days=60)
+        for vehicle_index, name in enumerate(["Car", "Van"]):
+            vehicle = Vehicle.objects.create(user=self.user, name=name)
+            for step in range(6):
+                FillUp.objects.create(
+                    vehicle=vehicle,
+                    date=start + timedelta(days=step * 9 + vehicle_index),
+                    odometer_km=1000 * (vehicle_index + 1) + step * 310,
+                    station_name="Main Street",
+                    fuel_brand=["Shell", "BP"][step % 2],
+                    fuel_grade="95",
+                    liters=Decimal(f"3{step}.40"),
+                    total_amount=Decimal(f"6{step}.15"),
+                    notes="x" * 400,
+                )
+
+    def test_helpers_accept_projected_rows(self) -> None:
+        queryset = FillUp.objects.filter(user=self.user).order_by("vehicle_id", "date", "id")
+        rows = [FillRow._make(row) for row in queryset.values_list(*FillRow._fields)]
+        instances = list(queryset)
+
+        self.assertEqual(FillSeries.load(queryset).ids, [entry.id for entry in instances])
+        for helper in (
+            aggregate_metrics,
+            brand_grade_summary,
+            timeseries_consumption,
+            timeseries_cost_per_liter,
+        ):
+            with self.subTest(helper=helper.__name__):
+                self.assertEqual(helper(rows), helper(instances))
+                self.assertEqual(helper(FillSeries.load(queryset)), helper(instances))
+
+    def test_history_defers_unused_columns_without_extra_queries(self) -> None:
+        with CaptureQueriesContext(connection) as fewer_rows:
+            self.client.get(reverse("history-list"), {"start": date.today().isoformat()})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("history-list"), {"start": "2000-01-01"})
+
+        fillups = response.context["fillups"]
+        self.assertEqual(len(fillups), 12)
+        self.assertIn("notes", fillups[0].get_deferred_fields())
+        self.assertEqual(len(queries), len(fewer_rows))
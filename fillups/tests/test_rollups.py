@@ -0,0 +1,90 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from fillups.metrics import aggregate_metrics, aggregate_metrics_windows_sql
+from fillups.models import FillUp, FillUpDailyRollup
+from fillups.rollups import SUM_FIELDS, rebuild_for_user, rollup_metrics, rollup_metrics_windows
+from fillups.stats import window_start_from_param
+from vehicles.models import Vehicle
+
+
+class DailyRollupTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            email="rollups@example.com", password="password123"
+        )
+        self.today = date.today()
+        self.car = Vehicle.objects.create(user=self.user, name="Car")
+        self.van = Vehicle.objects.create(user=self.user, name="Van")
+        for vehicle, odometer, days_back in ((self.car, 20000, 150), (self.van, 60000, 70)):
+            for step in range(8):
+                odometer += 210 + 23 * (step % 4)
+                FillUp.objects.create(
+                    vehicle=vehicle,
+                    date=self.today - timedelta(days=days_back - step * 9),
+                    odometer_km=odometer,
+                    station_name="Main Street",
+                    liters=Decimal(f"{31 + step % 3}.{(step * 41) % 100:02d}"),
+                    total_amount=Decimal(f"{59 + step * 2}.{(step * 17) % 100:02d}"),
+                )
+
+    def _rollups(self) -> dict:
+        return {
+            (row["vehicle_id"], row["day"]): row
+            for row in FillUpDailyRollup.objects.filter(user=self.user).values(
+                "vehicle_id", "day", "fill_count", *SUM_FIELDS
+            )
+        }
+
+    def _assert_matches_reference(self) -> None:
+        entries = list(FillUp.objects.filter(user=self.user))
+        windows = {
+            key: window_start_from_param(key, self.today) for key in ("30", "90", "ytd", "all")
+        }
+        windows["boundary"] = self.today - timedelta(days=70 - 9)
+        results = rollup_metrics_windows(self.user, windows)
+        from_fills = aggregate_metrics_windows_sql(FillUp.objects.filter(user=self.user), windows)
+        for key, window_start in windows.items():
+            with self.subTest(window=key):
+                self.assertEqual(results[key], aggregate_metrics(entries, window_start=window_start))
+                self.assertEqual(results[key], from_fills[key])
+
+        van_entries = [entry for entry in entries if entry.vehicle_id == self.van.id]
+        window_start = self.today - timedelta(days=30)
+        self.assertEqual(
+            rollup_metrics(self.user, window_start=window_start, vehicle_id=self.van.id),
+            aggregate_metrics(van_entries, window_start=window_start),
+        )
+
+    def test_rollups_answer_windows_like_reference(self) -> None:
+        self._assert_matches_reference()
+
+    def test_incremental_updates_match_rebuild(self) -> None:
+        backdated = FillUp.objects.create(
+            vehicle=self.car,
+            date=self.today - timedelta(days=148),
+            odometer_km=20300,
+            station_name="Backdated",
+            liters=Decimal("12.00"),
+            total_amount=Decimal("25.00"),
+        )
+        edited = FillUp.objects.filter(vehicle=self.van).order_by("date", "id")[3]
+        edited.odometer_km += 5
+        edited.total_amount = Decimal("99.99")
+        edited.save()
+        FillUp.objects.filter(vehicle=self.car).order_by("date", "id")[4].delete()
+        backdated.liters = Decimal("13.50")
+        backdated.save()
+
+        incremental = self._rollups()
+        rebuild_for_user(self.user.id)
+        self.assertEqual(self._rollups(), incremental)
+        self._assert_matches_reference()
+
+    def test_deleting_last_fill_of_day_removes_row(self) -> None:
+        fillup = FillUp.objects.filter(vehicle=self.car).order_by("-date", "-id").first()
+        fillup.delete()
+        self.assertNotIn((self.car.id, fillup.date), self._rollups())
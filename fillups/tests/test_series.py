@@ -0,0 +1,88 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from fillups.metrics import aggregate_metrics
+from fillups.models import FillUp
+from fillups.series import FillSeries
+from fillups.stats import brand_grade_summary, timeseries_consumption, timeseries_cost_per_liter
+from vehicles.models import Vehicle
+
+
+class FillSeriesTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            email="series@example.com", password="password123"
+        )
+        self.start = date.today() - timedelta(days=90)
+        for vehicle_index, name in enumerate(["Car", "Van"]):
+            vehicle = Vehicle.objects.create(user=self.user, name=name)
+            odometer = 20000 * (vehicle_index + 1)
+            for step in range(8):
+                odometer += 260 + 45 * ((step + vehicle_index) % 3)
+                FillUp.objects.create(
+                    vehicle=vehicle,
+                    date=self.start + timedelta(days=step * 11 + vehicle_index * 4),
+                    odometer_km=odometer,
+                    station_name="Main Street",
+                    fuel_brand=["Shell", "", "BP"][step % 3],
+                    fuel_grade=["95", "98"][step % 2],
+                    liters=Decimal(f"{33 + step % 4}.{(step * 23) % 100:02d}"),
+                    total_amount=Decimal(f"{61 + step * 2}.{(step * 31) % 100:02d}"),
+                )
+        self.entries = list(FillUp.objects.filter(user=self.user).order_by("-date"))
+
+    def test_columns_are_sorted_once_with_per_vehicle_deltas(self) -> None:
+        series = FillSeries(self.entries)
+
+        order = sorted(self.entries, key=lambda entry: (entry.vehicle_id, entry.date, entry.id))
+        self.assertEqual(series.ids, [entry.id for entry in order])
+        self.assertEqual(
+            [series.ids[index] for index in series.chronological],
+            [entry.id for entry in sorted(self.entries, key=lambda entry: (entry.date, entry.id))],
+        )
+        first_of_vehicle = {
+            series.vehicle_ids.index(vehicle_id) for vehicle_id in set(series.vehicle_ids)
+        }
+        for index, distance in enumerate(series.distances):
+            if index in first_of_vehicle:
+                self.assertIsNone(distance)
+            else:
+                self.assertEqual(distance, series.odometers[index] - series.odometers[index - 1])
+
+    def test_load_matches_building_from_instances(self) -> None:
+        with CaptureQueriesContext(connection) as queries:
+            loaded = FillSeries.load(FillUp.objects.filter(user=self.user))
+
+        self.assertEqual(len(queries), 1)
+        built = FillSeries(self.entries)
+        for column in ("ids", "dates", "liters", "amounts", "distances", "consumptions", "chronological"):
+            with self.subTest(column=column):
+                self.assertEqual(getattr(loaded, column), getattr(built, column))
+        self.assertEqual(len(FillSeries.load(FillUp.objects.none())), 0)
+
+    def test_helpers_give_same_results_for_series_and_entries(self) -> None:
+        series = FillSeries.load(FillUp.objects.filter(user=self.user))
+        for helper in (
+            aggregate_metrics,
+            brand_grade_summary,
+            timeseries_consumption,
+            timeseries_cost_per_liter,
+        ):
+            with self.subTest(helper=helper.__name__):
+                self.assertEqual(helper(series), helper(self.entries))
+
+    def test_window_measures_deltas_inside_the_window(self) -> None:
+        window_start = self.start + timedelta(days=30)
+        series = FillSeries(self.entries).window(window_start)
+        inside = [entry for entry in self.entries if entry.date >= window_start]
+
+        self.assertEqual(timeseries_consumption(series), timeseries_consumption(inside))
+        self.assertEqual(
+            aggregate_metrics(FillSeries(self.entries), window_start=window_start),
+            aggregate_metrics(inside, window_start=window_start),
+        )
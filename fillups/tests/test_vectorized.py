@@ -0,0 +1,140 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from fillups.metrics import aggregate_metrics
+from fillups.models import FillUp
+from fillups.series import FillSeries
+from fillups.stats import (
+    brand_grade_summary,
+    timeseries_consumption,
+    timeseries_cost_per_liter,
+    window_start_from_param,
+)
+from fillups.vectorized import HAS_NUMPY, ArraySeries, load_series, resolve_backend
+from vehicles.models import Vehicle
+
+
+@skipUnless(HAS_NUMPY, "numpy is not installed")
+class VectorizedBackendTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            email="vectorized@example.com", password="password123"
+        )
+        self.today = date.today()
+        for vehicle_index, name in enumerate(["Car", "Van", "Bike"]):
+            vehicle = Vehicle.objects.create(user=self.user, name=name)
+            odometer = 15000 * (vehicle_index + 1)
+            for step in range(9):
+                odometer += 170 + 53 * ((step * 5 + vehicle_index) % 4)
+                FillUp.objects.create(
+                    vehicle=vehicle,
+                    date=self.today - timedelta(days=250 - step * 27 - vehicle_index * 3),
+                    odometer_km=odometer,
+                    station_name="Main Street",
+                    fuel_brand=["Shell", "shell", "", "BP"][step % 4],
+                    fuel_grade=["95", "Diesel"][(step + vehicle_index) % 2],
+                    liters=Decimal(f"{26 + step % 6}.{(step * 43 + vehicle_index) % 100:02d}"),
+                    total_amount=Decimal(f"{47 + step * 3}.{(step * 19) % 100:02d}"),
+                )
+        self.queryset = FillUp.objects.filter(user=self.user)
+        self.entries = list(self.queryset)
+        self.arrays = ArraySeries.load(self.queryset)
+
+    def test_aggregates_match_reference_exactly(self) -> None:
+        windows = {
+            key: window_start_from_param(key, self.today) for key in ("30", "90", "ytd", "all")
+        }
+        windows["custom"] = self.today - timedelta(days=123)
+        for key, window_start in windows.items():
+            with self.subTest(window=key):
+                self.assertEqual(
+                    aggregate_metrics(self.arrays, window_start=window_start),
+                    aggregate_metrics(self.entries, window_start=window_start),
+                )
+        end = self.today - timedelta(days=60)
+        self.assertEqual(
+            aggregate_metrics(self.arrays, window_end=end),
+            aggregate_metrics(self.entries, window_end=end),
+        )
+
+    def test_series_match_reference_to_display_precision(self) -> None:
+        expected_prices = timeseries_cost_per_liter(self.entries)
+        prices = timeseries_cost_per_liter(self.arrays)
+        self.assertEqual([day for day, _ in prices], [day for day, _ in expected_prices])
+        for (_, value), (_, expected) in zip(prices, expected_prices):
+            self.assertAlmostEqual(value, float(expected), places=9)
+
+        expected_consumption = timeseries_consumption(self.entries)
+        consumption = timeseries_consumption(self.arrays)
+        self.assertEqual(
+            [(day, value is None) for day, value in consumption],
+            [(day, value is None) for day, value in expected_consumption],
+        )
+        for (_, value), (_, expected) in zip(consumption, expected_consumption):
+            if expected is not None:
+                self.assertAlmostEqual(value, expected, places=9)
+
+    def test_brand_grade_groups_match_reference(self) -> None:
+        expected = brand_grade_summary(self.entries)
+        summary = brand_grade_summary(self.arrays)
+
+        def exact_columns(rows: list[dict]) -> list[tuple]:
+            return [
+                (row["brand"], row["grade"], row["count"], row["avg_cost_per_liter"])
+                for row in rows
+            ]
+
+        self.assertEqual(exact_columns(summary), exact_columns(expected))
+        for row, expected_row in zip(summary, expected):
+            self.assertAlmostEqual(
+                row["avg_consumption_l_per_100km"],
+                expected_row["avg_consumption_l_per_100km"],
+                places=9,
+            )
+
+    def test_from_series_matches_load(self) -> None:
+        converted = ArraySeries.from_series(FillSeries(self.entries))
+
+        self.assertEqual(converted.ids.tolist(), self.arrays.ids.tolist())
+        self.assertEqual(converted.days.tolist(), self.arrays.days.tolist())
+        self.assertEqual(converted.amount_cents.tolist(), self.arrays.amount_cents.tolist())
+
+    def test_empty_series(self) -> None:
+        empty = ArraySeries.load(FillUp.objects.none())
+
+        self.assertEqual(aggregate_metrics(empty), aggregate_metrics([]))
+        self.assertEqual(brand_grade_summary(empty), [])
+        self.assertEqual(timeseries_consumption(empty), [])
+        self.assertEqual(timeseries_cost_per_liter(empty), [])
+
+    @override_settings(FILLUP_STATS_BACKEND="auto", FILLUP_NUMPY_MIN_ROWS=20)
+    def test_backend_selection(self) -> None:
+        self.assertEqual(resolve_backend(19), "python")
+        self.assertEqual(resolve_backend(20), "numpy")
+        self.assertEqual(resolve_backend(None), "python")
+        self.assertEqual(resolve_backend(5, backend="numpy"), "numpy")
+        self.assertEqual(resolve_backend(5000, backend="python"), "python")
+
+        self.assertIsInstance(load_series(self.queryset, row_count=27), ArraySeries)
+        self.assertIsInstance(load_series(self.queryset, row_count=3), FillSeries)
+        # Without a count the fetched rows decide, so a short window of a
+        # large account stays on the Python backend.
+        self.assertIsInstance(load_series(self.queryset), ArraySeries)
+        recent = self.queryset.filter(date__gte=self.today - timedelta(days=60))
+        self.assertIsInstance(load_series(recent), FillSeries)
+
+    @override_settings(FILLUP_STATS_BACKEND="numpy")
+    def test_statistics_view_renders_with_numpy_backend(self) -> None:
+        self.client.force_login(self.user)
+
+        response = self.client.get("/statistics", {"window": "all"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context["chart_cost"]["has_data"])
+        self.assertEqual(
+            len(response.context["brand_rows"]), len(brand_grade_summary(self.entries))
+        )
@@ -0,0 +1,89 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from fillups.models import FillUp, FillUpVocabulary
+from fillups.vocabulary import option_lists, rebuild_for_user
+from vehicles.models import Vehicle
+
+
+class FillUpVocabularyTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            email="vocab@example.com", password="password123"
+        )
+        self.car = Vehicle.objects.create(user=self.user, name="Car")
+        self.van = Vehicle.objects.create(user=self.user, name="Van")
+        self.start = date.today() - timedelta(days=30)
+
+    def _create(self, vehicle, day: int, odometer: int, **fields) -> FillUp:
+        values = {
+            "station_name": "Main Street",
+            "fuel_brand": "Shell",
+            "fuel_grade": "Regular",
+            "liters": Decimal("40.00"),
+            "total_amount": Decimal("80.00"),
+        }
+        values.update(fields)
+        return FillUp.objects.create(
+            vehicle=vehicle,
+            date=self.start + timedelta(days=day),
+            odometer_km=odometer,
+            **values,
+        )
+
+    def _counts(self) -> dict[tuple[str, str], int]:
+        return {
+            (entry.kind, entry.value): entry.usage_count
+            for entry in FillUpVocabulary.objects.filter(user=self.user)
+        }
+
+    def test_counts_follow_create_edit_and_delete(self) -> None:
+        first = self._create(self.car, 0, 1000)
+        second = self._create(self.car, 5, 1400, fuel_brand="BP")
+        self._create(self.van, 5, 9000, fuel_brand="BP", fuel_grade="")
+
+        self.assertEqual(self._counts()[("brand", "BP")], 2)
+        self.assertEqual(self._counts()[("grade", "Regular")], 2)
+        self.assertEqual(option_lists(self.user)["brand"], ["BP", "Shell"])
+
+        second.fuel_brand = "Shell"
+        second.save()
+        counts = self._counts()
+        self.assertEqual(counts[("brand", "Shell")], 2)
+        self.assertEqual(counts[("brand", "BP")], 1)
+
+        first.delete()
+        counts = self._counts()
+        self.assertEqual(counts[("brand", "Shell")], 1)
+        self.assertEqual(counts[("station", "Main Street")], 2)
+
+    def test_vehicle_delete_reconciles_vocabulary(self) -> None:
+        self._create(self.car, 0, 1000, station_name="Harbor")
+        self._create(self.van, 0, 5000, station_name="Airport")
+
+        self.van.delete()
+
+        self.assertEqual(option_lists(self.user)["station"], ["Harbor"])
+
+    def test_rebuild_matches_incremental_state(self) -> None:
+        self._create(self.car, 0, 1000)
+        self._create(self.car, 1, 1300, fuel_grade="Premium")
+        self._create(self.van, 2, 5000, station_name="Harbor")
+        incremental = self._counts()
+
+        rebuild_for_user(self.user.id)
+
+        self.assertEqual(self._counts(), incremental)
+
+    def test_history_options_use_single_vocabulary_query(self) -> None:
+        self._create(self.car, 0, 1000)
+        self.client.force_login(self.user)
+
+        response = self.client.get(reverse("fillup-add"))
+
+        self.assertEqual(response.context["brand_options"], ["Shell"])
+        self.assertEqual(response.context["station_options"], ["Main Street"])
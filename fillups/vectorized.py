@@ -0,0 +1,276 @@
+"""Optional NumPy backend for the aggregate and statistics helpers.
+
+:class:`ArraySeries` is the array counterpart of :class:`fillups.series.FillSeries`.
+Liters and amounts are held as whole hundredths (both columns have two
+decimal places), so sums stay exact and the aggregates match the Python
+reference exactly; per-fill ratios are floats, equal to display precision.
+The helpers in ``fillups.metrics`` and ``fillups.stats`` hand an
+``ArraySeries`` to the functions here, so the backend is chosen by the series
+type; :func:`load_series` picks one from the ``FILLUP_STATS_BACKEND`` setting.
+"""
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import BigIntegerField, F, Func, IntegerField, QuerySet
+from django.db.models.functions import Cast
+
+from .series import FillSeries
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+HAS_NUMPY = np is not None
+
+BACKEND_CHOICES = ("auto", "python", "numpy")
+
+
+class EpochDay(Func):
+    """Days since 1970-01-01, which NumPy reads directly as ``datetime64[D]``."""
+
+    template = "(%(expressions)s - DATE '1970-01-01')"
+    output_field = IntegerField()
+
+
+def resolve_backend(row_count: int | None = None, backend: str | None = None) -> str:
+    """Return ``"numpy"`` or ``"python"`` for a series of about ``row_count`` fills.
+
+    ``backend`` overrides the ``FILLUP_STATS_BACKEND`` setting; without numpy
+    installed the Python backend is always used.
+    """
+
+    choice = (backend or settings.FILLUP_STATS_BACKEND).lower()
+    if not HAS_NUMPY:
+        return "python"
+    if choice == "numpy":
+        return "numpy"
+    if choice == "auto" and row_count is not None:
+        return "numpy" if row_count >= settings.FILLUP_NUMPY_MIN_ROWS else "python"
+    return "python"
+
+
+def load_series(
+    queryset: QuerySet, row_count: int | None = None, backend: str | None = None
+) -> "FillSeries | ArraySeries":
+    """Load ``queryset`` as the series type of the backend chosen for ``row_count``.
+
+    Without ``row_count`` the ``auto`` choice is made from the fetched rows,
+    converting them to an :class:`ArraySeries` when there are enough.
+    """
+
+    choice = (backend or settings.FILLUP_STATS_BACKEND).lower()
+    if row_count is None and choice == "auto" and HAS_NUMPY:
+        series = FillSeries.load(queryset)
+        if len(series) >= settings.FILLUP_NUMPY_MIN_ROWS:
+            return ArraySeries.from_series(series)
+        return series
+    if resolve_backend(row_count, backend) == "numpy":
+        return ArraySeries.load(queryset)
+    return FillSeries.load(queryset)
+
+
+class ArraySeries:
+    """Fill-ups as NumPy arrays in ``(vehicle_id, date, id)`` order.
+
+    Mirrors :class:`~fillups.series.FillSeries`: ``distances`` and
+    ``consumptions`` are measured within the series and ``chronological``
+    holds the ``(date, id)`` order.
+    """
+
+    def __init__(
+        self,
+        ids,
+        vehicle_ids,
+        days,
+        odometers,
+        liters_cents,
+        amount_cents,
+        brands: list[str],
+        grades: list[str],
+    ) -> None:
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.vehicle_ids = np.asarray(vehicle_ids, dtype=np.int64)
+        days = np.asarray(days)
+        if days.dtype.kind in "iu":
+            days = days.astype(np.int64)
+        self.days = days.astype("datetime64[D]")
+        self.odometers = np.asarray(odometers, dtype=np.int64)
+        self.liters_cents = np.asarray(liters_cents, dtype=np.int64)
+        self.amount_cents = np.asarray(amount_cents, dtype=np.int64)
+        self.brands = list(brands)
+        self.grades = list(grades)
+
+        count = len(self.ids)
+        delta = np.zeros(count, dtype=np.int64)
+        same_vehicle = np.zeros(count, dtype=bool)
+        if count > 1:
+            delta[1:] = self.odometers[1:] - self.odometers[:-1]
+            same_vehicle[1:] = self.vehicle_ids[1:] == self.vehicle_ids[:-1]
+        self.has_distance = same_vehicle & (delta > 0)
+        self.distances = np.where(self.has_distance, delta, 0)
+
+        with_consumption = self.has_distance & (self.liters_cents > 0)
+        self.consumptions = np.full(count, np.nan)
+        # liters * 100 / distance, with liters in hundredths.
+        self.consumptions[with_consumption] = (
+            self.liters_cents[with_consumption] / self.distances[with_consumption]
+        )
+        self.chronological = np.lexsort((self.ids, self.days))
+
+    @classmethod
+    def load(cls, queryset: QuerySet) -> "ArraySeries":
+        """Build a series from ``queryset`` with the database scaling to hundredths."""
+
+        rows = queryset.order_by("vehicle_id", "date", "id").values_list(
+            "id",
+            "vehicle_id",
+            EpochDay("date"),
+            "odometer_km",
+            Cast(F("liters") * 100, BigIntegerField()),
+            Cast(F("total_amount") * 100, BigIntegerField()),
+            "fuel_brand",
+            "fuel_grade",
+        )
+        columns = [list(column) for column in zip(*rows)] or [[] for _ in range(8)]
+        return cls(*columns)
+
+    @classmethod
+    def from_series(cls, series: FillSeries) -> "ArraySeries":
+        return cls(
+            series.ids,
+            series.vehicle_ids,
+            series.dates,
+            series.odometers,
+            [int(value * 100) for value in series.liters],
+            [int(value * 100) for value in series.amounts],
+            series.brands,
+            series.grades,
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def window(self, start: date | None = None, end: date | None = None) -> "ArraySeries":
+        """Return the fills dated within ``[start, end]`` with deltas measured inside it."""
+
+        if start is None and end is None:
+            return self
+        keep = np.ones(len(self), dtype=bool)
+        if start is not None:
+            keep &= self.days >= np.datetime64(start, "D")
+        if end is not None:
+            keep &= self.days <= np.datetime64(end, "D")
+        positions = np.flatnonzero(keep)
+        return ArraySeries(
+            self.ids[keep],
+            self.vehicle_ids[keep],
+            self.days[keep],
+            self.odometers[keep],
+            self.liters_cents[keep],
+            self.amount_cents[keep],
+            [self.brands[index] for index in positions],
+            [self.grades[index] for index in positions],
+        )
+
+
+def _hundredths(value) -> Decimal:
+    return Decimal(int(value)).scaleb(-2)
+
+
+def aggregate_metrics(
+    series: ArraySeries, window_start: date | None = None, window_end: date | None = None
+) -> dict:
+    """Vectorized ``fillups.metrics.aggregate_metrics``."""
+
+    from .metrics import metrics_from_totals  # metrics dispatches to this module
+
+    series = series.window(window_start, window_end)
+    has_distance = series.has_distance
+    empty = len(series) == 0
+    return metrics_from_totals(
+        total_spend=_hundredths(series.amount_cents.sum()),
+        total_liters=_hundredths(series.liters_cents.sum()),
+        total_distance=Decimal(int(series.distances.sum())),
+        liters_for_distance=_hundredths(series.liters_cents[has_distance].sum()),
+        cost_for_distance=_hundredths(series.amount_cents[has_distance].sum()),
+        min_date=None if empty else series.days.min().item(),
+        max_date=None if empty else series.days.max().item(),
+        window_start=window_start,
+        window_end=window_end,
+    )
+
+
+def timeseries_cost_per_liter(series: ArraySeries) -> list[tuple[date, float]]:
+    """Vectorized ``fillups.stats.timeseries_cost_per_liter`` with float prices."""
+
+    order = series.chronological[series.liters_cents[series.chronological] > 0]
+    prices = series.amount_cents[order] / series.liters_cents[order]
+    return list(zip(series.days[order].tolist(), prices.tolist()))
+
+
+def timeseries_consumption(series: ArraySeries) -> list[tuple[date, float | None]]:
+    """Vectorized ``fillups.stats.timeseries_consumption``."""
+
+    order = series.chronological
+    values = series.consumptions[order]
+    return [
+        (day, None if value != value else value)
+        for day, value in zip(series.days[order].tolist(), values.tolist())
+    ]
+
+
+def brand_grade_summary(series: ArraySeries) -> list[dict]:
+    """Vectorized ``fillups.stats.brand_grade_summary``."""
+
+    if not len(series):
+        return []
+
+    keys = np.array(
+        [f"{brand or ''}\x00{grade or ''}" for brand, grade in zip(series.brands, series.grades)],
+        dtype=object,
+    )
+    unique_keys, first_index, groups = np.unique(keys, return_index=True, return_inverse=True)
+    group_count = len(unique_keys)
+
+    priced = series.liters_cents > 0
+    amount_sums = np.bincount(
+        groups[priced], weights=series.amount_cents[priced], minlength=group_count
+    )
+    liters_sums = np.bincount(
+        groups[priced], weights=series.liters_cents[priced], minlength=group_count
+    )
+    with_consumption = ~np.isnan(series.consumptions)
+    consumption_sums = np.bincount(
+        groups[with_consumption],
+        weights=series.consumptions[with_consumption],
+        minlength=group_count,
+    )
+    consumption_counts = np.bincount(groups[with_consumption], minlength=group_count)
+    counts = np.bincount(groups, minlength=group_count)
+
+    results: list[dict] = []
+    # First-seen order, as the reference builds its groups, before the stable sort.
+    for group in np.argsort(first_index, kind="stable").tolist():
+        brand, grade = unique_keys[group].split("\x00")
+        avg_cost: Decimal | None = None
+        if liters_sums[group] > 0:
+            avg_cost = Decimal(int(amount_sums[group])) / Decimal(int(liters_sums[group]))
+        avg_consumption: float | None = None
+        if consumption_counts[group]:
+            avg_consumption = float(consumption_sums[group] / consumption_counts[group])
+        results.append(
+            {
+                "brand": brand,
+                "grade": grade,
+                "avg_cost_per_liter": avg_cost,
+                "avg_consumption_l_per_100km": avg_consumption,
+                "count": int(counts[group]),
+            }
+        )
+
+    results.sort(key=lambda item: (item["brand"].lower(), item["grade"].lower()))
+    return results
@@ -1,32 +1,51 @@
 from __future__ import annotations
 
+import csv
+import io
 from datetime import date, timedelta
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
 from types import SimpleNamespace
 from urllib.parse import urlencode
 
+from django.conf import settings
+from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.http import Http404, HttpResponseNotAllowed
 from django.shortcuts import get_object_or_404, redirect
 from django.utils.dateparse import parse_date
 from django.views import View
-from django.views.generic import CreateView, ListView, TemplateView, UpdateView
+from django.views.generic import CreateView, FormView, ListView, TemplateView, UpdateView
 
 from profiles.models import Profile
 from profiles.units import gallons_to_liters, km_to_miles, liters_to_gallons
-from core.mixins import OwnedQuerysetMixin
+from core.mixins import DataVersionETagMixin, OwnedQuerysetMixin
+from core.result_cache import cached_result
 from core.utils import sanitize_next
 
-from .forms import FillUpForm
-from .models import FillUp
-from .metrics import aggregate_metrics, per_fill_metrics
+from .forms import FillUpForm, FillUpImportForm
+from .importer import import_fillups
+from .models import FillUp, FillUpVocabulary, user_key
+from .metrics import per_fill_from_stored
+from .counters import fillup_count
+from .cumulative import range_metrics
+from .loaders import project_history
+from .pagination import (
+    CountedPaginator,
+    LookaheadPaginator,
+    decode_cursor,
+    paginate_keyset,
+)
+from .rollups import rollup_metrics, rollup_metrics_windows
 from .stats import (
-    brand_grade_summary,
+    brand_grade_summary_sql,
+    downsample_lttb,
     timeseries_consumption,
     timeseries_cost_per_liter,
     to_svg_path,
     window_start_from_param,
 )
+from .vectorized import load_series
+from .vocabulary import option_lists
 
 
 def _ensure_profile(user):
@@ -42,24 +61,36 @@ def _ensure_profile(user):
     return profile
 
 
-class FillUpFormContextMixin:
-    def _option_values(self, field_name: str) -> list[str]:
-        queryset = (
-            FillUp.objects.filter(user=self.request.user)
-            .exclude(**{field_name: ""})
-            .order_by()
-            .values_list(field_name, flat=True)
-            .distinct()
-        )
-        return list(queryset)
+def _date_range_from_request(request) -> tuple[date | None, date | None]:
+    """Return the inclusive ``start``/``end`` query dates; blank or invalid ones are ``None``."""
+
+    bounds: list[date | None] = []
+    for param in ("start", "end"):
+        value = request.GET.get(param, "").strip()
+        try:
+            bounds.append(parse_date(value) if value else None)
+        except ValueError:
+            bounds.append(None)
+    return bounds[0], bounds[1]
+
 
+def _date_range_label(start: date | None, end: date | None) -> str:
+    if start is not None and end is not None:
+        return f"{start:%b %d, %Y} – {end:%b %d, %Y}"
+    if start is not None:
+        return f"Since {start:%b %d, %Y}"
+    return f"Until {end:%b %d, %Y}"
+
+
+class FillUpFormContextMixin:
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        options = option_lists(self.request.user)
         context.update(
             {
-                "brand_options": self._option_values("fuel_brand"),
-                "grade_options": self._option_values("fuel_grade"),
-                "station_options": self._option_values("station_name"),
+                "brand_options": options[FillUpVocabulary.Kind.BRAND],
+                "grade_options": options[FillUpVocabulary.Kind.GRADE],
+                "station_options": options[FillUpVocabulary.Kind.STATION],
             }
         )
         return context
@@ -130,7 +161,28 @@ class FillUpDeleteView(LoginRequiredMixin, View):
         return HttpResponseNotAllowed(["POST"])
 
 
-class HistoryListView(LoginRequiredMixin, OwnedQuerysetMixin, ListView):
+class FillUpImportView(LoginRequiredMixin, FormView):
+    form_class = FillUpImportForm
+    template_name = "fillups/import.html"
+
+    def form_valid(self, form):
+        upload = form.cleaned_data["file"]
+        # Uploads are spooled to disk above FILE_UPLOAD_MAX_MEMORY_SIZE and read as a stream.
+        handle = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+        try:
+            result = import_fillups(self.request.user, handle)
+        except (UnicodeDecodeError, csv.Error):
+            form.add_error("file", "The file is not a UTF-8 CSV file.")
+            return self.form_invalid(form)
+        finally:
+            handle.detach()
+        if not result.ok:
+            return self.render_to_response(self.get_context_data(form=form, errors=result.errors))
+        messages.success(self.request, f"Imported {result.created} fill-ups.")
+        return redirect("history-list")
+
+
+class HistoryListView(LoginRequiredMixin, DataVersionETagMixin, OwnedQuerysetMixin, ListView):
     model = FillUp
     template_name = "fillups/history.html"
     paginate_by = 25
@@ -141,19 +193,98 @@ class HistoryListView(LoginRequiredMixin, OwnedQuerysetMixin, ListView):
         "odometer": "odometer_km",
         "liters": "liters",
         "total": "total_amount",
+        "efficiency": "consumption_l_per_100km",
+        "unit_price": "unit_price_per_liter",
+        "cost_per_distance": "cost_per_km",
+    }
+    # Sorts over the derived columns stored on FillUp. Fills without a value
+    # (such as the first fill of a vehicle) are left out of these sorts.
+    DERIVED_SORTS = {"efficiency", "unit_price", "cost_per_distance"}
+
+    # ``<name>_min`` / ``<name>_max`` range filters, entered in display units.
+    RANGE_FILTERS = {
+        "efficiency": "consumption_l_per_100km",
+        "unit_price": "unit_price_per_liter",
+        "cost_per_distance": "cost_per_km",
     }
 
     DEFAULT_SORT = "date"
     DEFAULT_DIR = "desc"
 
+    PAGING_MODES = {"page", "cursor"}
+    DEFAULT_PAGING = "page"
+
+    TEXT_FILTERS = {
+        "brand": "fuel_brand",
+        "grade": "fuel_grade",
+        "station": "station_name",
+    }
+    # Both lookups compare UPPER(column), matching the trigram and
+    # pattern_ops expression indexes on FillUp.
+    MATCH_LOOKUPS = {
+        "contains": "icontains",
+        "prefix": "istartswith",
+    }
+    DEFAULT_MATCH = "contains"
+
+    # Filters whose totals are kept in FillUpCounter; any other filter pages
+    # without a count.
+    COUNTED_FILTERS = {"vehicle", "match"}
+
+    def _range_bounds(self, name: str) -> tuple[Decimal | None, Decimal | None]:
+        """Return the metric ``(lower, upper)`` bounds requested for ``name``.
+
+        Values are read in the user's display units; invalid or non-positive
+        values are ignored. MPG bounds swap ends because MPG falls as L/100km
+        rises.
+        """
+
+        bounds: list[Decimal | None] = []
+        for suffix in ("min", "max"):
+            param = f"{name}_{suffix}"
+            raw = self.request.GET.get(param, "").strip()
+            value: Decimal | None = None
+            if raw:
+                try:
+                    value = Decimal(raw)
+                except InvalidOperation:
+                    value = None
+                if value is not None and value.is_finite() and value > 0:
+                    self.active_filters[param] = raw
+                else:
+                    value = None
+            bounds.append(value)
+
+        lower, upper = bounds
+        profile = self.profile
+        if name == "efficiency" and profile.efficiency_unit == Profile.EfficiencyUnit.MPG:
+            miles_per_100km = Decimal(str(km_to_miles(100.0)))
+            liters_per_gallon = Decimal(str(gallons_to_liters(1.0)))
+
+            def _to_l_per_100km(mpg: Decimal | None) -> Decimal | None:
+                if mpg is None:
+                    return None
+                return miles_per_100km / mpg * liters_per_gallon
+
+            return _to_l_per_100km(upper), _to_l_per_100km(lower)
+        if name == "unit_price" and profile.volume_unit == Profile.UNIT_GALLONS:
+            liters_per_gallon = Decimal(str(gallons_to_liters(1.0)))
+            return tuple(
+                None if value is None else value / liters_per_gallon for value in (lower, upper)
+            )
+        if name == "cost_per_distance" and profile.distance_unit == Profile.UNIT_MILES:
+            miles_per_km = Decimal(str(km_to_miles(1.0)))
+            return tuple(
+                None if value is None else value * miles_per_km for value in (lower, upper)
+            )
+        return lower, upper
+
     def get_queryset(self):
         request = self.request
+        self.profile = _ensure_profile(request.user)
         queryset = super().get_queryset()
-        queryset = (
-            queryset.filter(user=request.user)
-            .select_related("vehicle")
-            .order_by("-date", "-id")
-        )
+        queryset = project_history(queryset.filter(user_id=user_key(request.user)))
+        queryset = queryset.order_by("-date", "-id")
 
         self.active_filters: dict[str, str] = {}
 
@@ -171,20 +302,19 @@ class HistoryListView(LoginRequiredMixin, OwnedQuerysetMixin, ListView):
                 queryset = queryset.filter(date__lte=parsed_end)
                 self.active_filters["end"] = end_value
 
-        brand_value = request.GET.get("brand", "").strip()
-        if brand_value:
-            queryset = queryset.filter(fuel_brand__icontains=brand_value)
-            self.active_filters["brand"] = brand_value
+        match_param = request.GET.get("match", self.DEFAULT_MATCH)
+        if match_param not in self.MATCH_LOOKUPS:
+            match_param = self.DEFAULT_MATCH
+        match_lookup = self.MATCH_LOOKUPS[match_param]
 
-        grade_value = request.GET.get("grade", "").strip()
-        if grade_value:
-            queryset = queryset.filter(fuel_grade__icontains=grade_value)
-            self.active_filters["grade"] = grade_value
+        for param, field_name in self.TEXT_FILTERS.items():
+            value = request.GET.get(param, "").strip()
+            if value:
+                queryset = queryset.filter(**{f"{field_name}__{match_lookup}": value})
+                self.active_filters[param] = value
 
-        station_value = request.GET.get("station", "").strip()
-        if station_value:
-            queryset = queryset.filter(station_name__icontains=station_value)
-            self.active_filters["station"] = station_value
+        if match_param != self.DEFAULT_MATCH:
+            self.active_filters["match"] = match_param
 
         vehicle_value = request.GET.get("vehicle", "").strip()
         if vehicle_value:
@@ -197,6 +327,13 @@ class HistoryListView(LoginRequiredMixin, OwnedQuerysetMixin, ListView):
                     queryset = queryset.filter(vehicle_id=vehicle_id)
                     self.active_filters["vehicle"] = str(vehicle_id)
 
+        for name, field_name in self.RANGE_FILTERS.items():
+            lower, upper = self._range_bounds(name)
+            if lower is not None:
+                queryset = queryset.filter(**{f"{field_name}__gte": lower})
+            if upper is not None:
+                queryset = queryset.filter(**{f"{field_name}__lte": upper})
+
         sort_param = request.GET.get("sort", self.DEFAULT_SORT)
         if sort_param not in self.SORT_MAP:
             sort_param = self.DEFAULT_SORT
@@ -208,7 +345,22 @@ class HistoryListView(LoginRequiredMixin, OwnedQuerysetMixin, ListView):
         self.sort_key = sort_param
         self.sort_dir = dir_param
 
+        paging_param = request.GET.get("paging", self.DEFAULT_PAGING)
+        if paging_param not in self.PAGING_MODES:
+            paging_param = self.DEFAULT_PAGING
+        self.paging_mode = paging_param
+
         sort_field = self.SORT_MAP[sort_param]
+        # Rows are ordered by the stored metric column; for MPG users "asc"
+        # means lowest MPG first, which is the highest L/100km.
+        if sort_param == "efficiency" and self.profile.efficiency_unit == Profile.EfficiencyUnit.MPG:
+            dir_param = "asc" if dir_param == "desc" else "desc"
+        self.sort_sql_dir = dir_param
+        self.counted = not (set(self.active_filters) - self.COUNTED_FILTERS)
+        if sort_param in self.DERIVED_SORTS:
+            queryset = queryset.filter(**{f"{sort_field}__isnull": False})
+            self.counted = False
+
         if dir_param == "desc":
             ordering = [f"-{sort_field}", "-id"]
         else:
@@ -217,8 +369,40 @@ class HistoryListView(LoginRequiredMixin, OwnedQuerysetMixin, ListView):
 
         return queryset
 
+    def get_paginator(self, queryset, per_page, orphans=0, allow_empty_first_page=True, **kwargs):
+        if not self.counted:
+            return LookaheadPaginator(
+                queryset, per_page, orphans=orphans, allow_empty_first_page=allow_empty_first_page
+            )
+        vehicle_id = self.active_filters.get("vehicle")
+        return CountedPaginator(
+            queryset,
+            per_page,
+            known_count=fillup_count(
+                self.request.user, vehicle_id=int(vehicle_id) if vehicle_id else None
+            ),
+            orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page,
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.paging_mode != "cursor":
+            return super().paginate_queryset(queryset, page_size)
+
+        page = paginate_keyset(
+            queryset,
+            sort_key=self.sort_key,
+            field_name=self.SORT_MAP[self.sort_key],
+            direction=self.sort_sql_dir,
+            cursor=decode_cursor(self.request.GET.get("cursor")),
+            per_page=page_size,
+        )
+        return (None, page, page.object_list, page.has_other_pages())
+
     def _build_querystring(self, **overrides: str) -> str:
         params = {**self.active_filters, "sort": self.sort_key, "dir": self.sort_dir}
+        if self.paging_mode != self.DEFAULT_PAGING:
+            params["paging"] = self.paging_mode
         params.update({k: v for k, v in overrides.items() if v is not None})
         # Remove blank values to keep querystrings tidy.
         params = {k: v for k, v in params.items() if str(v)}
@@ -228,7 +412,7 @@ class HistoryListView(LoginRequiredMixin, OwnedQuerysetMixin, ListView):
         context = super().get_context_data(**kwargs)
 
         user = self.request.user
-        profile = _ensure_profile(user)
+        profile = self.profile
         unit_prefs = {
             "distance": "mi" if profile.distance_unit == Profile.UNIT_MILES else "km",
             "volume": "gal" if profile.volume_unit == Profile.UNIT_GALLONS else "L",
@@ -247,8 +431,6 @@ class HistoryListView(LoginRequiredMixin, OwnedQuerysetMixin, ListView):
         else:
             page_fillups = list(context.get("fillups", []))
 
-        fillup_by_id = {fillup.id: fillup for fillup in page_fillups}
-
         liters_per_gallon = Decimal(str(gallons_to_liters(1.0)))
 
         for fillup in page_fillups:
@@ -309,34 +491,18 @@ class HistoryListView(LoginRequiredMixin, OwnedQuerysetMixin, ListView):
                 return None
             return f"{currency} {cost_per_km:.2f} / km"
 
-        if fillup_by_id:
-            vehicle_ids = {fillup.vehicle_id for fillup in page_fillups}
-            if vehicle_ids:
-                all_vehicle_entries = (
-                    FillUp.objects.filter(user=user, vehicle_id__in=vehicle_ids)
-                    .select_related("vehicle")
-                    .order_by("vehicle_id", "date", "id")
-                )
-
-                grouped: dict[int, list[FillUp]] = {}
-                for entry in all_vehicle_entries:
-                    grouped.setdefault(entry.vehicle_id, []).append(entry)
-
-                for vehicle_id, rows in grouped.items():
-                    for per_fill in per_fill_metrics(rows):
-                        fillup = fillup_by_id.get(per_fill.fillup.id)
-                        if not fillup:
-                            continue
-                        fillup.calc = SimpleNamespace(
-                            distance_since_last=_fmt_distance_since_last(per_fill.distance_since_last_km),
-                            unit_price=_fmt_unit_price(per_fill.unit_price_per_liter),
-                            efficiency=_fmt_efficiency(
-                                per_fill.efficiency_l_per_100km, per_fill.efficiency_mpg
-                            ),
-                            cost_per_distance=_fmt_cost_per_distance(
-                                per_fill.cost_per_km, per_fill.cost_per_mile
-                            ),
-                        )
+        for fillup in page_fillups:
+            per_fill = per_fill_from_stored(fillup)
+            fillup.calc = SimpleNamespace(
+                distance_since_last=_fmt_distance_since_last(per_fill.distance_since_last_km),
+                unit_price=_fmt_unit_price(per_fill.unit_price_per_liter),
+                efficiency=_fmt_efficiency(
+                    per_fill.efficiency_l_per_100km, per_fill.efficiency_mpg
+                ),
+                cost_per_distance=_fmt_cost_per_distance(
+                    per_fill.cost_per_km, per_fill.cost_per_mile
+                ),
+            )
 
         if page_obj is not None:
             page_obj.object_list = page_fillups
@@ -355,48 +521,29 @@ class HistoryListView(LoginRequiredMixin, OwnedQuerysetMixin, ListView):
 
         base_querystring = self._build_querystring()
 
-        brand_options = (
-            FillUp.objects.filter(user=user)
-            .exclude(fuel_brand="")
-            .values_list("fuel_brand", flat=True)
-            .distinct()
-            .order_by("fuel_brand")
-        )
-        grade_options = (
-            FillUp.objects.filter(user=user)
-            .exclude(fuel_grade="")
-            .values_list("fuel_grade", flat=True)
-            .distinct()
-            .order_by("fuel_grade")
-        )
-        station_options = (
-            FillUp.objects.filter(user=user)
-            .exclude(station_name="")
-            .values_list("station_name", flat=True)
-            .distinct()
-            .order_by("station_name")
-        )
+        options = option_lists(user)
 
         context.update(
             {
                 "active_filters": self.active_filters,
                 "sort": self.sort_key,
                 "dir": self.sort_dir,
+                "paging": self.paging_mode,
                 "vehicles": user.vehicles.all(),
                 "unit_prefs": unit_prefs,
                 "sort_links": sort_links,
                 "base_querystring": base_querystring,
                 "efficiency_label": efficiency_label,
-                "brand_options": list(brand_options),
-                "grade_options": list(grade_options),
-                "station_options": list(station_options),
+                "brand_options": options[FillUpVocabulary.Kind.BRAND],
+                "grade_options": options[FillUpVocabulary.Kind.GRADE],
+                "station_options": options[FillUpVocabulary.Kind.STATION],
             }
         )
 
         return context
 
 
-class MetricsView(LoginRequiredMixin, TemplateView):
+class MetricsView(LoginRequiredMixin, DataVersionETagMixin, TemplateView):
     template_name = "fillups/metrics.html"
 
     WINDOW_DEFAULT = "30"
@@ -438,18 +585,28 @@ class MetricsView(LoginRequiredMixin, TemplateView):
                 else:
                     vehicle_param = "all"
 
-        queryset = (
-            FillUp.objects.filter(user=user)
-            .select_related("vehicle")
-            .order_by("vehicle_id", "date", "id")
-        )
-        if selected_vehicle_id is not None:
-            queryset = queryset.filter(vehicle_id=selected_vehicle_id)
+        range_start, range_end = _date_range_from_request(request)
+        if range_start is not None or range_end is not None:
+            window_label = _date_range_label(range_start, range_end)
 
-        entries = list(queryset)
+        def _compute_metrics() -> tuple[dict, dict]:
+            if range_start is not None or range_end is not None:
+                # Arbitrary ranges come from the per-fill running totals.
+                rolling = range_metrics(
+                    user, range_start, range_end, vehicle_id=selected_vehicle_id
+                )
+                return rolling, rollup_metrics(user, vehicle_id=selected_vehicle_id)
+            window_results = rollup_metrics_windows(
+                user, {"rolling": window_start, "all": None}, vehicle_id=selected_vehicle_id
+            )
+            return window_results["rolling"], window_results["all"]
 
-        rolling_raw = aggregate_metrics(entries, window_start=window_start)
-        all_time_raw = aggregate_metrics(entries)
+        rolling_raw, all_time_raw = cached_result(
+            user,
+            "metrics",
+            (selected_vehicle_id, window_start, range_start, range_end),
+            _compute_metrics,
+        )
 
         unit_prefs = {
             "distance": "mi" if prefs.distance_unit == Profile.UNIT_MILES else "km",
@@ -526,6 +683,8 @@ class MetricsView(LoginRequiredMixin, TemplateView):
                 "selected_vehicle": vehicle_param,
                 "window": window_param,
                 "window_label": window_label,
+                "range_start": range_start.isoformat() if range_start else "",
+                "range_end": range_end.isoformat() if range_end else "",
                 "rolling_metrics": rolling_display,
                 "all_time_metrics": all_time_display,
                 "unit_prefs": unit_prefs,
@@ -536,7 +695,7 @@ class MetricsView(LoginRequiredMixin, TemplateView):
         return context
 
 
-class StatisticsView(LoginRequiredMixin, TemplateView):
+class StatisticsView(LoginRequiredMixin, DataVersionETagMixin, TemplateView):
     template_name = "fillups/statistics.html"
 
     CHART_WIDTH = 600
@@ -584,22 +743,22 @@ class StatisticsView(LoginRequiredMixin, TemplateView):
                 else:
                     vehicle_param = "all"
 
-        queryset = (
-            FillUp.objects.filter(user=user)
-            .select_related("vehicle")
-            .order_by("vehicle_id", "date", "id")
-        )
+        queryset = FillUp.objects.filter(user=user)
         if selected_vehicle_id is not None:
             queryset = queryset.filter(vehicle_id=selected_vehicle_id)
 
-        entries = list(queryset)
-        window_entries = [
-            entry for entry in entries if window_start is None or entry.date >= window_start
-        ]
-
-        summary_raw = aggregate_metrics(entries, window_start=window_start)
+        range_start, range_end = _date_range_from_request(request)
+        if range_start is not None or range_end is not None:
+            # An explicit range replaces the period; totals come from the running sums.
+            if range_start is not None:
+                queryset = queryset.filter(date__gte=range_start)
+            if range_end is not None:
+                queryset = queryset.filter(date__lte=range_end)
+        elif window_start is not None:
+            queryset = queryset.filter(date__gte=window_start)
 
         liters_per_gallon = Decimal(str(gallons_to_liters(1.0)))
+        miles_per_100km = km_to_miles(100.0)
 
         def _format_cost_per_volume(value: Decimal | None) -> str:
             if value is None:
@@ -632,58 +791,6 @@ class StatisticsView(LoginRequiredMixin, TemplateView):
                 return "—"
             return f"{currency} {cost_per_km:.2f} / km"
 
-        total_distance_value = summary_raw.get("total_distance_km", 0.0) or 0.0
-        if unit_prefs["distance"] == "mi":
-            total_distance_value = km_to_miles(total_distance_value)
-
-        avg_distance_per_day = summary_raw.get("avg_distance_per_day_km")
-        if avg_distance_per_day is not None and unit_prefs["distance"] == "mi":
-            avg_distance_per_day = km_to_miles(avg_distance_per_day)
-
-        summary = {
-            "avg_consumption": _format_consumption(
-                summary_raw.get("avg_consumption_l_per_100km"),
-                summary_raw.get("avg_consumption_mpg"),
-            ),
-            "avg_cost_per_volume": _format_cost_per_volume(
-                summary_raw.get("avg_cost_per_liter")
-            ),
-            "total_spend": f"{unit_prefs['currency']} {summary_raw.get('total_spend', Decimal('0')):.2f}",
-            "total_distance": f"{int(round(total_distance_value))} {unit_prefs['distance']}",
-            "avg_cost_per_distance": _format_cost_per_distance(
-                summary_raw.get("avg_cost_per_km"), summary_raw.get("avg_cost_per_mile")
-            ),
-            "avg_distance_per_day": (
-                f"{int(round(avg_distance_per_day))} {unit_prefs['distance']}/day"
-                if avg_distance_per_day is not None
-                else "—"
-            ),
-        }
-
-        cost_series_raw = timeseries_cost_per_liter(window_entries)
-        cost_series_converted: list[tuple[date, float]] = []
-        for entry_date, price_per_liter in cost_series_raw:
-            converted = price_per_liter
-            if unit_prefs["volume"] == "gal":
-                converted = price_per_liter * liters_per_gallon
-            cost_series_converted.append((entry_date, float(converted)))
-
-        consumption_series_raw = timeseries_consumption(window_entries)
-        consumption_series_converted: list[tuple[date, float | None]] = []
-        miles_per_100km = km_to_miles(100.0)
-        for entry_date, consumption in consumption_series_raw:
-            if consumption is None:
-                consumption_series_converted.append((entry_date, None))
-                continue
-            if use_mpg:
-                gallons = liters_to_gallons(consumption)
-                value: float | None = None
-                if gallons > 0:
-                    value = miles_per_100km / gallons
-                consumption_series_converted.append((entry_date, value))
-            else:
-                consumption_series_converted.append((entry_date, consumption))
-
         def _build_chart(
             series: list[tuple[date, float | None]],
             precision: int,
@@ -737,6 +844,14 @@ class StatisticsView(LoginRequiredMixin, TemplateView):
             if not points:
                 points = [(x_positions[0], self.CHART_HEIGHT / 2.0)]
 
+            # Bound the path to the point budget. The extremes stay in the
+            # line so it still reaches the exact min/max labels.
+            max_points = settings.FILLUP_CHART_MAX_POINTS
+            if len(points) > max_points:
+                kept = set(downsample_lttb(points, max_points))
+                kept.update((values.index(min_value), values.index(max_value)))
+                points = [points[index] for index in sorted(kept)]
+
             unique_dates = []
             for candidate in sorted(set(dates)):
                 label = candidate.strftime("%b %d")
@@ -766,21 +881,108 @@ class StatisticsView(LoginRequiredMixin, TemplateView):
                 "height": self.CHART_HEIGHT,
             }
 
-        chart_cost = _build_chart(
-            [(d, v) for d, v in cost_series_converted],
-            precision=2,
-            unit_label=f"{unit_prefs['currency']} / {unit_prefs['volume']}",
-        )
+        def _compute_results() -> dict:
+            if range_start is not None or range_end is not None:
+                summary_raw = range_metrics(
+                    user, range_start, range_end, vehicle_id=selected_vehicle_id
+                )
+            else:
+                summary_raw = rollup_metrics(
+                    user, window_start=window_start, vehicle_id=selected_vehicle_id
+                )
+            # Sorted and differenced once for the charts; large windows get the
+            # NumPy series when it is available.
+            window_series = load_series(queryset)
+
+            cost_series_raw = timeseries_cost_per_liter(window_series)
+            cost_series_converted: list[tuple[date, float]] = []
+            for entry_date, price_per_liter in cost_series_raw:
+                converted = float(price_per_liter)
+                if unit_prefs["volume"] == "gal":
+                    converted *= float(liters_per_gallon)
+                cost_series_converted.append((entry_date, converted))
+
+            consumption_series_raw = timeseries_consumption(window_series)
+            consumption_series_converted: list[tuple[date, float | None]] = []
+            for entry_date, consumption in consumption_series_raw:
+                if consumption is None:
+                    consumption_series_converted.append((entry_date, None))
+                    continue
+                if use_mpg:
+                    gallons = liters_to_gallons(consumption)
+                    value: float | None = None
+                    if gallons > 0:
+                        value = miles_per_100km / gallons
+                    consumption_series_converted.append((entry_date, value))
+                else:
+                    consumption_series_converted.append((entry_date, consumption))
+
+            chart_cost = _build_chart(
+                [(d, v) for d, v in cost_series_converted],
+                precision=2,
+                unit_label=f"{unit_prefs['currency']} / {unit_prefs['volume']}",
+            )
+
+            consumption_unit = efficiency_label
+            chart_consumption = _build_chart(
+                consumption_series_converted,
+                precision=1,
+                unit_label=consumption_unit,
+            )
+
+            return {
+                "summary_raw": summary_raw,
+                "chart_cost": chart_cost,
+                "chart_consumption": chart_consumption,
+                "raw_brand_rows": brand_grade_summary_sql(queryset),
+            }
 
-        consumption_unit = efficiency_label
-        chart_consumption = _build_chart(
-            consumption_series_converted,
-            precision=1,
-            unit_label=consumption_unit,
+        results = cached_result(
+            user,
+            "statistics",
+            (
+                selected_vehicle_id,
+                window_start,
+                range_start,
+                range_end,
+                settings.FILLUP_CHART_MAX_POINTS,
+            ),
+            _compute_results,
         )
+        summary_raw = results["summary_raw"]
+        chart_cost = results["chart_cost"]
+        chart_consumption = results["chart_consumption"]
+
+        total_distance_value = summary_raw.get("total_distance_km", 0.0) or 0.0
+        if unit_prefs["distance"] == "mi":
+            total_distance_value = km_to_miles(total_distance_value)
+
+        avg_distance_per_day = summary_raw.get("avg_distance_per_day_km")
+        if avg_distance_per_day is not None and unit_prefs["distance"] == "mi":
+            avg_distance_per_day = km_to_miles(avg_distance_per_day)
+
+        summary = {
+            "avg_consumption": _format_consumption(
+                summary_raw.get("avg_consumption_l_per_100km"),
+                summary_raw.get("avg_consumption_mpg"),
+            ),
+            "avg_cost_per_volume": _format_cost_per_volume(
+                summary_raw.get("avg_cost_per_liter")
+            ),
+            "total_spend": f"{unit_prefs['currency']} {summary_raw.get('total_spend', Decimal('0')):.2f}",
+            "total_distance": f"{int(round(total_distance_value))} {unit_prefs['distance']}",
+            "avg_cost_per_distance": _format_cost_per_distance(
+                summary_raw.get("avg_cost_per_km"), summary_raw.get("avg_cost_per_mile")
+            ),
+            "avg_distance_per_day": (
+                f"{int(round(avg_distance_per_day))} {unit_prefs['distance']}/day"
+                if avg_distance_per_day is not None
+                else "—"
+            ),
+        }
 
         brand_rows = []
-        raw_brand_rows = brand_grade_summary(window_entries)
+        raw_brand_rows = results["raw_brand_rows"]
         for row in raw_brand_rows:
             avg_cost = row.get("avg_cost_per_liter")
             avg_consumption = row.get("avg_consumption_l_per_100km")
@@ -822,6 +1024,8 @@ class StatisticsView(LoginRequiredMixin, TemplateView):
                 "selected_vehicle": selected_vehicle_value,
                 "selected_window": window_param,
                 "window_options": window_options,
+                "range_start": range_start.isoformat() if range_start else "",
+                "range_end": range_end.isoformat() if range_end else "",
                 "summary": summary,
                 "chart_cost": chart_cost,
                 "chart_consumption": chart_consumption,
@@ -0,0 +1,100 @@
+"""Maintenance and lookup helpers for the per-user fill-up vocabulary."""
+from __future__ import annotations
+
+from collections import Counter
+from typing import Mapping
+
+from django.db.models import Count, F, Max
+from django.utils import timezone
+
+from .models import FillUp, FillUpVocabulary
+
+
+Kind = FillUpVocabulary.Kind
+
+
+def vocabulary_terms(state: Mapping | None) -> Counter:
+    """Return the ``(user_id, kind, value)`` terms referenced by a fill-up state."""
+
+    terms: Counter = Counter()
+    if not state:
+        return terms
+    for kind, field_name in FillUpVocabulary.FIELD_BY_KIND.items():
+        value = state.get(field_name) or ""
+        if value:
+            terms[(state["user_id"], kind, value)] += 1
+    return terms
+
+
+def apply_change(previous: Mapping | None, current: Mapping | None) -> None:
+    """Move usage counts from the ``previous`` fill-up state to ``current``.
+
+    Either side may be ``None`` for inserts and deletes. Unchanged values are
+    left alone, so editing only the notes does not touch the table.
+    """
+
+    added = vocabulary_terms(current)
+    removed = vocabulary_terms(previous)
+    added, removed = added - removed, removed - added
+
+    now = timezone.now()
+    for (user_id, kind, value), count in added.items():
+        entry, created = FillUpVocabulary.objects.get_or_create(
+            user_id=user_id,
+            kind=kind,
+            value=value,
+            defaults={"usage_count": count, "last_used_at": now},
+        )
+        if not created:
+            FillUpVocabulary.objects.filter(pk=entry.pk).update(
+                usage_count=F("usage_count") + count, last_used_at=now
+            )
+
+    for (user_id, kind, value), count in removed.items():
+        queryset = FillUpVocabulary.objects.filter(user_id=user_id, kind=kind, value=value)
+        queryset.filter(usage_count__lte=count).delete()
+        queryset.update(usage_count=F("usage_count") - count)
+
+
+def rebuild_for_user(user_id: int) -> None:
+    """Recount the vocabulary for ``user_id`` from its fill-ups."""
+
+    rows: dict[tuple[str, str], dict] = {}
+    for kind, field_name in FillUpVocabulary.FIELD_BY_KIND.items():
+        grouped = (
+            FillUp.objects.filter(user_id=user_id)
+            .exclude(**{field_name: ""})
+            .order_by()
+            .values(field_name)
+            .annotate(usage_count=Count("id"), last_used_at=Max("updated_at"))
+        )
+        for row in grouped:
+            rows[(kind, row[field_name])] = row
+
+    FillUpVocabulary.objects.filter(user_id=user_id).delete()
+    FillUpVocabulary.objects.bulk_create(
+        [
+            FillUpVocabulary(
+                user_id=user_id,
+                kind=kind,
+                value=value,
+                usage_count=row["usage_count"],
+                last_used_at=row["last_used_at"],
+            )
+            for (kind, value), row in rows.items()
+        ]
+    )
+
+
+def option_lists(user) -> dict[str, list[str]]:
+    """Return brand, grade, and station options ordered by how often they are used."""
+
+    options: dict[str, list[str]] = {kind: [] for kind in Kind.values}
+    queryset = (
+        FillUpVocabulary.objects.filter(user=user, usage_count__gt=0)
+        .order_by("kind", "-usage_count", "value")
+        .values_list("kind", "value")
+    )
+    for kind, value in queryset:
+        options[kind].append(value)
+    return options
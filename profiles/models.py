@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 
 
 class Profile(models.Model):
@@ -52,5 +52,10 @@ class Profile(models.Model):
     timezone = models.CharField(max_length=255, default="UTC")
     utc_offset_minutes = models.IntegerField(default=0)
 
+    def save(self, *args, **kwargs):
+        # Commit the profile change and its core.signals version bump together.
+        with transaction.atomic():
+            return super().save(*args, **kwargs)
+
     def __str__(self) -> str:
         return f"Profile for {self.user}"  # pragma: no cover - representation only
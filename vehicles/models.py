@@ -1,5 +1,5 @@
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 
 
 class Vehicle(models.Model):
@@ -28,5 +28,11 @@ class Vehicle(models.Model):
         ]
         ordering = ["name", "id"]
 
+    def save(self, *args, **kwargs):
+        # Model.save is not atomic on its own; without this the post_save
+        # version bump (core.signals) would commit after the vehicle row.
+        with transaction.atomic():
+            return super().save(*args, **kwargs)
+
     def __str__(self) -> str:
         return self.name